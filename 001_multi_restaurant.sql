@@ -0,0 +1,41 @@
+-- backend_app/migrations/001_multi_restaurant.sql
+--
+-- Adds the restaurant (tenant) dimension to an existing single-restaurant MySQL database.
+-- db.create_all() only creates missing tables, so existing deployments run this once:
+--   mysql restaurant_db < migrations/001_multi_restaurant.sql
+-- Existing rows are assigned to restaurant 1 (DEFAULT_RESTAURANT_ID).
+
+INSERT INTO restaurant_info (id, name)
+SELECT 1, 'My Restaurant' FROM DUAL
+WHERE NOT EXISTS (SELECT 1 FROM restaurant_info);
+
+ALTER TABLE restaurant_info
+    ADD COLUMN hostname VARCHAR(255) NULL AFTER id,
+    ADD UNIQUE KEY hostname (hostname);
+
+ALTER TABLE categories
+    ADD COLUMN restaurant_id INT NOT NULL DEFAULT 1 AFTER id,
+    DROP INDEX name,
+    ADD CONSTRAINT uq_categories_restaurant_name UNIQUE (restaurant_id, name),
+    ADD INDEX ix_categories_restaurant_active (restaurant_id, is_active),
+    ADD FOREIGN KEY (restaurant_id) REFERENCES restaurant_info (id);
+ALTER TABLE categories ALTER COLUMN restaurant_id DROP DEFAULT;
+
+ALTER TABLE menu_items
+    ADD COLUMN restaurant_id INT NOT NULL DEFAULT 1 AFTER id,
+    ADD INDEX ix_menu_items_restaurant_available_category (restaurant_id, is_available, category_id),
+    ADD FOREIGN KEY (restaurant_id) REFERENCES restaurant_info (id);
+ALTER TABLE menu_items ALTER COLUMN restaurant_id DROP DEFAULT;
+
+ALTER TABLE orders
+    ADD COLUMN restaurant_id INT NOT NULL DEFAULT 1 AFTER delivery_address_id,
+    ADD INDEX ix_orders_restaurant_user_created (restaurant_id, user_id, created_at),
+    ADD INDEX ix_orders_restaurant_status_created (restaurant_id, status, created_at),
+    ADD FOREIGN KEY (restaurant_id) REFERENCES restaurant_info (id);
+ALTER TABLE orders ALTER COLUMN restaurant_id DROP DEFAULT;
+
+ALTER TABLE orders_archive
+    ADD COLUMN restaurant_id INT NOT NULL DEFAULT 1 AFTER delivery_address_id,
+    DROP INDEX ix_orders_archive_user_created,
+    ADD INDEX ix_orders_archive_restaurant_user_created (restaurant_id, user_id, created_at);
+ALTER TABLE orders_archive ALTER COLUMN restaurant_id DROP DEFAULT;
@@ -0,0 +1,5 @@
+-- backend_app/migrations/002_payment_transaction_index.sql
+--
+-- Index for webhook and settlement-file reconciliation lookups by gateway transaction id.
+
+CREATE INDEX ix_payments_payment_gateway_transaction_id ON payments (payment_gateway_transaction_id);
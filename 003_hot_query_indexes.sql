@@ -0,0 +1,19 @@
+-- backend_app/migrations/003_hot_query_indexes.sql
+--
+-- Composite indexes for the hot access patterns (see `flask check-query-plans`).
+-- MySQL drops the index it created implicitly for a foreign key only when a new index starts
+-- with the foreign-key column and can enforce it instead. The addresses and menu_items
+-- composites lead with user_id / category_id, so they replace those implicit indexes rather
+-- than duplicate them. order_items.order_id needs nothing here: its implicit foreign-key index
+-- already serves the order-items lookup (databases built by create_all get the equivalent
+-- ix_order_items_order_id instead, since SQLite and PostgreSQL don't index foreign keys).
+
+ALTER TABLE addresses
+    ADD INDEX ix_addresses_user_default_created (user_id, is_default, created_at);
+
+ALTER TABLE menu_items
+    ADD INDEX ix_menu_items_category_available (category_id, is_available);
+
+ALTER TABLE orders
+    ADD INDEX ix_orders_restaurant_created (restaurant_id, created_at),
+    ADD INDEX ix_orders_status_created (status, created_at);
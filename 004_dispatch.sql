@@ -0,0 +1,12 @@
+-- backend_app/migrations/004_dispatch.sql
+--
+-- Driver and stop number recorded on orders by the dispatch cycle (dispatch.py).
+-- The archive table keeps the same columns so archival can copy them.
+
+ALTER TABLE orders
+    ADD COLUMN driver VARCHAR(80) NULL AFTER estimated_delivery_time,
+    ADD COLUMN delivery_sequence INT NULL AFTER driver;
+
+ALTER TABLE orders_archive
+    ADD COLUMN driver VARCHAR(80) NULL AFTER estimated_delivery_time,
+    ADD COLUMN delivery_sequence INT NULL AFTER driver;
@@ -0,0 +1,7 @@
+-- backend_app/migrations/005_menu_item_stock.sql
+--
+-- Optional per-item stock count (see inventory.py). NULL keeps an item untracked, which is
+-- what every existing item starts as.
+
+ALTER TABLE menu_items
+    ADD COLUMN stock_quantity INT NULL AFTER is_available;
@@ -0,0 +1,17 @@
+-- backend_app/migrations/006_audit_log.sql
+--
+-- Append-only audit trail written in batches by audit.py (AUDIT_SINK=database).
+
+CREATE TABLE IF NOT EXISTS audit_log (
+    id BIGINT NOT NULL AUTO_INCREMENT,
+    created_at DATETIME NOT NULL,
+    actor_user_id INT NULL,
+    endpoint VARCHAR(100) NULL,
+    action VARCHAR(10) NOT NULL,
+    table_name VARCHAR(64) NOT NULL,
+    entity_id INT NULL,
+    changes JSON NULL,
+    PRIMARY KEY (id),
+    INDEX ix_audit_log_created_at (created_at),
+    INDEX ix_audit_log_table_entity (table_name, entity_id)
+);
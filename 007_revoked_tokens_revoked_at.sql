@@ -0,0 +1,6 @@
+-- backend_app/migrations/007_revoked_tokens_revoked_at.sql
+--
+-- The token blocklist refresh re-reads revocations from the last few seconds (rows committed
+-- after a higher id was already visible); index revoked_at so that stays a range read.
+
+CREATE INDEX ix_revoked_tokens_revoked_at ON revoked_tokens (revoked_at);
@@ -0,0 +1,14 @@
+-- backend_app/migrations/008_staff_restaurant.sql
+--
+-- Binds staff and admin accounts to the restaurant they work for. admin_required rejects
+-- requests for any other restaurant unless the account has all_restaurants (head office).
+-- Existing staff and admins worked for the single pre-tenancy restaurant, so they get
+-- restaurant 1 (DEFAULT_RESTAURANT_ID). Grant head-office accounts explicitly afterwards:
+--   UPDATE users SET all_restaurants = TRUE WHERE id IN (...);
+
+ALTER TABLE users
+    ADD COLUMN restaurant_id INT NULL AFTER role,
+    ADD COLUMN all_restaurants BOOLEAN NOT NULL DEFAULT FALSE AFTER restaurant_id,
+    ADD FOREIGN KEY (restaurant_id) REFERENCES restaurant_info (id);
+
+UPDATE users SET restaurant_id = 1 WHERE role IN ('admin', 'staff');
@@ -0,0 +1,27 @@
+-- backend_app/migrations/009_stock_reservations.sql
+--
+-- Cancellations put back only what an order reserved, and re-enable only items that were
+-- switched off by selling out (see inventory.py).
+--   order_items.reserved_quantity: stock taken by the line; NULL when the item was not tracked.
+--     The archive copy keeps every hot column, so it gets the column too.
+--   menu_items.sold_out: set when a reservation took the item to zero stock.
+-- Backfill: lines of orders that can still be cancelled reserved their quantity if the item
+-- tracks stock today (what the previous release code assumed), and unavailable items at zero
+-- stock are taken to have sold out.
+
+ALTER TABLE order_items
+    ADD COLUMN reserved_quantity INT NULL AFTER subtotal;
+
+ALTER TABLE order_items_archive
+    ADD COLUMN reserved_quantity INT NULL AFTER subtotal;
+
+ALTER TABLE menu_items
+    ADD COLUMN sold_out BOOLEAN NOT NULL DEFAULT FALSE AFTER stock_quantity;
+
+UPDATE order_items oi
+    JOIN orders o ON o.id = oi.order_id
+    JOIN menu_items mi ON mi.id = oi.menu_item_id
+SET oi.reserved_quantity = oi.quantity
+WHERE mi.stock_quantity IS NOT NULL AND o.status IN ('pending', 'confirmed', 'preparing');
+
+UPDATE menu_items SET sold_out = TRUE WHERE stock_quantity = 0 AND is_available = FALSE;
@@ -3,6 +3,7 @@
 from flask import Blueprint, request, jsonify
 from ..extensions import db
 from ..models.models import Address, User
+from ..queries import USER_ADDRESSES, CLEAR_DEFAULT_ADDRESS
 from flask_jwt_extended import jwt_required, get_jwt_identity
 
 addresses_bp = Blueprint("addresses_bp", __name__)
@@ -28,7 +29,7 @@ def add_address():
 
         # If this address is set as default, unset other defaults for this user
         if new_address.is_default:
-            Address.query.filter_by(user_id=current_user_id, is_default=True).update({"is_default": False})
+            db.session.execute(CLEAR_DEFAULT_ADDRESS, {"owner_id": current_user_id})
 
         db.session.add(new_address)
         db.session.commit()
@@ -48,7 +49,7 @@ def add_address():
 def get_addresses():
     current_user_id = get_jwt_identity()
     try:
-        addresses = Address.query.filter_by(user_id=current_user_id).order_by(Address.is_default.desc(), Address.created_at.desc()).all()
+        addresses = db.session.execute(USER_ADDRESSES, {"user_id": current_user_id}).scalars().all()
         return jsonify([{
             "id": addr.id,
             "user_id": addr.user_id,
@@ -80,7 +81,7 @@ def update_address(address_id):
         is_default_update = data.get("is_default")
 
         if is_default_update is not None and is_default_update and not address.is_default:
-            Address.query.filter_by(user_id=current_user_id, is_default=True).update({"is_default": False})
+            db.session.execute(CLEAR_DEFAULT_ADDRESS, {"owner_id": current_user_id})
             address.is_default = True
         elif is_default_update is not None:
             address.is_default = is_default_update
@@ -126,7 +127,7 @@ def set_default_address(address_id):
 
     try:
         # Unset any other default addresses for this user
-        Address.query.filter_by(user_id=current_user_id, is_default=True).update({"is_default": False})
+        db.session.execute(CLEAR_DEFAULT_ADDRESS, {"owner_id": current_user_id})
         # Set the new default address
         address_to_set_default.is_default = True
         db.session.commit()
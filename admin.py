@@ -1,10 +1,23 @@
 # backend_app/src/routes/admin.py
 
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, abort
 from ..extensions import db
-from ..models.models import Category, MenuItem, Order, User, RestaurantInfo
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from ..models.models import Category, MenuItem, Order, User, RestaurantInfo, Payment
+from ..token_blocklist import blocklist
+from ..pricing import price_table
+from ..cache import payload_cache
+from ..compression import cached_json_response
+from ..queries import RESTAURANT_INFO, ADMIN_ORDERS, ORDER_PAYMENT_ID
+from ..tenancy import current_restaurant_id, directory as tenant_directory
+from ..order_state import ORDER_STATUSES, transition_order, transition_orders_checked, explain_failed_transition
+from ..dispatch import dispatch_orders
+from ..inventory import parse_stock_quantity, release_stock, apply_availability_changes
+from ..serializers import (serialize_order_admin_summary, load_order_detail,
+                           CATEGORY_ADMIN_FIELDS, MENU_ITEM_ADMIN_FIELDS, USER_LIST_FIELDS, select_fieldset, serialize_rows)
+from flask_jwt_extended import jwt_required, get_jwt_identity, current_user
+from ..identity import profile_cache
 from functools import wraps
+from sqlalchemy import select, insert, case
 
 admin_bp = Blueprint("admin_bp", __name__)
 
@@ -13,13 +26,40 @@ def admin_required(fn):
     @wraps(fn)
     @jwt_required()
     def wrapper(*args, **kwargs):
-        current_user_id = get_jwt_identity()
-        user = User.query.get(current_user_id)
-        if not user or user.role not in ["admin", "staff"]:
+        # current_user's profile is loaded once and reused by the handler
+        if current_user.role not in ["admin", "staff"]:
             return jsonify({"message": "Admins or staff only!"}), 403
+        # The restaurant comes from the client (X-Restaurant-Id / Host); staff only manage their own
+        if not current_user.works_for(current_restaurant_id()):
+            return jsonify({"message": "Not authorized for this restaurant"}), 403
         return fn(*args, **kwargs)
     return wrapper
 
+def _manages_user(user):
+    """Whether the caller may change user's role or tokens: customers, and staff of the caller's restaurants."""
+    if user.role == "customer":
+        return True
+    if user.all_restaurants:
+        return current_user.profile()["all_restaurants"]
+    return current_user.works_for(user.restaurant_id)
+
+def tenant_get_or_404(model, object_id):
+    """The current restaurant's row of model with this id; 404 for other restaurants' rows too."""
+    row = db.session.execute(
+        select(model).where(model.id == object_id, model.restaurant_id == current_restaurant_id())
+    ).scalar_one_or_none()
+    if row is None:
+        abort(404)
+    return row
+
+def _category_in_restaurant(category_id):
+    return db.session.execute(
+        select(Category.id).where(Category.id == category_id, Category.restaurant_id == current_restaurant_id())
+    ).first() is not None
+
+def invalidate_menu_payloads(restaurant_id):
+    payload_cache.invalidate(("menu_items", restaurant_id), ("categories", restaurant_id))
+
 # Category Management (Admin)
 @admin_bp.route("/categories", methods=["POST"])
 @admin_required
@@ -27,6 +67,7 @@ def create_category():
     data = request.get_json()
     try:
         new_category = Category(
+            restaurant_id=current_restaurant_id(),
             name=data.get("name"),
             description=data.get("description"),
             image_url=data.get("image_url"),
@@ -36,6 +77,8 @@ def create_category():
             return jsonify({"message": "Category name is required"}), 400
         db.session.add(new_category)
         db.session.commit()
+        price_table.set_category(new_category.restaurant_id, new_category.id, new_category.is_active)
+        invalidate_menu_payloads(new_category.restaurant_id)
         return jsonify({"id": new_category.id, "name": new_category.name, "message": "Category created"}), 201
     except Exception as e:
         db.session.rollback()
@@ -44,16 +87,19 @@ def create_category():
 @admin_bp.route("/categories", methods=["GET"])
 @admin_required
 def get_all_categories_admin():
-    categories = Category.query.all()
-    return jsonify([{
-        "id": cat.id, "name": cat.name, "description": cat.description, 
-        "image_url": cat.image_url, "is_active": cat.is_active
-    } for cat in categories]), 200
+    try:
+        columns = select_fieldset(CATEGORY_ADMIN_FIELDS, request.args.get("fields"))
+    except ValueError as e:
+        return jsonify({"message": str(e)}), 400
+    categories = db.session.execute(
+        select(*columns).select_from(Category).where(Category.restaurant_id == current_restaurant_id())
+    ).all()
+    return jsonify(serialize_rows(categories)), 200
 
 @admin_bp.route("/categories/<int:category_id>", methods=["PUT"])
 @admin_required
 def update_category(category_id):
-    category = Category.query.get_or_404(category_id)
+    category = tenant_get_or_404(Category, category_id)
     data = request.get_json()
     try:
         category.name = data.get("name", category.name)
@@ -61,6 +107,8 @@ def update_category(category_id):
         category.image_url = data.get("image_url", category.image_url)
         category.is_active = data.get("is_active", category.is_active)
         db.session.commit()
+        price_table.set_category(category.restaurant_id, category.id, category.is_active)
+        invalidate_menu_payloads(category.restaurant_id)
         return jsonify({"id": category.id, "message": "Category updated"}), 200
     except Exception as e:
         db.session.rollback()
@@ -69,7 +117,7 @@ def update_category(category_id):
 @admin_bp.route("/categories/<int:category_id>", methods=["DELETE"])
 @admin_required
 def delete_category(category_id):
-    category = Category.query.get_or_404(category_id)
+    category = tenant_get_or_404(Category, category_id)
     try:
         # Soft delete by setting is_active to False, or hard delete
         # For now, let's do a hard delete for simplicity, or check if items exist
@@ -77,6 +125,8 @@ def delete_category(category_id):
             return jsonify({"message": "Cannot delete category with associated menu items. Set to inactive instead."}), 400
         db.session.delete(category)
         db.session.commit()
+        price_table.remove_category(category.restaurant_id, category_id)
+        invalidate_menu_payloads(category.restaurant_id)
         return jsonify({"message": "Category deleted"}), 200
     except Exception as e:
         db.session.rollback()
@@ -87,21 +137,32 @@ def delete_category(category_id):
 @admin_required
 def create_menu_item():
     data = request.get_json()
+    try:
+        stock_quantity = parse_stock_quantity(data.get("stock_quantity"))
+    except ValueError as e:
+        return jsonify({"message": str(e)}), 400
     try:
         new_item = MenuItem(
+            restaurant_id=current_restaurant_id(),
             category_id=data.get("category_id"),
             name=data.get("name"),
             description=data.get("description"),
             price=data.get("price"),
             image_url=data.get("image_url"),
-            is_available=data.get("is_available", True),
+            is_available=data.get("is_available", stock_quantity != 0),
+            sold_out="is_available" not in data and stock_quantity == 0,
+            stock_quantity=stock_quantity,
             preparation_time_minutes=data.get("preparation_time_minutes"),
             calories=data.get("calories")
         )
         if not all([new_item.category_id, new_item.name, new_item.description, new_item.price is not None]):
             return jsonify({"message": "Category ID, name, description, and price are required"}), 400
+        if not _category_in_restaurant(new_item.category_id):
+            return jsonify({"message": "Category not found"}), 400
         db.session.add(new_item)
         db.session.commit()
+        price_table.set_item(new_item.restaurant_id, new_item.id, new_item.price, new_item.is_available, new_item.category_id)
+        invalidate_menu_payloads(new_item.restaurant_id)
         return jsonify({"id": new_item.id, "name": new_item.name, "message": "Menu item created"}), 201
     except Exception as e:
         db.session.rollback()
@@ -110,18 +171,26 @@ def create_menu_item():
 @admin_bp.route("/menu-items", methods=["GET"])
 @admin_required
 def get_all_menu_items_admin():
-    items = MenuItem.query.all()
-    return jsonify([{
-        "id": item.id, "category_id": item.category_id, "name": item.name, 
-        "description": item.description, "price": str(item.price), 
-        "image_url": item.image_url, "is_available": item.is_available
-    } for item in items]), 200
+    try:
+        columns = select_fieldset(MENU_ITEM_ADMIN_FIELDS, request.args.get("fields"))
+    except ValueError as e:
+        return jsonify({"message": str(e)}), 400
+    items = db.session.execute(
+        select(*columns).select_from(MenuItem).where(MenuItem.restaurant_id == current_restaurant_id())
+    ).all()
+    return jsonify(serialize_rows(items)), 200
 
 @admin_bp.route("/menu-items/<int:item_id>", methods=["PUT"])
 @admin_required
 def update_menu_item(item_id):
-    item = MenuItem.query.get_or_404(item_id)
+    item = tenant_get_or_404(MenuItem, item_id)
     data = request.get_json()
+    if "category_id" in data and not _category_in_restaurant(data["category_id"]):
+        return jsonify({"message": "Category not found"}), 400
+    try:
+        stock_quantity = parse_stock_quantity(data.get("stock_quantity", item.stock_quantity))
+    except ValueError as e:
+        return jsonify({"message": str(e)}), 400
     try:
         item.category_id = data.get("category_id", item.category_id)
         item.name = data.get("name", item.name)
@@ -129,9 +198,19 @@ def update_menu_item(item_id):
         item.price = data.get("price", item.price)
         item.image_url = data.get("image_url", item.image_url)
         item.is_available = data.get("is_available", item.is_available)
+        if "is_available" in data:
+            item.sold_out = False # Set by hand: a later cancellation must not switch it back on
+        if "stock_quantity" in data:
+            # A restock (or setting zero) decides availability unless the request sets it explicitly
+            item.stock_quantity = stock_quantity
+            if stock_quantity is not None and "is_available" not in data:
+                item.is_available = stock_quantity > 0
+                item.sold_out = stock_quantity == 0
         item.preparation_time_minutes = data.get("preparation_time_minutes", item.preparation_time_minutes)
         item.calories = data.get("calories", item.calories)
         db.session.commit()
+        price_table.set_item(item.restaurant_id, item.id, item.price, item.is_available, item.category_id)
+        invalidate_menu_payloads(item.restaurant_id)
         return jsonify({"id": item.id, "message": "Menu item updated"}), 200
     except Exception as e:
         db.session.rollback()
@@ -140,10 +219,12 @@ def update_menu_item(item_id):
 @admin_bp.route("/menu-items/<int:item_id>", methods=["DELETE"])
 @admin_required
 def delete_menu_item(item_id):
-    item = MenuItem.query.get_or_404(item_id)
+    item = tenant_get_or_404(MenuItem, item_id)
     try:
         db.session.delete(item)
         db.session.commit()
+        price_table.remove_item(item.restaurant_id, item_id)
+        invalidate_menu_payloads(item.restaurant_id)
         return jsonify({"message": "Menu item deleted"}), 200
     except Exception as e:
         db.session.rollback()
@@ -154,78 +235,126 @@ def delete_menu_item(item_id):
 @admin_required
 def get_all_orders_admin():
     # Add pagination and filtering later if needed
-    orders = Order.query.order_by(Order.created_at.desc()).all()
-    return jsonify([{
-        "id": order.id, "user_id": order.user_id, "user_email": order.user.email, 
-        "total_amount": str(order.total_amount), "status": order.status, 
-        "payment_status": order.payment_status, "created_at": order.created_at.isoformat()
-    } for order in orders]), 200
+    orders = db.session.execute(ADMIN_ORDERS, {"restaurant_id": current_restaurant_id()}).all()
+    return jsonify([serialize_order_admin_summary(order) for order in orders]), 200
 
 @admin_bp.route("/orders/<int:order_id>", methods=["GET"])
 @admin_required
 def get_order_details_admin(order_id):
-    order = Order.query.get_or_404(order_id)
-    # Similar to user-facing GET order details, but for admin
-    order_details = {
-            "id": order.id,
-            "user_id": order.user_id,
-            "user_info": {"email": order.user.email, "full_name": order.user.full_name, "phone": order.user.phone_number},
-            "total_amount": str(order.total_amount),
-            "status": order.status,
-            "payment_status": order.payment_status,
-            "payment_method": order.payment_method,
-            "delivery_instructions": order.delivery_instructions,
-            "estimated_delivery_time": order.estimated_delivery_time.isoformat() if order.estimated_delivery_time else None,
-            "created_at": order.created_at.isoformat(),
-            "updated_at": order.updated_at.isoformat(),
-            "delivery_address": {
-                "address_line1": order.delivery_address.address_line1,
-                "address_line2": order.delivery_address.address_line2,
-                "city": order.delivery_address.city,
-                "postal_code": order.delivery_address.postal_code,
-                "country": order.delivery_address.country
-            },
-            "order_items": [{
-                "menu_item_id": oi.menu_item_id,
-                "menu_item_name": oi.menu_item.name,
-                "quantity": oi.quantity,
-                "price_at_order": str(oi.price_at_order),
-                "subtotal": str(oi.subtotal)
-            } for oi in order.order_items]
-        }
+    # Same payload as the user-facing order details, plus the customer's contact info
+    restaurant_id = current_restaurant_id()
+    order_details = (load_order_detail(order_id, include_user=True, restaurant_id=restaurant_id)
+                     or load_order_detail(order_id, include_user=True, archived=True, restaurant_id=restaurant_id))
+    if not order_details:
+        abort(404)
     return jsonify(order_details), 200
 
 @admin_bp.route("/orders/<int:order_id>/status", methods=["PUT"])
 @admin_required
 def update_order_status(order_id):
-    order = Order.query.get_or_404(order_id)
     data = request.get_json()
     new_status = data.get("status")
-    allowed_statuses = ["pending", "confirmed", "preparing", "out_for_delivery", "delivered", "cancelled"]
-    if new_status not in allowed_statuses:
-        return jsonify({"message": f"Invalid status. Allowed: {', '.join(allowed_statuses)}"}), 400
+    expected_status = data.get("expected_status") # Optional: the status the client last saw
+    if new_status not in ORDER_STATUSES:
+        return jsonify({"message": f"Invalid status. Allowed: {', '.join(ORDER_STATUSES)}"}), 400
+    from_statuses = [expected_status] if expected_status else None
+    tenant = (Order.restaurant_id == current_restaurant_id(),)
+    values = {}
+    if new_status == "delivered":
+        # Cash on delivery orders are paid when delivered
+        values["payment_status"] = case((Order.payment_method == "cash_on_delivery", "paid"), else_=Order.payment_status)
     try:
-        order.status = new_status
+        from_status = transition_order(order_id, new_status, from_statuses,
+                                       changed_by=get_jwt_identity(), source="admin", filters=tenant, values=values)
+        if from_status is None:
+            db.session.rollback()
+            body, status_code = explain_failed_transition(order_id, new_status, from_statuses, expected_status, filters=tenant)
+            return jsonify(body), status_code
         # Potentially update payment_status if order is cancelled and payment was made (needs refund logic)
-        if new_status == "delivered" and order.payment_method == "cash_on_delivery":
-            order.payment_status = "paid"
+        if new_status == "delivered":
+            payment_method, total_amount = db.session.execute(
+                select(Order.payment_method, Order.total_amount).where(Order.id == order_id)
+            ).one()
             # Create payment record for COD if not already done
-            if not order.payment:
+            if payment_method == "cash_on_delivery" and not db.session.execute(ORDER_PAYMENT_ID, {"order_id": order_id}).first():
                 cod_payment = Payment(
-                    order_id=order.id,
-                    amount=order.total_amount,
-                    payment_gateway_transaction_id=f"COD_{order.id}",
+                    order_id=order_id,
+                    amount=total_amount,
+                    payment_gateway_transaction_id=f"COD_{order_id}",
                     status="success",
                     payment_method_details={"method": "cash_on_delivery"}
                 )
                 db.session.add(cod_payment)
+        restocked = release_stock([order_id]) if new_status == "cancelled" else []
 
         db.session.commit()
-        return jsonify({"id": order.id, "status": order.status, "message": "Order status updated"}), 200
+        apply_availability_changes(current_restaurant_id(), restocked)
+        return jsonify({"id": order_id, "status": new_status, "previous_status": from_status, "message": "Order status updated"}), 200
     except Exception as e:
         db.session.rollback()
         return jsonify({"message": "Error updating order status", "error": str(e)}), 500
 
+MAX_BULK_STATUS_ORDERS = 500
+
+@admin_bp.route("/orders/status", methods=["PUT"])
+@admin_required
+def update_orders_status_bulk():
+    # Body: {"order_ids": [1, 2, 3], "status": "delivered", "expected_status": "out_for_delivery"}
+    data = request.get_json(silent=True) or {}
+    new_status = data.get("status")
+    expected_status = data.get("expected_status") # Optional: every order must currently be in this status
+    if new_status not in ORDER_STATUSES:
+        return jsonify({"message": f"Invalid status. Allowed: {', '.join(ORDER_STATUSES)}"}), 400
+    order_ids = data.get("order_ids")
+    # JSON integers only: no strings, floats or booleans (bool is an int subclass)
+    if not isinstance(order_ids, list) or not all(isinstance(order_id, int) and not isinstance(order_id, bool)
+                                                  for order_id in order_ids):
+        return jsonify({"message": "order_ids must be a list of integers"}), 400
+    order_ids = list(dict.fromkeys(order_ids))
+    if not order_ids or len(order_ids) > MAX_BULK_STATUS_ORDERS:
+        return jsonify({"message": f"order_ids must contain between 1 and {MAX_BULK_STATUS_ORDERS} ids"}), 400
+    restaurant_id = current_restaurant_id()
+    values = {}
+    if new_status == "delivered":
+        values["payment_status"] = case((Order.payment_method == "cash_on_delivery", "paid"), else_=Order.payment_status)
+    try:
+        moved, rejected = transition_orders_checked(
+            order_ids, new_status, expected_status, changed_by=get_jwt_identity(), source="admin",
+            filters=(Order.restaurant_id == restaurant_id,), values=values
+        )
+        restocked = []
+        if moved and new_status == "delivered":
+            # COD payment records for every delivered cash order that has none yet, in one INSERT
+            cod_orders = db.session.execute(
+                select(Order.id, Order.total_amount)
+                .outerjoin(Payment, Payment.order_id == Order.id)
+                .where(Order.id.in_(list(moved)), Order.payment_method == "cash_on_delivery", Payment.id.is_(None))
+            ).all()
+            if cod_orders:
+                db.session.execute(insert(Payment), [{
+                    "order_id": order.id,
+                    "amount": order.total_amount,
+                    "payment_gateway_transaction_id": f"COD_{order.id}",
+                    "status": "success",
+                    "payment_method_details": {"method": "cash_on_delivery"}
+                } for order in cod_orders])
+        elif moved and new_status == "cancelled":
+            restocked = release_stock(list(moved))
+        db.session.commit()
+        apply_availability_changes(restaurant_id, restocked)
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"message": "Error updating order statuses", "error": str(e)}), 500
+
+    results = []
+    for order_id in order_ids:
+        if order_id in moved:
+            results.append({"id": order_id, "updated": True, "previous_status": moved[order_id], "status": new_status})
+        else:
+            reason, current_status = rejected[order_id]
+            results.append({"id": order_id, "updated": False, "error": reason, "current_status": current_status})
+    return jsonify({"status": new_status, "updated": len(moved), "failed": len(rejected), "results": results}), 200
+
 # User Management (Admin)
 @admin_bp.route("/users", methods=["GET"])
 @admin_required # Potentially only for "admin" role, not "staff"
@@ -236,57 +365,84 @@ def get_all_users():
     # if user.role != "admin":
     #     return jsonify({"message": "Super admins only!"}), 403
         
-    users = User.query.all()
-    return jsonify([{
-        "id": u.id, "username": u.username, "email": u.email, 
-        "full_name": u.full_name, "phone_number": u.phone_number, "role": u.role, 
-        "created_at": u.created_at.isoformat()
-    } for u in users]), 200
+    try:
+        columns = select_fieldset(USER_LIST_FIELDS, request.args.get("fields"))
+    except ValueError as e:
+        return jsonify({"message": str(e)}), 400
+    # Projected rows: never loads password_hash or builds User entities
+    users = db.session.execute(select(*columns).select_from(User)).all()
+    return jsonify(serialize_rows(users)), 200
 
 @admin_bp.route("/users/<int:user_id>/role", methods=["PUT"])
 @admin_required # Potentially only for "admin" role
 def update_user_role(user_id):
     # Add check for "admin" role specifically if needed
     user_to_update = User.query.get_or_404(user_id)
+    if not _manages_user(user_to_update):
+        return jsonify({"message": "User belongs to another restaurant"}), 403
     data = request.get_json()
     new_role = data.get("role")
     allowed_roles = ["customer", "staff", "admin"]
     if new_role not in allowed_roles:
         return jsonify({"message": f"Invalid role. Allowed: {', '.join(allowed_roles)}"}), 400
+    all_restaurants = data.get("all_restaurants", user_to_update.all_restaurants if new_role != "customer" else False)
+    if not isinstance(all_restaurants, bool):
+        return jsonify({"message": "all_restaurants must be true or false"}), 400
+    if all_restaurants and not current_user.profile()["all_restaurants"]:
+        return jsonify({"message": "Only accounts with all_restaurants can grant it"}), 403
     try:
         user_to_update.role = new_role
+        # Staff and admins work for the restaurant they were promoted in
+        user_to_update.restaurant_id = current_restaurant_id() if new_role != "customer" else None
+        user_to_update.all_restaurants = all_restaurants and new_role != "customer"
         db.session.commit()
-        return jsonify({"id": user_to_update.id, "role": user_to_update.role, "message": "User role updated"}), 200
+        profile_cache.invalidate(user_to_update.id)
+        return jsonify({"id": user_to_update.id, "role": user_to_update.role, "restaurant_id": user_to_update.restaurant_id,
+                        "all_restaurants": user_to_update.all_restaurants, "message": "User role updated"}), 200
     except Exception as e:
         db.session.rollback()
         return jsonify({"message": "Error updating user role", "error": str(e)}), 500
 
+@admin_bp.route("/users/<int:user_id>/revoke-tokens", methods=["POST"])
+@admin_required # Potentially only for "admin" role
+def revoke_user_tokens(user_id):
+    # Signs the user out everywhere, e.g. for dismissed staff or a compromised account
+    user_to_revoke = User.query.get_or_404(user_id)
+    if not _manages_user(user_to_revoke):
+        return jsonify({"message": "User belongs to another restaurant"}), 403
+    try:
+        blocklist.revoke_user(user_to_revoke.id)
+        return jsonify({"id": user_to_revoke.id, "message": "All tokens for user revoked"}), 200
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"message": "Error revoking user tokens", "error": str(e)}), 500
+
 # Restaurant Info Management (Admin)
 @admin_bp.route("/restaurant-info", methods=["GET"])
 # No auth needed for GET, or use @jwt_required() if some info is sensitive
 def get_restaurant_info():
-    info = RestaurantInfo.query.first() # Assuming single restaurant
-    if not info:
-        # Create a default one if it doesn't exist
-        info = RestaurantInfo(name="My Restaurant")
-        db.session.add(info)
-        db.session.commit()
-    return jsonify({
-        "id": info.id, "name": info.name, "address": info.address, "phone_number": info.phone_number,
+    restaurant_id = current_restaurant_id()
+    return cached_json_response(("restaurant_info", restaurant_id), lambda: load_restaurant_info(restaurant_id)), 200
+
+def load_restaurant_info(restaurant_id):
+    info = db.session.execute(RESTAURANT_INFO, {"restaurant_id": restaurant_id}).scalar_one()
+    return {
+        "id": info.id, "hostname": info.hostname, "name": info.name, "address": info.address, "phone_number": info.phone_number,
         "email": info.email, "logo_url": info.logo_url, "operating_hours": info.operating_hours,
         "delivery_zones": info.delivery_zones
-    }), 200
+    }
 
 @admin_bp.route("/restaurant-info", methods=["PUT"])
 @admin_required # Only admins should update this
 def update_restaurant_info():
-    info = RestaurantInfo.query.first()
+    info = db.session.get(RestaurantInfo, current_restaurant_id())
     if not info:
-        return jsonify({"message": "Restaurant info not found. Initialize first?"}), 404 # Should not happen if GET creates it
+        return jsonify({"message": "Restaurant info not found. Initialize first?"}), 404
     
     data = request.get_json()
     try:
         info.name = data.get("name", info.name)
+        info.hostname = data.get("hostname", info.hostname) # Requests for this Host resolve to this restaurant
         info.address = data.get("address", info.address)
         info.phone_number = data.get("phone_number", info.phone_number)
         info.email = data.get("email", info.email)
@@ -294,12 +450,35 @@ def update_restaurant_info():
         info.operating_hours = data.get("operating_hours", info.operating_hours) # Expects JSON
         info.delivery_zones = data.get("delivery_zones", info.delivery_zones) # Expects JSON
         db.session.commit()
+        payload_cache.invalidate(("restaurant_info", info.id))
+        tenant_directory.load() # Other workers pick up hostname changes within TENANT_DIRECTORY_TTL_SECONDS
         return jsonify({"id": info.id, "message": "Restaurant info updated"}), 200
     except Exception as e:
         db.session.rollback()
         return jsonify({"message": "Error updating restaurant info", "error": str(e)}), 500
 
 # Delivery logic is mostly part of order status updates ("out_for_delivery", "delivered")
-# More complex delivery (driver assignment, live tracking) is out of scope for this initial build
-# but could be added as a separate module/microservice later.
+# Driver runs are planned and sent out in batches by dispatch.py; live tracking is out of scope
+# for this initial build but could be added as a separate module/microservice later.
+@admin_bp.route("/dispatch", methods=["POST"])
+@admin_required
+def dispatch_ready_orders():
+    # Body: {"drivers": ["Ali", "Mona"], "max_stops": 10, "max_orders": 500, "dry_run": false}
+    data = request.get_json(silent=True) or {}
+    drivers = data.get("drivers")
+    if not isinstance(drivers, list) or not drivers or not all(isinstance(d, str) and d.strip() for d in drivers):
+        return jsonify({"message": "drivers must be a non-empty list of names"}), 400
+    try:
+        max_stops = int(data.get("max_stops", 10))
+        max_orders = int(data["max_orders"]) if data.get("max_orders") is not None else None
+    except (TypeError, ValueError):
+        return jsonify({"message": "max_stops and max_orders must be integers"}), 400
+    if max_stops < 1 or (max_orders is not None and max_orders < 1):
+        return jsonify({"message": "max_stops and max_orders must be positive"}), 400
+    try:
+        result = dispatch_orders(current_restaurant_id(), [d.strip() for d in drivers], max_stops, max_orders,
+                                 dry_run=bool(data.get("dry_run")), changed_by=get_jwt_identity())
+        return jsonify(result), 200
+    except Exception as e:
+        return jsonify({"message": "Error dispatching orders", "error": str(e)}), 500
 
@@ -0,0 +1,78 @@
+# backend_app/src/archival.py
+
+# Moves old, finished orders (with their items, payment and status history) out of the hot
+# tables into the *_archive tables, in bounded batches so locks stay short and the job can run
+# alongside live traffic. Read paths (orders.get_user_orders / get_order_details and the admin
+# order details) fall back to the archive, so customers keep their full history.
+#
+#   flask --app src.main archive-orders --days 180 --batch-size 500
+
+from datetime import datetime, timedelta
+
+import click
+from sqlalchemy import select, insert, delete, literal
+
+from .extensions import db
+from .models.models import (Order, OrderItem, Payment, OrderStatusHistory,
+                            ArchivedOrder, ArchivedOrderItem, ArchivedPayment, ArchivedOrderStatusHistory)
+from .queries import ARCHIVABLE_ORDERS
+
+ARCHIVABLE_STATUSES = ("delivered", "cancelled")
+
+# (hot model, archive model), children first so they are deleted before their order
+CHILD_TABLES = [
+    (OrderItem, ArchivedOrderItem),
+    (Payment, ArchivedPayment),
+    (OrderStatusHistory, ArchivedOrderStatusHistory),
+]
+
+def _copy_rows(hot_model, archive_model, where, extra_values=None):
+    """INSERT INTO archive (...) SELECT ... FROM hot WHERE ..., copying every hot column."""
+    names = [column.name for column in hot_model.__table__.columns]
+    columns = [hot_model.__table__.c[name] for name in names]
+    for name, value in (extra_values or {}).items():
+        names.append(name)
+        columns.append(literal(value, archive_model.__table__.c[name].type))
+    return insert(archive_model.__table__).from_select(names, select(*columns).where(where))
+
+def archive_batch(order_ids):
+    """Archive the given orders in a single transaction. Commits."""
+    try:
+        for hot_model, archive_model in CHILD_TABLES:
+            db.session.execute(_copy_rows(hot_model, archive_model, hot_model.order_id.in_(order_ids)))
+        db.session.execute(_copy_rows(Order, ArchivedOrder, Order.id.in_(order_ids), {"archived_at": datetime.utcnow()}))
+        for hot_model, _ in CHILD_TABLES:
+            db.session.execute(delete(hot_model).where(hot_model.order_id.in_(order_ids)).execution_options(synchronize_session=False))
+        db.session.execute(delete(Order).where(Order.id.in_(order_ids)).execution_options(synchronize_session=False))
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+
+def archive_orders(older_than_days=180, batch_size=500, max_batches=None):
+    """Archive delivered/cancelled orders created more than older_than_days ago.
+
+    Returns the number of orders moved.
+    """
+    cutoff = datetime.utcnow() - timedelta(days=older_than_days)
+    archived = 0
+    batches = 0
+    while max_batches is None or batches < max_batches:
+        order_ids = db.session.execute(
+            ARCHIVABLE_ORDERS.limit(batch_size), {"cutoff": cutoff, "statuses": list(ARCHIVABLE_STATUSES)}
+        ).scalars().all()
+        if not order_ids:
+            break
+        archive_batch(order_ids)
+        archived += len(order_ids)
+        batches += 1
+    return archived
+
+def init_archival(app):
+    @app.cli.command("archive-orders")
+    @click.option("--days", default=180, show_default=True, help="Archive finished orders older than this many days.")
+    @click.option("--batch-size", default=500, show_default=True, help="Orders moved per transaction.")
+    @click.option("--max-batches", default=None, type=int, help="Stop after this many batches.")
+    def archive_orders_command(days, batch_size, max_batches):
+        count = archive_orders(days, batch_size, max_batches)
+        click.echo(f"Archived {count} orders older than {days} days")
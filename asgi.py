@@ -0,0 +1,187 @@
+# backend_app/src/asgi.py
+
+# ASGI application for long-lived, I/O-bound endpoints.
+# These requests spend nearly all their time waiting (on the database or the payment gateway),
+# so they run on an event loop with an async SQLAlchemy engine instead of tying up a WSGI thread
+# each. Everything else stays on the Flask app (wsgi.py); route /api/stream/ to this app at the
+# reverse proxy. Run it with:
+#   gunicorn -c gunicorn.conf.py -k uvicorn.workers.UvicornWorker src.asgi:application
+#
+# Endpoints:
+#   GET /api/stream/orders/<id>/events          Server-sent events for status/payment_status changes
+#   GET /api/stream/payments/<order_id>/status  Long-poll until payment is no longer pending (?wait=seconds)
+
+import asyncio
+import json
+import os
+import re
+import time
+
+from flask_jwt_extended import decode_token
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from .main import app
+from .models.models import Order
+from .token_blocklist import blocklist
+
+POLL_SECONDS = float(os.getenv('STREAM_POLL_SECONDS', 2))
+MAX_STREAM_SECONDS = int(os.getenv('STREAM_MAX_SECONDS', 900)) # Clients reconnect with a fresh access token
+MAX_PAYMENT_WAIT_SECONDS = 60
+FINAL_ORDER_STATUSES = ("delivered", "cancelled")
+
+ORDER_EVENTS_PATH = re.compile(r"^/api/stream/orders/(\d+)/events$")
+PAYMENT_STATUS_PATH = re.compile(r"^/api/stream/payments/(\d+)/status$")
+
+# Async drivers for the synchronous URIs main.py is configured with
+ASYNC_DRIVERS = {
+    "mysql+pymysql": "mysql+aiomysql", "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg", "postgresql+psycopg2": "postgresql+asyncpg"
+}
+
+def async_database_uri(uri):
+    scheme, rest = uri.split("://", 1)
+    return f"{ASYNC_DRIVERS.get(scheme, scheme)}://{rest}"
+
+ASYNC_DATABASE_URI = os.getenv('ASYNC_DATABASE_URI') or async_database_uri(app.config['SQLALCHEMY_DATABASE_URI'])
+# SQLite (tests) gets SQLAlchemy's default pool for the file / in-memory database; sizing is for servers
+POOL_OPTIONS = {} if ASYNC_DATABASE_URI.startswith("sqlite") else {
+    "pool_size": int(os.getenv('ASYNC_DB_POOL_SIZE', 10)),
+    "max_overflow": int(os.getenv('ASYNC_DB_MAX_OVERFLOW', 20))
+}
+
+engine = create_async_engine(ASYNC_DATABASE_URI, pool_recycle=3600, pool_pre_ping=True, **POOL_OPTIONS)
+
+async def application(scope, receive, send):
+    if scope["type"] == "lifespan":
+        await _lifespan(receive, send)
+    elif scope["type"] == "http":
+        await _dispatch(scope, receive, send)
+
+async def _lifespan(receive, send):
+    refresher = None
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            refresher = asyncio.create_task(_refresh_blocklist_forever())
+            await send({"type": "lifespan.startup.complete"})
+        elif message["type"] == "lifespan.shutdown":
+            if refresher:
+                refresher.cancel()
+            await engine.dispose()
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+
+async def _refresh_blocklist_forever():
+    # Keep token revocations current without a blocking query on the event loop
+    while True:
+        await asyncio.to_thread(_refresh_blocklist)
+        await asyncio.sleep(blocklist.refresh_interval)
+
+def _refresh_blocklist():
+    with app.app_context():
+        try:
+            blocklist.refresh()
+        finally:
+            app.extensions["sqlalchemy"].session.remove()
+
+async def _dispatch(scope, receive, send):
+    if scope["method"] != "GET":
+        return await _send_json(send, 405, {"message": "Method not allowed"})
+    match = ORDER_EVENTS_PATH.match(scope["path"])
+    handler = order_events
+    if not match:
+        match = PAYMENT_STATUS_PATH.match(scope["path"])
+        handler = payment_status
+    if not match:
+        return await _send_json(send, 404, {"message": "Not found"})
+    user_id = _authenticate(scope)
+    if user_id is None:
+        return await _send_json(send, 401, {"msg": "Missing, invalid or revoked token"})
+    await handler(scope, receive, send, int(match.group(1)), user_id)
+
+def _authenticate(scope):
+    """Identity of a valid, unrevoked access token in the Authorization header, else None."""
+    headers = dict(scope["headers"])
+    auth = headers.get(b"authorization", b"").decode("latin1")
+    if not auth.startswith("Bearer "):
+        return None
+    try:
+        with app.app_context():
+            payload = decode_token(auth[len("Bearer "):])
+    except Exception:
+        return None
+    if payload.get("type") != "access" or blocklist.is_revoked(payload, refresh=False):
+        return None
+    return payload["sub"]
+
+async def _fetch_order_state(order_id, user_id):
+    # A pooled connection is held only for the query, never while sleeping between polls
+    async with engine.connect() as conn:
+        result = await conn.execute(
+            select(Order.status, Order.payment_status).where(Order.id == order_id, Order.user_id == user_id)
+        )
+        return result.first()
+
+async def _wait_for_disconnect(receive):
+    while (await receive())["type"] != "http.disconnect":
+        pass
+
+async def _sleep_unless_disconnected(disconnected, seconds):
+    """Sleep between polls; returns False as soon as the client has gone away."""
+    await asyncio.wait({disconnected}, timeout=seconds)
+    return not disconnected.done()
+
+async def order_events(scope, receive, send, order_id, user_id):
+    state = await _fetch_order_state(order_id, user_id)
+    if state is None:
+        return await _send_json(send, 404, {"message": "Order not found or access denied"})
+    await send({
+        "type": "http.response.start",
+        "status": 200,
+        "headers": [(b"content-type", b"text/event-stream"), (b"cache-control", b"no-cache"), (b"x-accel-buffering", b"no")]
+    })
+    deadline = time.monotonic() + MAX_STREAM_SECONDS
+    last_state = None
+    # A closed tab stops the polling right away instead of at the deadline
+    disconnected = asyncio.create_task(_wait_for_disconnect(receive))
+    try:
+        while state is not None:
+            if tuple(state) != last_state:
+                event = {"order_id": order_id, "status": state.status, "payment_status": state.payment_status}
+                await send({"type": "http.response.body", "body": f"event: order\ndata: {json.dumps(event)}\n\n".encode(), "more_body": True})
+                last_state = tuple(state)
+            if state.status in FINAL_ORDER_STATUSES or time.monotonic() >= deadline:
+                break
+            if not await _sleep_unless_disconnected(disconnected, POLL_SECONDS):
+                return
+            state = await _fetch_order_state(order_id, user_id)
+        await send({"type": "http.response.body", "body": b"", "more_body": False})
+    finally:
+        disconnected.cancel()
+
+async def payment_status(scope, receive, send, order_id, user_id):
+    query = dict(pair.split("=", 1) for pair in scope["query_string"].decode("latin1").split("&") if "=" in pair)
+    try:
+        wait = min(float(query.get("wait", 30)), MAX_PAYMENT_WAIT_SECONDS)
+    except ValueError:
+        return await _send_json(send, 400, {"message": "wait must be a number of seconds"})
+    deadline = time.monotonic() + wait
+    state = await _fetch_order_state(order_id, user_id)
+    if state is None:
+        return await _send_json(send, 404, {"message": "Order not found or access denied"})
+    disconnected = asyncio.create_task(_wait_for_disconnect(receive))
+    try:
+        while state.payment_status == "pending" and time.monotonic() < deadline:
+            if not await _sleep_unless_disconnected(disconnected, POLL_SECONDS):
+                return
+            state = await _fetch_order_state(order_id, user_id)
+            if state is None:
+                return await _send_json(send, 404, {"message": "Order not found or access denied"})
+    finally:
+        disconnected.cancel()
+    await _send_json(send, 200, {"order_id": order_id, "status": state.status, "payment_status": state.payment_status})
+
+async def _send_json(send, status, body):
+    await send({"type": "http.response.start", "status": status, "headers": [(b"content-type", b"application/json")]})
+    await send({"type": "http.response.body", "body": json.dumps(body).encode()})
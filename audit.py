@@ -0,0 +1,292 @@
+# backend_app/src/audit.py
+
+# Audit trail of who changed what (menu, categories, users and roles, restaurant info, orders,
+# order status history, payments), recorded without adding a write to the request.
+#
+# SQLAlchemy session events capture the changes:
+#   - after_flush: ORM changes with per-column before/after values
+#     (the admin menu and role edits, new orders and payments)
+#   - do_orm_execute: set-based INSERT / UPDATE / DELETE statements run through the session
+#     (status transitions, stock reservations, bulk and reconciliation updates). These are
+#     recorded as the statement's WHERE clause and parameters, and only when they matched rows.
+#     A statement whose caller already read the rows it changes passes their before values as
+#     the "audit_before" execution option ({id: {column: value}}), e.g. the from_status of status
+#     transitions and the locked payment_status of payment updates; they are recorded as "before".
+# Entries wait on the session until the transaction commits (a rollback discards them). They
+# then go into a bounded in-process queue. A background thread drains the queue every
+# AUDIT_FLUSH_SECONDS in batches of AUDIT_BATCH_SIZE:
+#   - AUDIT_SINK=database: one executemany INSERT per batch into audit_log
+#   - AUDIT_SINK=ndjson: one appended line per entry in AUDIT_FILE
+#
+# Nothing is dropped:
+#   - When the queue is full, the request writes its own entries synchronously. This is slow
+#     but lossless; if that write fails too, the entries wait for the next flush.
+#   - A batch the sink rejects is retried on the next flush.
+#   - The queue is drained at interpreter exit and, under gunicorn, before forking (pre_fork)
+#     and when a worker exits (worker_exit). Entries the database still rejects then are
+#     appended to AUDIT_FILE instead, to be loaded later.
+
+import atexit
+import json
+import logging
+import queue
+import threading
+from datetime import datetime
+
+from flask import has_request_context, request
+from flask_jwt_extended import get_jwt_identity
+from sqlalchemy import event, inspect, insert
+from sqlalchemy.orm import Session
+
+from .extensions import db
+from .background import run_periodically
+from .health import register_queue
+from .models.models import AuditLog
+
+logger = logging.getLogger(__name__)
+
+AUDITED_TABLES = {"menu_items", "categories", "users", "restaurant_info", "orders", "order_status_history", "payments"}
+REDACTED_COLUMNS = {"password_hash"}
+IGNORED_COLUMNS = {"updated_at"}
+
+def _json_value(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, (str, int, float, bool, type(None), list, dict)):
+        return value
+    return str(value) # Decimal, Enum values and the like
+
+def _clean(values):
+    return {
+        name: "[redacted]" if name in REDACTED_COLUMNS else _json_value(value)
+        for name, value in values.items() if name not in IGNORED_COLUMNS
+    }
+
+def _request_metadata():
+    """(actor user id, endpoint) of the current request, or (None, None) outside one."""
+    if not has_request_context():
+        return None, None
+    try:
+        actor = get_jwt_identity()
+    except RuntimeError: # No JWT verified for this request
+        actor = None
+    return (int(actor) if actor else None), request.endpoint
+
+class AuditLogger:
+    def __init__(self, capacity=10000, batch_size=500):
+        self.enabled = True
+        self.capacity = capacity
+        self.batch_size = batch_size
+        self.sink = "database"
+        self.path = None
+        self.app = None
+        self._queue = queue.Queue(maxsize=capacity)
+        self._retry = [] # A batch the sink rejected; written first next time
+        self._flush_lock = threading.Lock()
+        self.stats = {"enqueued": 0, "written": 0, "written_synchronously": 0, "write_errors": 0}
+
+    def configure(self, app):
+        self.app = app
+        self.enabled = app.config.get("AUDIT_ENABLED", True)
+        self.sink = app.config.get("AUDIT_SINK", "database")
+        self.path = app.config.get("AUDIT_FILE", "audit.ndjson")
+        self.batch_size = app.config.get("AUDIT_BATCH_SIZE", 500)
+        capacity = app.config.get("AUDIT_QUEUE_SIZE", 10000)
+        if capacity != self.capacity:
+            self.capacity = capacity
+            self._queue = queue.Queue(maxsize=capacity)
+
+    def depth(self):
+        return self._queue.qsize() + len(self._retry)
+
+    def enqueue(self, entries):
+        for index, entry in enumerate(entries):
+            try:
+                self._queue.put_nowait(entry)
+            except queue.Full:
+                # Backlog at capacity: write the rest from this thread rather than lose them
+                rest = entries[index:]
+                if self._write_batch(rest):
+                    self.stats["written_synchronously"] += len(rest)
+                else:
+                    with self._flush_lock:
+                        self._retry.extend(rest) # Written first by the next flush
+                break
+            self.stats["enqueued"] += 1
+
+    def flush(self):
+        """Write everything queued so far, in batches. Safe to call from any thread."""
+        with self._flush_lock:
+            if self._retry:
+                batch, self._retry = self._retry, []
+                if not self._write_batch(batch):
+                    self._retry = batch
+                    return
+            while True:
+                batch = []
+                try:
+                    while len(batch) < self.batch_size:
+                        batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    pass
+                if not batch:
+                    return
+                if not self._write_batch(batch):
+                    self._retry = batch
+                    return
+
+    def close(self):
+        """Final flush at shutdown. Whatever the database still rejects goes to the NDJSON file."""
+        self.flush()
+        if self.sink == "ndjson" or not self.depth():
+            return
+        with self._flush_lock:
+            remaining, self._retry = self._retry, []
+            try:
+                while True:
+                    remaining.append(self._queue.get_nowait())
+            except queue.Empty:
+                pass
+            if self._write_batch(remaining, sink="ndjson"):
+                logger.warning("Wrote %d audit entries to %s; load them into audit_log", len(remaining), self.path)
+            else:
+                self._retry = remaining
+                logger.error("%d audit entries could not be written anywhere", len(remaining))
+
+    def _write_batch(self, batch, sink=None):
+        try:
+            batch = [_materialize(entry) for entry in batch]
+            if (sink or self.sink) == "ndjson":
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write("".join(json.dumps(entry, default=str) + "\n" for entry in batch))
+            else:
+                with self.app.app_context():
+                    with db.engine.begin() as connection: # Own connection; never the request's transaction
+                        connection.execute(insert(AuditLog.__table__), [
+                            dict(entry, created_at=datetime.fromisoformat(entry["created_at"])) for entry in batch
+                        ])
+            self.stats["written"] += len(batch)
+            return True
+        except Exception:
+            self.stats["write_errors"] += 1
+            logger.exception("Writing %d audit entries failed; they will be retried", len(batch))
+            return False
+
+audit_log = AuditLogger()
+
+class _StatementChanges:
+    """A set-based statement's WHERE clause and parameters, rendered by the writer thread.
+
+    Compiling the statement costs more than the rest of the capture put together, so requests
+    only keep a reference to the (immutable) statement.
+    """
+    __slots__ = ("statement", "parameters", "before")
+
+    def __init__(self, statement, parameters, before=None):
+        self.statement = statement
+        self.parameters = parameters
+        self.before = before
+
+    def render(self):
+        compiled = self.statement.compile()
+        changes = {
+            "where": str(self.statement.whereclause) if self.statement.whereclause is not None else None,
+            "params": _clean(dict(compiled.params, **(self.parameters or {})))
+        }
+        if self.before is not None:
+            changes["before"] = {str(entity_id): _clean(values) for entity_id, values in self.before.items()}
+        return changes
+
+def _materialize(entry):
+    changes = entry["changes"]
+    return dict(entry, changes=changes.render()) if isinstance(changes, _StatementChanges) else entry
+
+def _entry(action, table_name, entity_id, changes, actor, endpoint):
+    return {
+        "created_at": datetime.utcnow().isoformat(),
+        "actor_user_id": actor,
+        "endpoint": endpoint,
+        "action": action,
+        "table_name": table_name,
+        "entity_id": entity_id,
+        "changes": changes
+    }
+
+def _pending(session):
+    return session.info.setdefault("audit_pending", [])
+
+def _after_flush(session, flush_context):
+    if not audit_log.enabled:
+        return
+    actor, endpoint = None, None
+    metadata_loaded = False
+    for action, objects in (("insert", session.new), ("update", session.dirty), ("delete", session.deleted)):
+        for obj in objects:
+            state = inspect(obj)
+            table_name = state.mapper.local_table.name
+            if table_name not in AUDITED_TABLES:
+                continue
+            if action == "update":
+                before, after = {}, {}
+                for attr in state.mapper.column_attrs:
+                    history = state.attrs[attr.key].history
+                    if history.has_changes():
+                        before[attr.key] = history.deleted[0] if history.deleted else None
+                        after[attr.key] = history.added[0] if history.added else None
+                changes = {"before": _clean(before), "after": _clean(after)}
+                if not changes["after"]:
+                    continue # Only ignored columns changed
+            else:
+                values = {attr.key: state.dict.get(attr.key) for attr in state.mapper.column_attrs}
+                changes = {"after": _clean(values)} if action == "insert" else {"before": _clean(values)}
+            if not metadata_loaded:
+                actor, endpoint = _request_metadata()
+                metadata_loaded = True
+            primary_key = state.mapper.primary_key_from_instance(obj)
+            entity_id = primary_key[0] if len(primary_key) == 1 else None
+            _pending(session).append(_entry(action, table_name, entity_id, changes, actor, endpoint))
+
+def _do_orm_execute(orm_execute_state):
+    if not audit_log.enabled or not (orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    statement = orm_execute_state.statement
+    table_name = getattr(statement.table, "name", None)
+    if table_name not in AUDITED_TABLES:
+        return
+    actor, endpoint = _request_metadata()
+    pending = _pending(orm_execute_state.session)
+    parameters = orm_execute_state.parameters
+    if orm_execute_state.is_insert:
+        rows = parameters if isinstance(parameters, list) else [parameters or {}]
+        for row in rows:
+            pending.append(_entry("insert", table_name, row.get("id"), {"after": _clean(row)}, actor, endpoint))
+    else:
+        # Run the statement here to see whether it changed anything: a conditional UPDATE that
+        # matched no row (e.g. a status transition tried from the wrong source status) did not happen
+        result = orm_execute_state.invoke_statement()
+        if result.rowcount == 0:
+            return result
+        action = "update" if orm_execute_state.is_update else "delete"
+        before = orm_execute_state.execution_options.get("audit_before")
+        changes = _StatementChanges(statement, parameters if isinstance(parameters, dict) else None, before)
+        entity_id = next(iter(before)) if before and len(before) == 1 else None
+        pending.append(_entry(action, table_name, entity_id, changes, actor, endpoint))
+        return result
+
+def _after_commit(session):
+    entries = session.info.pop("audit_pending", None)
+    if entries:
+        audit_log.enqueue(entries)
+
+def _after_rollback(session):
+    session.info.pop("audit_pending", None)
+
+def init_audit(app):
+    audit_log.configure(app)
+    event.listen(Session, "after_flush", _after_flush)
+    event.listen(Session, "do_orm_execute", _do_orm_execute)
+    event.listen(Session, "after_commit", _after_commit)
+    event.listen(Session, "after_rollback", _after_rollback)
+    register_queue("audit_log", audit_log.depth, audit_log.capacity)
+    run_periodically(app, "audit-log", app.config.get("AUDIT_FLUSH_SECONDS", 1.0), audit_log.flush)
+    atexit.register(audit_log.close)
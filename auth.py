@@ -2,10 +2,12 @@
 
 from flask import Blueprint, request, jsonify
 from flask_bcrypt import Bcrypt
-from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity
+from flask_jwt_extended import create_access_token, create_refresh_token, jwt_required, get_jwt_identity, get_jwt, current_user
 
 from ..extensions import db
 from ..models.models import User
+from ..token_blocklist import blocklist
+from ..queries import USER_BY_LOGIN
 
 auth_bp = Blueprint("auth_bp", __name__)
 bcrypt = Bcrypt()
@@ -32,7 +34,7 @@ def register():
         password_hash=hashed_password,
         full_name=full_name,
         phone_number=phone_number,
-        role=\'customer\' # Default role
+        role='customer' # Default role
     )
     db.session.add(new_user)
     db.session.commit()
@@ -47,13 +49,16 @@ def login():
     if not email_or_username or not password:
         return jsonify({"message": "Email/Username and password are required"}), 400
 
-    user = User.query.filter((User.email == email_or_username) | (User.username == email_or_username)).first()
+    user = db.session.execute(USER_BY_LOGIN, {"login": email_or_username}).scalar_one_or_none()
 
     if user and bcrypt.check_password_hash(user.password_hash, password):
-        access_token = create_access_token(identity=user.id)
+        # JWT "sub" must be a string; the id is compared as such everywhere it is used
+        access_token = create_access_token(identity=str(user.id))
+        refresh_token = create_refresh_token(identity=str(user.id))
         return jsonify({
             "message": "Login successful",
             "access_token": access_token,
+            "refresh_token": refresh_token,
             "user": {
                 "id": user.id,
                 "username": user.username,
@@ -67,23 +72,29 @@ def login():
 @auth_bp.route("/me", methods=["GET"])
 @jwt_required()
 def get_current_user():
-    current_user_id = get_jwt_identity()
-    user = User.query.get(current_user_id)
-    if not user:
+    profile = current_user.profile(cached=True) # Profile columns only; may come from the short-TTL cache
+    if not profile:
         return jsonify({"message": "User not found"}), 404
-    
-    return jsonify({
-        "id": user.id,
-        "username": user.username,
-        "email": user.email,
-        "full_name": user.full_name,
-        "phone_number": user.phone_number,
-        "role": user.role
-    }), 200
-
-# Logout is typically handled client-side by deleting the token.
-# If server-side token blocklisting is needed, it requires a more complex setup (e.g., storing revoked tokens).
-# For now, we will rely on client-side token removal for logout.
+    return jsonify(profile), 200
+
+@auth_bp.route("/refresh", methods=["POST"])
+@jwt_required(refresh=True)
+def refresh():
+    # Access tokens are short-lived; clients trade their refresh token for a new one
+    access_token = create_access_token(identity=get_jwt_identity())
+    return jsonify({"access_token": access_token}), 200
+
+@auth_bp.route("/logout", methods=["POST"])
+@jwt_required(verify_type=False)
+def logout():
+    # Revokes the token sent with the request; call once with the access token and once with the refresh token
+    token = get_jwt()
+    try:
+        blocklist.revoke_token(token)
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"message": "Error revoking token", "error": str(e)}), 500
+    return jsonify({"message": f"{token['type'].capitalize()} token revoked"}), 200
 
 def init_bcrypt(app):
     bcrypt.init_app(app)
@@ -0,0 +1,37 @@
+# backend_app/src/background.py
+
+# Periodic in-process jobs (cache refreshers and the like).
+# Threads are started on a worker's first request rather than at import: gunicorn preloads the
+# app in the master and forks workers, and threads do not survive fork.
+
+import os
+import threading
+import time
+
+from .extensions import db
+
+def run_periodically(app, name, interval, job):
+    """Run job() in an app context every `interval` seconds, in a daemon thread per worker process."""
+    if not app.config.get("BACKGROUND_JOBS_ENABLED", True):
+        return # e.g. the test suite, which calls the jobs directly when it needs them
+    started = {"pid": None}
+    start_lock = threading.Lock()
+
+    def run_forever():
+        while True:
+            with app.app_context():
+                try:
+                    job()
+                except Exception:
+                    app.logger.exception("Background job %s failed", name)
+                finally:
+                    db.session.remove()
+            time.sleep(interval)
+
+    @app.before_request
+    def start_background_job():
+        if started["pid"] != os.getpid():
+            with start_lock:
+                if started["pid"] != os.getpid():
+                    started["pid"] = os.getpid()
+                    threading.Thread(target=run_forever, name=name, daemon=True).start()
@@ -0,0 +1,49 @@
+# backend_app/src/cache.py
+
+# Per-process cache for small, read-mostly payloads served to every visitor (the public menu,
+# active categories, restaurant info). Admin writes invalidate the affected keys in their own
+# worker; the TTL bounds how long other workers keep serving the previous copy.
+# Keys are (name, restaurant_id), so every restaurant has its own entries.
+
+import threading
+import time
+
+class PayloadCache:
+    def __init__(self, ttl=30, max_entries=None):
+        self.ttl = ttl
+        self.max_entries = max_entries # Bound for caches keyed by unbounded ids (e.g. user profiles)
+        self._entries = {} # key -> (expires_at, payload)
+        self._lock = threading.Lock()
+
+    def get_or_load(self, key, loader):
+        """Cached payload for key, calling loader() (in the caller's app context) on a miss."""
+        entry = self._entries.get(key)
+        if entry and entry[0] > time.monotonic():
+            return entry[1]
+        payload = loader()
+        with self._lock:
+            if self.max_entries and len(self._entries) >= self.max_entries:
+                self._evict()
+            self._entries[key] = (time.monotonic() + self.ttl, payload)
+        return payload
+
+    def _evict(self):
+        # Drop expired entries; if that frees nothing, start over rather than track recency
+        now = time.monotonic()
+        for key in [key for key, (expires_at, _) in self._entries.items() if expires_at <= now]:
+            del self._entries[key]
+        if len(self._entries) >= self.max_entries:
+            self._entries.clear()
+
+    def invalidate(self, *keys):
+        """Drop the given keys, or everything when called without keys."""
+        with self._lock:
+            if not keys:
+                self._entries.clear()
+            for key in keys:
+                self._entries.pop(key, None)
+
+payload_cache = PayloadCache()
+
+def init_payload_cache(app):
+    payload_cache.ttl = app.config.get("PAYLOAD_CACHE_TTL_SECONDS", 30)
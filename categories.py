@@ -2,40 +2,47 @@
 
 from flask import Blueprint, request, jsonify
 from ..extensions import db
-from ..models.models import Category, MenuItem
+from ..models.models import Category
+from ..serializers import CATEGORY_LIST_FIELDS, select_fieldset, serialize_rows
+from ..queries import ACTIVE_CATEGORIES, CATEGORY_IS_ACTIVE, CATEGORY_MENU_ITEMS
+from ..compression import cached_json_response
+from ..tenancy import current_restaurant_id
+from sqlalchemy import select
 from flask_jwt_extended import jwt_required, get_jwt # For admin-only access if needed later
 
 categories_bp = Blueprint("categories_bp", __name__)
 
+def load_active_categories(restaurant_id):
+    return serialize_rows(db.session.execute(ACTIVE_CATEGORIES, {"restaurant_id": restaurant_id}).all())
+
 @categories_bp.route("/categories", methods=["GET"])
 def get_categories():
     try:
-        categories = Category.query.filter_by(is_active=True).all()
-        return jsonify([{
-            "id": cat.id,
-            "name": cat.name,
-            "description": cat.description,
-            "image_url": cat.image_url
-        } for cat in categories]), 200
+        columns = select_fieldset(CATEGORY_LIST_FIELDS, request.args.get("fields"))
+    except ValueError as e:
+        return jsonify({"message": str(e)}), 400
+    restaurant_id = current_restaurant_id()
+    try:
+        if not request.args.get("fields"):
+            return cached_json_response(("categories", restaurant_id), lambda: load_active_categories(restaurant_id)), 200
+        categories = db.session.execute(
+            select(*columns).where(Category.restaurant_id == restaurant_id, Category.is_active == True)
+        ).all()
+        return jsonify(serialize_rows(categories)), 200
     except Exception as e:
         return jsonify({"message": "Error fetching categories", "error": str(e)}), 500
 
 @categories_bp.route("/categories/<int:category_id>/items", methods=["GET"])
 def get_items_by_category(category_id):
     try:
-        category = Category.query.get(category_id)
-        if not category or not category.is_active:
+        is_active = db.session.execute(
+            CATEGORY_IS_ACTIVE, {"category_id": category_id, "restaurant_id": current_restaurant_id()}
+        ).scalar_one_or_none()
+        if not is_active:
             return jsonify({"message": "Category not found or not active"}), 404
 
-        menu_items = MenuItem.query.filter_by(category_id=category_id, is_available=True).all()
-        return jsonify([{
-            "id": item.id,
-            "name": item.name,
-            "description": item.description,
-            "price": str(item.price), # Convert Decimal to string for JSON
-            "image_url": item.image_url,
-            "is_available": item.is_available
-        } for item in menu_items]), 200
+        menu_items = db.session.execute(CATEGORY_MENU_ITEMS, {"category_id": category_id}).all()
+        return jsonify(serialize_rows(menu_items)), 200
     except Exception as e:
         return jsonify({"message": "Error fetching menu items for category", "error": str(e)}), 500
 
@@ -0,0 +1,131 @@
+# backend_app/src/compression.py
+
+# Response compression for large JSON bodies (admin lists, the full public menu) sent to tablets
+# on slow restaurant Wi-Fi.
+# An after_request hook compresses a response when all of these hold:
+#   - its mimetype is in COMPRESSION_MIMETYPES
+#   - its body is at least COMPRESSION_MIN_SIZE bytes
+#   - the client accepts br or gzip (br is preferred and used only when the brotli package is installed)
+# The levels come from COMPRESSION_GZIP_LEVEL and COMPRESSION_BROTLI_QUALITY.
+# Streamed, file-backed and already-encoded responses (e.g. precompressed static assets) pass through.
+#
+# Payloads served from payload_cache (menu, categories, restaurant info) go through
+# cached_json_response instead. It keeps the serialized and compressed bytes next to the cached
+# payload, so a cache hit neither re-serializes nor recompresses. The bytes are rebuilt when
+# payload_cache hands out a new payload object (reload or invalidation).
+
+import gzip
+import threading
+
+from flask import current_app, request
+
+from .cache import payload_cache
+
+try:
+    import brotli
+except ImportError: # Optional: without it responses are only gzip-compressed
+    brotli = None
+
+DEFAULT_MIMETYPES = ("application/json", "text/html", "text/plain", "text/css", "text/csv",
+                     "application/javascript", "text/javascript", "image/svg+xml")
+
+class Compressor:
+    def __init__(self, min_size=1024, gzip_level=6, brotli_quality=4, mimetypes=DEFAULT_MIMETYPES):
+        self.enabled = True
+        self.min_size = min_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality # Low qualities are fast enough to run per request
+        self.mimetypes = frozenset(mimetypes)
+
+    def choose_encoding(self):
+        """The best encoding the current request accepts, or None."""
+        accepted = request.accept_encodings
+        if brotli and accepted["br"]:
+            return "br"
+        if accepted["gzip"]:
+            return "gzip"
+        return None
+
+    def compress(self, data, encoding):
+        if encoding == "br":
+            return brotli.compress(data, quality=self.brotli_quality)
+        return gzip.compress(data, compresslevel=self.gzip_level, mtime=0)
+
+    def eligible(self, response):
+        return (
+            self.enabled
+            and response.status_code == 200
+            and not response.direct_passthrough
+            and not response.is_streamed
+            and "Content-Encoding" not in response.headers
+            and response.mimetype in self.mimetypes
+        )
+
+    def compress_response(self, response):
+        if not self.eligible(response):
+            return response
+        data = response.get_data()
+        if len(data) < self.min_size:
+            return response
+        response.vary.add("Accept-Encoding") # Whether compressed depends on the request from here on
+        encoding = self.choose_encoding()
+        if encoding is None:
+            return response
+        compressed = self.compress(data, encoding)
+        if len(compressed) >= len(data):
+            return response
+        response.set_data(compressed) # Also updates Content-Length
+        response.headers["Content-Encoding"] = encoding
+        if response.get_etag()[0]:
+            response.add_etag(overwrite=True, weak=True) # A strong ETag must differ per encoding
+        return response
+
+compressor = Compressor()
+
+class _EncodedPayload:
+    __slots__ = ("payload", "bodies", "lock")
+
+    def __init__(self, payload, body):
+        self.payload = payload
+        self.bodies = {None: body} # Content encoding -> bytes
+        self.lock = threading.Lock()
+
+    def body(self, encoding):
+        data = self.bodies.get(encoding)
+        if data is None:
+            with self.lock: # Concurrent first requests compress once
+                data = self.bodies.get(encoding)
+                if data is None:
+                    data = compressor.compress(self.bodies[None], encoding)
+                    self.bodies[encoding] = data
+        return data
+
+_encoded = {} # payload_cache key -> _EncodedPayload for the payload currently cached under it
+
+def cached_json_response(key, loader):
+    """JSON response for payload_cache[key], reusing its serialized and compressed bytes."""
+    payload = payload_cache.get_or_load(key, loader)
+    entry = _encoded.get(key)
+    if entry is None or entry.payload is not payload:
+        entry = _EncodedPayload(payload, current_app.json.response(payload).get_data())
+        _encoded[key] = entry
+    response = current_app.response_class(entry.bodies[None], mimetype="application/json")
+    if not compressor.enabled or len(entry.bodies[None]) < compressor.min_size:
+        return response
+    response.vary.add("Accept-Encoding")
+    encoding = compressor.choose_encoding()
+    if encoding:
+        response.set_data(entry.body(encoding))
+        response.headers["Content-Encoding"] = encoding # Tells the after_request hook to leave it alone
+    return response
+
+def init_compression(app):
+    compressor.enabled = app.config.get("COMPRESSION_ENABLED", True)
+    compressor.min_size = app.config.get("COMPRESSION_MIN_SIZE", 1024)
+    compressor.gzip_level = app.config.get("COMPRESSION_GZIP_LEVEL", 6)
+    compressor.brotli_quality = app.config.get("COMPRESSION_BROTLI_QUALITY", 4)
+    compressor.mimetypes = frozenset(app.config.get("COMPRESSION_MIMETYPES") or DEFAULT_MIMETYPES)
+
+    @app.after_request
+    def compress_response(response):
+        return compressor.compress_response(response)
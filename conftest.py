@@ -0,0 +1,138 @@
+# backend_app/tests/conftest.py
+
+# Test harness: the whole app on an in-memory SQLite database, no MySQL server needed.
+# Every pytest process imports the app once and so gets its own in-memory database; with
+# pytest-xdist each worker is such a process. Before every test the tables are emptied, the
+# fixture rows below are inserted again and the per-process caches are reset, so tests are
+# independent and run in any order. From backend_app/:
+#   pip install -r requirements-dev.txt
+#   pytest -n auto
+#
+# Fixture data (ids are fixed so tests can refer to them):
+#   restaurants  1 "Main Street" (main.example.com, the default), 2 "Harbour" (harbour.example.com)
+#   users        1 alice, 2 bob (customers); 3 admin (restaurant 1); 4 harbour_staff (staff,
+#                restaurant 2); 5 owner (admin, all_restaurants). Password: PASSWORD
+#   addresses    1 alice's (default), 2 bob's
+#   categories   1 Mains, 2 Drinks, 3 Retired (inactive) in restaurant 1; 4 Pizza in restaurant 2
+#   menu items   1 Burger 9.50, 2 Fries 3.25 (Mains), 3 Cola 2.00 (Drinks), 4 Old Special 5.00
+#                (Retired), 5 Soup 4.00 (unavailable), 6 Limited Pie 6.00 (stock 2);
+#                7 Margherita 12.00 (restaurant 2)
+
+import os
+import sys
+
+# Set before the app is imported: main.py reads its configuration at import time
+os.environ["DATABASE_URL"] = "sqlite:///:memory:"
+os.environ["DEFAULT_RESTAURANT_ID"] = "1"
+os.environ["WARMUP_ENABLED"] = "false"
+os.environ["RATE_LIMIT_ENABLED"] = "false"
+os.environ["AUDIT_ENABLED"] = "false"
+os.environ["BACKGROUND_JOBS_ENABLED"] = "false" # No threads sharing the in-memory connection
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import bcrypt
+import pytest
+from flask_jwt_extended import create_access_token
+
+from src.main import app as flask_app
+from src.extensions import db
+from src.models.models import User, Address, RestaurantInfo, Category, MenuItem
+from src.cache import payload_cache
+from src.compression import _encoded as encoded_payloads
+from src.identity import profile_cache
+from src.pricing import price_table
+from src.tenancy import directory, RESTAURANT_HEADER
+from src.token_blocklist import blocklist
+from src.recommendations import index as recommendation_index
+
+PASSWORD = "correct horse"
+# Cheap bcrypt rounds; login verifies any cost factor
+PASSWORD_HASH = bcrypt.hashpw(PASSWORD.encode(), bcrypt.gensalt(rounds=4)).decode()
+
+ALICE, BOB, ADMIN, HARBOUR_STAFF, OWNER = 1, 2, 3, 4, 5
+MAIN_STREET, HARBOUR = 1, 2
+
+def seed():
+    db.session.add_all([
+        RestaurantInfo(id=MAIN_STREET, name="Main Street", hostname="main.example.com"),
+        RestaurantInfo(id=HARBOUR, name="Harbour", hostname="harbour.example.com"),
+    ])
+    for user_id, username, role, restaurant_id, all_restaurants in (
+            (ALICE, "alice", "customer", None, False), (BOB, "bob", "customer", None, False),
+            (ADMIN, "admin", "admin", MAIN_STREET, False), (HARBOUR_STAFF, "harbour_staff", "staff", HARBOUR, False),
+            (OWNER, "owner", "admin", MAIN_STREET, True)):
+        db.session.add(User(id=user_id, username=username, email=f"{username}@example.com", password_hash=PASSWORD_HASH,
+                            role=role, restaurant_id=restaurant_id, all_restaurants=all_restaurants))
+    db.session.add_all([
+        Address(id=1, user_id=ALICE, address_line1="1 Nile St", city="Cairo", postal_code="11511", country="EG", is_default=True),
+        Address(id=2, user_id=BOB, address_line1="2 Nile St", city="Cairo", postal_code="11512", country="EG"),
+        Category(id=1, restaurant_id=MAIN_STREET, name="Mains"),
+        Category(id=2, restaurant_id=MAIN_STREET, name="Drinks"),
+        Category(id=3, restaurant_id=MAIN_STREET, name="Retired", is_active=False),
+        Category(id=4, restaurant_id=HARBOUR, name="Pizza"),
+    ])
+    for item_id, restaurant_id, category_id, name, price, extra in (
+            (1, MAIN_STREET, 1, "Burger", "9.50", {}), (2, MAIN_STREET, 1, "Fries", "3.25", {}),
+            (3, MAIN_STREET, 2, "Cola", "2.00", {}), (4, MAIN_STREET, 3, "Old Special", "5.00", {}),
+            (5, MAIN_STREET, 1, "Soup", "4.00", {"is_available": False}),
+            (6, MAIN_STREET, 1, "Limited Pie", "6.00", {"stock_quantity": 2}),
+            (7, HARBOUR, 4, "Margherita", "12.00", {})):
+        db.session.add(MenuItem(id=item_id, restaurant_id=restaurant_id, category_id=category_id, name=name,
+                                description=f"{name} description", price=price, **extra))
+    db.session.commit()
+
+def reset_process_state():
+    """Forget everything the previous test left in this process's caches and indexes."""
+    payload_cache.invalidate()
+    profile_cache.invalidate()
+    encoded_payloads.clear()
+    blocklist._revoked_jtis.clear()
+    blocklist._user_cutoffs.clear()
+    blocklist._last_id, blocklist._last_revoked_at, blocklist._next_refresh = 0, None, 0
+    recommendation_index._partitions.clear()
+    recommendation_index._counted.clear()
+    recommendation_index.last_order_id, recommendation_index._next_rebuild = 0, 0
+    directory.load()
+    price_table.load()
+
+@pytest.fixture(scope="session")
+def app():
+    return flask_app
+
+@pytest.fixture(autouse=True)
+def database(app):
+    with app.app_context():
+        for table in reversed(db.metadata.sorted_tables):
+            db.session.execute(table.delete())
+        db.session.commit()
+        seed()
+        reset_process_state()
+        db.session.remove()
+    yield db
+    with app.app_context():
+        db.session.remove()
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+@pytest.fixture
+def auth(app):
+    """auth(user_id, restaurant_id=None) -> request headers with an access token for that user."""
+    def headers(user_id, restaurant_id=None):
+        with app.app_context():
+            result = {"Authorization": f"Bearer {create_access_token(identity=str(user_id))}"}
+        if restaurant_id is not None:
+            result[RESTAURANT_HEADER] = str(restaurant_id)
+        return result
+    return headers
+
+@pytest.fixture
+def place_order(client, auth):
+    """place_order(items, user_id=ALICE, address_id=1, restaurant_id=None) -> the create-order response."""
+    def place(items, user_id=ALICE, address_id=1, restaurant_id=None, **body):
+        return client.post("/api/orders", headers=auth(user_id, restaurant_id), json=dict(
+            body, delivery_address_id=address_id,
+            items=[{"menu_item_id": item_id, "quantity": quantity} for item_id, quantity in items]))
+    return place
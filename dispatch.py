@@ -0,0 +1,201 @@
+# backend_app/src/dispatch.py
+
+# Delivery dispatch: groups orders that are ready to leave into driver runs and sends each run
+# out in one go.
+#
+# A dispatch cycle:
+#   1. reads the restaurant's "preparing" orders with their delivery city and postal code
+#      (one query, oldest first)
+#   2. groups them into zones by (city, postal code)
+#   3. orders the zones into one route with a nearest-neighbour tour started at the oldest
+#      order's zone, improved by 2-opt over a zone distance table built for this cycle
+#   4. cuts the route into consecutive runs of at most max_stops orders, one per driver
+#   5. moves every planned order to "out_for_delivery" with its driver and stop number, all in
+#      one transaction (order_state.transition_orders)
+# Orders that do not fit the available drivers stay "preparing" for the next cycle. Orders that
+# changed status meanwhile are reported as skipped.
+#
+# Distances come from RestaurantInfo.delivery_zones when it lists zone coordinates, e.g.
+#   [{"postal_code": "11511", "city": "Cairo", "lat": 30.05, "lng": 31.24}, ...]
+# (haversine km). Postal codes without coordinates fall back to a postal-code proximity
+# estimate: codes that share a longer prefix are closer, and another city is further still.
+
+import math
+from collections import OrderedDict
+
+from sqlalchemy import select, case
+
+from .extensions import db
+from .models.models import Order, RestaurantInfo
+from .order_state import transition_orders
+from .queries import DISPATCH_CANDIDATES
+
+DISPATCH_FROM_STATUS = "preparing" # The only status that may legally move to out_for_delivery
+OTHER_CITY_DISTANCE = 50.0
+
+def zone_key(city, postal_code):
+    return ((city or "").strip().lower(), (postal_code or "").replace(" ", "").upper())
+
+def _coordinates(delivery_zones):
+    """zone key (or postal code alone) -> (lat, lng) from RestaurantInfo.delivery_zones."""
+    coordinates = {}
+    for zone in delivery_zones if isinstance(delivery_zones, list) else []:
+        if not isinstance(zone, dict) or zone.get("lat") is None or zone.get("lng") is None:
+            continue
+        try:
+            point = (float(zone["lat"]), float(zone["lng"]))
+        except (TypeError, ValueError):
+            continue
+        postal_code = zone_key(None, zone.get("postal_code"))[1]
+        coordinates[zone_key(zone.get("city"), postal_code) if zone.get("city") else postal_code] = point
+    return coordinates
+
+def _haversine_km(a, b):
+    lat1, lng1, lat2, lng2 = map(math.radians, (a[0], a[1], b[0], b[1]))
+    h = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lng2 - lng1) / 2) ** 2
+    return 12742 * math.asin(math.sqrt(h))
+
+def _postal_distance(a, b):
+    city_a, code_a = a
+    city_b, code_b = b
+    shared = 0
+    for char_a, char_b in zip(code_a, code_b):
+        if char_a != char_b:
+            break
+        shared += 1
+    distance = float(max(len(code_a), len(code_b)) - shared)
+    return distance + (OTHER_CITY_DISTANCE if city_a != city_b else 0.0)
+
+def distance_table(zones, delivery_zones=None):
+    """Symmetric matrix (list of lists) of distances between the given zone keys."""
+    coordinates = _coordinates(delivery_zones)
+    points = [coordinates.get(zone) or coordinates.get(zone[1]) for zone in zones]
+    size = len(zones)
+    table = [[0.0] * size for _ in range(size)]
+    for i in range(size):
+        for j in range(i + 1, size):
+            if points[i] and points[j]:
+                distance = _haversine_km(points[i], points[j])
+            else:
+                distance = _postal_distance(zones[i], zones[j])
+            table[i][j] = table[j][i] = distance
+    return table
+
+def nearest_neighbour_route(table, start=0):
+    """Visit order (indexes into table) that always moves to the closest unvisited zone."""
+    unvisited = set(range(len(table))) - {start}
+    route = [start]
+    while unvisited:
+        row = table[route[-1]]
+        nearest = min(unvisited, key=row.__getitem__)
+        unvisited.remove(nearest)
+        route.append(nearest)
+    return route
+
+def two_opt(route, table, max_passes=10):
+    """Improve an open route (fixed start, free end) by reversing segments while that shortens it."""
+    route = list(route)
+    size = len(route)
+    for _ in range(max_passes):
+        improved = False
+        for i in range(1, size - 1):
+            a, b = route[i - 1], route[i]
+            row_a, row_b = table[a], table[b]
+            for j in range(i + 1, size):
+                c = route[j]
+                # Reversing route[i..j]: edges (a, b) and (c, d) become (a, c) and (b, d)
+                if j + 1 < size:
+                    d = route[j + 1]
+                    delta = row_a[c] + row_b[d] - row_a[b] - table[c][d]
+                else:
+                    delta = row_a[c] - row_a[b]
+                if delta < -1e-9:
+                    route[i:j + 1] = reversed(route[i:j + 1])
+                    a, b = route[i - 1], route[i]
+                    row_a, row_b = table[a], table[b]
+                    improved = True
+        if not improved:
+            break
+    return route
+
+def load_dispatch_candidates(restaurant_id, limit=None):
+    """(order id, city, postal code) of the restaurant's orders ready to leave, oldest first."""
+    return db.session.execute(
+        DISPATCH_CANDIDATES.limit(limit), {"restaurant_id": restaurant_id, "status": DISPATCH_FROM_STATUS}
+    ).all()
+
+def plan_runs(candidates, drivers, max_stops, delivery_zones=None):
+    """Split candidate rows into at most len(drivers) runs of at most max_stops orders.
+
+    Returns (runs, unassigned_order_ids); each run is {"driver", "stops": [row, ...]} in
+    delivery order.
+    """
+    zones = OrderedDict() # Zone key -> candidate rows; insertion order keeps the oldest zone first
+    for row in candidates:
+        zones.setdefault(zone_key(row.city, row.postal_code), []).append(row)
+    if not zones:
+        return [], []
+    keys = list(zones)
+    table = distance_table(keys, delivery_zones)
+    route = two_opt(nearest_neighbour_route(table), table)
+
+    runs, current = [], []
+    for index in route:
+        for row in zones[keys[index]]:
+            if len(current) == max_stops:
+                runs.append(current)
+                current = []
+            current.append(row)
+    if current:
+        runs.append(current)
+    assigned = [{"driver": driver, "stops": stops} for driver, stops in zip(drivers, runs)]
+    unassigned = [row.id for stops in runs[len(drivers):] for row in stops]
+    return assigned, unassigned
+
+def assign_runs(runs, changed_by=None):
+    """Send every planned order out with its driver and stop number in one transaction.
+
+    Returns the ids that were moved; the others changed status since they were planned.
+    Does not commit; the caller owns the transaction.
+    """
+    drivers, sequences = {}, {}
+    for run in runs:
+        for sequence, row in enumerate(run["stops"], start=1):
+            drivers[row.id] = run["driver"]
+            sequences[row.id] = sequence
+    if not drivers:
+        return []
+    return transition_orders(
+        list(drivers), "out_for_delivery", DISPATCH_FROM_STATUS, changed_by=changed_by, source="dispatch",
+        values={
+            "driver": case(drivers, value=Order.id),
+            "delivery_sequence": case(sequences, value=Order.id)
+        }
+    )
+
+def dispatch_orders(restaurant_id, drivers, max_stops=10, max_orders=None, dry_run=False, changed_by=None):
+    """Plan and (unless dry_run) assign one dispatch cycle. Commits."""
+    delivery_zones = db.session.execute(
+        select(RestaurantInfo.delivery_zones).where(RestaurantInfo.id == restaurant_id)
+    ).scalar_one_or_none()
+    candidates = load_dispatch_candidates(restaurant_id, max_orders)
+    runs, unassigned = plan_runs(candidates, drivers, max_stops, delivery_zones)
+    moved = set()
+    if not dry_run:
+        try:
+            moved = set(assign_runs(runs, changed_by))
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+    result_runs, skipped = [], []
+    for run in runs:
+        stops = []
+        for sequence, row in enumerate(run["stops"], start=1):
+            if dry_run or row.id in moved:
+                stops.append({"order_id": row.id, "sequence": sequence, "city": row.city, "postal_code": row.postal_code})
+            else:
+                skipped.append(row.id)
+        if stops:
+            result_runs.append({"driver": run["driver"], "stops": stops})
+    return {"dry_run": dry_run, "runs": result_runs, "unassigned": unassigned, "skipped": skipped}
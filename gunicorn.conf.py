@@ -0,0 +1,45 @@
+# backend_app/gunicorn.conf.py
+
+# Gunicorn settings for the Flask app (wsgi:app) and the ASGI streaming app (src.asgi:application).
+# Every value can be overridden through the environment or on the command line.
+
+import multiprocessing
+import os
+
+bind = os.getenv("BIND", f"0.0.0.0:{os.getenv('PORT', '5000')}")
+workers = int(os.getenv("WEB_CONCURRENCY", multiprocessing.cpu_count() * 2 + 1))
+# Threaded workers: requests blocked on MySQL release the GIL, so a few threads per process
+# raise throughput without the memory cost of more processes
+worker_class = os.getenv("WORKER_CLASS", "gthread")
+threads = int(os.getenv("THREADS", 4))
+timeout = int(os.getenv("TIMEOUT", 30))
+graceful_timeout = 30
+keepalive = 5
+# Recycle workers periodically to contain slow memory growth
+max_requests = int(os.getenv("MAX_REQUESTS", 5000))
+max_requests_jitter = 500
+# Import the app once in the master so create_all() runs once and workers fork warm
+preload_app = True
+accesslog = "-"
+
+def post_fork(server, worker):
+    # Connections opened in the master must not be shared with forked workers
+    from src.extensions import db
+    from src.main import app
+    from src.warmup import warm_worker
+    with app.app_context():
+        db.engine.dispose(close=False)
+    # The ready flag inherited from the master is cleared until this worker's own pool is warm
+    if not warm_worker(app) and app.config.get("WARMUP_ENABLED", True):
+        worker.log.warning("Worker warmup failed; /api/ready reports not ready and retries")
+
+def pre_fork(server, worker):
+    # Write audit entries queued in the master (e.g. by startup) so workers don't inherit copies;
+    # close() falls back to AUDIT_FILE if the database rejects them
+    from src.audit import audit_log
+    audit_log.close()
+
+def worker_exit(server, worker):
+    # Lossless shutdown: write whatever this worker still has queued (to AUDIT_FILE if the database fails)
+    from src.audit import audit_log
+    audit_log.close()
@@ -0,0 +1,153 @@
+# backend_app/src/health.py
+
+# Liveness and readiness checks for the load balancer.
+# Nothing here may add load in proportion to probe traffic: the database probe (SELECT 1) runs
+# at most once per HEALTH_DB_PROBE_SECONDS per worker, concurrent probes reuse the last result,
+# and it is skipped while the pool is exhausted (a probe would only queue behind real requests).
+#
+#   liveness  (/api/health) - fails only after HEALTH_LIVENESS_DB_FAILURES consecutive failed DB
+#                             probes, i.e. this worker's connections are beyond recovery
+#   readiness (/api/ready)  - fails while warming up, when the last DB probe failed, or when pool
+#                             saturation, queue backlog or the recent 5xx rate exceed their limits
+
+import threading
+import time
+
+from flask import request
+from sqlalchemy import text
+
+from .extensions import db
+
+# name -> (depth(), capacity) for in-process queues whose backlog should gate readiness
+queues = {}
+
+def register_queue(name, depth, capacity):
+    queues[name] = (depth, capacity)
+
+class ErrorRateWindow:
+    """Response counts per second over the last `window` seconds: [second, requests, 5xx]."""
+
+    def __init__(self, window=60):
+        self.window = window
+        self._buckets = [[0, 0, 0] for _ in range(window)]
+        self._lock = threading.Lock()
+
+    def record(self, status_code, now=None):
+        second = int(now or time.time())
+        with self._lock:
+            bucket = self._buckets[second % self.window]
+            if bucket[0] != second:
+                bucket[:] = [second, 0, 0]
+            bucket[1] += 1
+            if status_code >= 500:
+                bucket[2] += 1
+
+    def totals(self, now=None):
+        oldest = int(now or time.time()) - self.window
+        with self._lock:
+            live = [bucket for bucket in self._buckets if bucket[0] > oldest]
+        return sum(bucket[1] for bucket in live), sum(bucket[2] for bucket in live)
+
+class DatabaseProbe:
+    def __init__(self, interval=5):
+        self.interval = interval
+        self.checked_at = 0
+        self.ok = None
+        self.latency_ms = None
+        self.error = None
+        self.consecutive_failures = 0
+        self._lock = threading.Lock()
+
+    def check(self, pool_exhausted=False):
+        """Last probe result, re-probing when it is older than `interval`."""
+        if time.monotonic() - self.checked_at >= self.interval and not pool_exhausted:
+            if self._lock.acquire(blocking=False): # Another thread is probing; use the last result
+                try:
+                    self._probe()
+                finally:
+                    self._lock.release()
+        return {"ok": self.ok, "latency_ms": self.latency_ms, "error": self.error,
+                "age_seconds": round(time.monotonic() - self.checked_at, 1) if self.checked_at else None}
+
+    def _probe(self):
+        started = time.perf_counter()
+        try:
+            with db.engine.connect() as connection:
+                connection.execute(text("SELECT 1"))
+            self.ok, self.error, self.consecutive_failures = True, None, 0
+        except Exception as e:
+            self.ok, self.error = False, str(e)
+            self.consecutive_failures += 1
+        self.latency_ms = round((time.perf_counter() - started) * 1000, 2)
+        self.checked_at = time.monotonic()
+
+def pool_status():
+    pool = db.engine.pool
+    if not hasattr(pool, "checkedout"):
+        return {"checked_out": None, "capacity": None, "saturation": 0.0} # Not a sized pool (e.g. SQLite)
+    capacity = pool.size() + max(getattr(pool, "_max_overflow", 0), 0)
+    checked_out = pool.checkedout()
+    return {"checked_out": checked_out, "capacity": capacity, "saturation": round(checked_out / capacity, 3) if capacity else 0.0}
+
+class HealthMonitor:
+    def __init__(self):
+        self.db_probe = DatabaseProbe()
+        self.errors = ErrorRateWindow()
+        self.max_pool_saturation = 0.9
+        self.max_queue_fill = 0.8
+        self.max_error_rate = 0.2
+        self.error_rate_min_requests = 20
+        self.liveness_db_failures = 3
+        # The probes' own 503s must not count, or a failing readiness check would keep itself failing
+        self.exempt_endpoints = {"health_check", "readiness_check"}
+
+    def configure(self, config):
+        self.db_probe.interval = config.get("HEALTH_DB_PROBE_SECONDS", 5)
+        self.errors = ErrorRateWindow(config.get("HEALTH_ERROR_WINDOW_SECONDS", 60))
+        self.max_pool_saturation = config.get("HEALTH_MAX_POOL_SATURATION", 0.9)
+        self.max_queue_fill = config.get("HEALTH_MAX_QUEUE_FILL", 0.8)
+        self.max_error_rate = config.get("HEALTH_MAX_ERROR_RATE", 0.2)
+        self.error_rate_min_requests = config.get("HEALTH_ERROR_RATE_MIN_REQUESTS", 20)
+        self.liveness_db_failures = config.get("HEALTH_LIVENESS_DB_FAILURES", 3)
+
+    def record_response(self, response):
+        if request.endpoint not in self.exempt_endpoints:
+            self.errors.record(response.status_code)
+        return response
+
+    def liveness(self):
+        pool = pool_status()
+        database = self.db_probe.check(pool_exhausted=pool["saturation"] >= 1)
+        alive = self.db_probe.consecutive_failures < self.liveness_db_failures
+        return {"status": "healthy" if alive else "unhealthy", "database": database}, 200 if alive else 503
+
+    def readiness(self):
+        """(checks, failures): every check's details and the names of those over their limit."""
+        pool = pool_status()
+        database = self.db_probe.check(pool_exhausted=pool["saturation"] >= 1)
+        requests, server_errors = self.errors.totals()
+        error_rate = round(server_errors / requests, 3) if requests else 0.0
+        backlog = {name: {"depth": depth(), "capacity": capacity} for name, (depth, capacity) in queues.items()}
+        checks = {
+            "database": database,
+            "pool": pool,
+            "queues": backlog,
+            "errors": {"requests": requests, "server_errors": server_errors, "error_rate": error_rate,
+                       "window_seconds": self.errors.window}
+        }
+        failures = []
+        if database["ok"] is False:
+            failures.append("database")
+        if pool["saturation"] > self.max_pool_saturation:
+            failures.append("pool")
+        failures += [f"queue:{name}" for name, queue in backlog.items()
+                     if queue["capacity"] and queue["depth"] / queue["capacity"] > self.max_queue_fill]
+        if requests >= self.error_rate_min_requests and error_rate > self.max_error_rate:
+            failures.append("errors")
+        return checks, failures
+
+monitor = HealthMonitor()
+
+def init_health(app):
+    monitor.configure(app.config)
+    app.after_request(monitor.record_response)
@@ -0,0 +1,57 @@
+# backend_app/src/identity.py
+
+# Request-scoped current user for @jwt_required() routes.
+# Flask-JWT-Extended calls the user lookup loader once per request after verifying the token;
+# it returns a CurrentUser (flask_jwt_extended.current_user) that knows only the token's id.
+# The profile columns are read on first use with one projected query (queries.USER_PROFILE)
+# and shared by everything that asks for them later in the request, e.g. admin_required and
+# the handler itself.
+#
+# /api/auth/me may also serve profiles from a short-TTL per-worker cache
+# (PROFILE_CACHE_TTL_SECONDS, 0 disables it). Role and restaurant checks never use the cache, so
+# a demotion or a move to another branch takes effect on the next request.
+
+from .extensions import db
+from .cache import PayloadCache
+from .queries import USER_PROFILE
+
+profile_cache = PayloadCache(ttl=0, max_entries=10000)
+
+_NOT_LOADED = object()
+
+class CurrentUser:
+    __slots__ = ("id", "_profile")
+
+    def __init__(self, user_id):
+        self.id = int(user_id)
+        self._profile = _NOT_LOADED
+
+    def profile(self, cached=False):
+        """Profile fields as a dict, or None if the user no longer exists. At most one query per request."""
+        if self._profile is _NOT_LOADED:
+            if cached and profile_cache.ttl > 0:
+                self._profile = profile_cache.get_or_load(self.id, self._load)
+            else:
+                self._profile = self._load()
+        return self._profile
+
+    @property
+    def role(self):
+        profile = self.profile()
+        return profile["role"] if profile else None
+
+    def works_for(self, restaurant_id):
+        """Whether this staff/admin account may manage restaurant_id: its own, or any with all_restaurants."""
+        profile = self.profile()
+        return bool(profile) and (profile["all_restaurants"] or profile["restaurant_id"] == restaurant_id)
+
+    def _load(self):
+        row = db.session.execute(USER_PROFILE, {"user_id": self.id}).first()
+        return row._asdict() if row else None
+
+def init_identity(app, jwt):
+    profile_cache.ttl = app.config.get("PROFILE_CACHE_TTL_SECONDS", 0)
+
+    @jwt.user_lookup_loader
+    def load_current_user(jwt_header, jwt_payload):
+        return CurrentUser(jwt_payload["sub"])
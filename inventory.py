@@ -0,0 +1,132 @@
+# backend_app/src/inventory.py
+
+# Per-item stock for limited menu items (MenuItem.stock_quantity; NULL = not tracked).
+# orders.create_order reserves the stock of an order with a single conditional UPDATE:
+#   UPDATE menu_items SET stock_quantity = stock_quantity - <qty of that id> ...
+#    WHERE id IN (...) AND stock_quantity >= <qty of that id>
+# The order either gets all its items or none.
+#
+# Lock order matters on InnoDB. order_items.menu_item_id has a foreign key to menu_items, so
+# inserting an order line takes a shared lock on its menu_items row. If the stock UPDATE came
+# after the insert, two orders for the same hot item would each hold that shared lock and wait
+# for the other to release it before upgrading to exclusive: a deadlock. create_order therefore
+# reserves first, before the order and its lines are inserted. The UPDATE takes the exclusive
+# row locks directly. Every order takes them in primary-key order, so concurrent orders queue on
+# the hot items they share without ever waiting on each other in a cycle. The later foreign-key
+# checks find the rows already locked by this transaction. The hot rows stay locked while the
+# order and its lines are inserted and committed.
+# benchmarks/stock_contention.py measures this under concurrency.
+#
+# Each order line records what it reserved (OrderItem.reserved_quantity), and a cancellation
+# puts back exactly that: items that started tracking stock after the order was placed are not
+# credited, and items that stopped tracking keep their NULL.
+#
+# is_available follows the stock: the reservation that takes an item to zero marks it
+# unavailable and sold_out. A release (cancellation) marks only sold_out items available again;
+# an item an admin switched off by hand stays off. Flips update this worker's price table and cached public menu right away;
+# other workers pick them up with their periodic reload / payload TTL, and create_order always
+# checks the database.
+
+from sqlalchemy import select, update, case, func, and_
+
+from .extensions import db
+from .models.models import MenuItem, OrderItem
+from .pricing import price_table
+from .cache import payload_cache
+
+def parse_stock_quantity(value):
+    """None (untracked) or a non-negative int. Raises ValueError."""
+    if value is None:
+        return None
+    try:
+        stock_quantity = int(value)
+    except (TypeError, ValueError):
+        stock_quantity = -1
+    if isinstance(value, bool) or stock_quantity < 0:
+        raise ValueError("stock_quantity must be a non-negative integer or null")
+    return stock_quantity
+
+def reserve_stock(restaurant_id, quantities):
+    """Take {menu_item_id: quantity} of tracked items out of stock, all or nothing.
+
+    Returns True on success. On False nothing was reserved and the caller must roll back.
+    Does not commit.
+    """
+    if not quantities:
+        return True
+    amount = case(quantities, value=MenuItem.id)
+    stmt = (
+        update(MenuItem)
+        .where(MenuItem.id.in_(sorted(quantities)), MenuItem.restaurant_id == restaurant_id,
+               MenuItem.stock_quantity >= amount)
+        # sold_out and is_available first: MySQL evaluates SET left to right, so they must see the
+        # old stock and availability
+        .ordered_values(
+            (MenuItem.sold_out, case((and_(MenuItem.stock_quantity - amount <= 0, MenuItem.is_available == True), True),
+                                     else_=MenuItem.sold_out)),
+            (MenuItem.is_available, case((MenuItem.stock_quantity - amount <= 0, False), else_=MenuItem.is_available)),
+            (MenuItem.stock_quantity, MenuItem.stock_quantity - amount)
+        )
+        .execution_options(synchronize_session=False)
+    )
+    return db.session.execute(stmt).rowcount == len(quantities)
+
+def sold_out_items(menu_item_ids):
+    """Rows (id, price, is_available, category_id) of the given items that are now at zero stock."""
+    return db.session.execute(
+        select(MenuItem.id, MenuItem.price, MenuItem.is_available, MenuItem.category_id)
+        .where(MenuItem.id.in_(menu_item_ids), MenuItem.stock_quantity == 0)
+    ).all()
+
+def stock_shortfall(quantities):
+    """[{menu_item_id, requested, available}] for items with less stock than requested (error path)."""
+    rows = db.session.execute(
+        select(MenuItem.id, MenuItem.stock_quantity).where(MenuItem.id.in_(quantities))
+    ).all()
+    return [{"menu_item_id": row.id, "requested": quantities[row.id], "available": row.stock_quantity}
+            for row in rows if row.stock_quantity is not None and row.stock_quantity < quantities[row.id]]
+
+def release_stock(order_ids):
+    """Put back the stock the given orders reserved.
+
+    Returns rows (id, price, is_available, category_id) of items that were sold out and are
+    available again. Does not commit.
+    """
+    quantities = dict(db.session.execute(
+        select(OrderItem.menu_item_id, func.sum(OrderItem.reserved_quantity))
+        .where(OrderItem.order_id.in_(order_ids), OrderItem.reserved_quantity > 0)
+        .group_by(OrderItem.menu_item_id)
+    ).all())
+    if not quantities:
+        return []
+    quantities = {menu_item_id: int(quantity) for menu_item_id, quantity in quantities.items()}
+    amount = case(quantities, value=MenuItem.id)
+    # Locks the rows in primary-key order, like reserve_stock, before reading which were sold out
+    sold_out = db.session.execute(
+        select(MenuItem.id)
+        .where(MenuItem.id.in_(sorted(quantities)), MenuItem.stock_quantity.is_not(None), MenuItem.sold_out == True)
+        .order_by(MenuItem.id).with_for_update()
+    ).scalars().all()
+    db.session.execute(
+        update(MenuItem)
+        .where(MenuItem.id.in_(sorted(quantities)), MenuItem.stock_quantity.is_not(None))
+        .ordered_values(
+            (MenuItem.is_available, case((MenuItem.sold_out == True, True), else_=MenuItem.is_available)),
+            (MenuItem.sold_out, False),
+            (MenuItem.stock_quantity, MenuItem.stock_quantity + amount)
+        )
+        .execution_options(synchronize_session=False)
+    )
+    if not sold_out:
+        return []
+    return db.session.execute(
+        select(MenuItem.id, MenuItem.price, MenuItem.is_available, MenuItem.category_id).where(MenuItem.id.in_(sold_out))
+    ).all()
+
+def apply_availability_changes(restaurant_id, rows):
+    """After commit: push availability flips into the price table and drop the cached public menu."""
+    if not rows:
+        return
+    for row in rows:
+        price_table.set_item(restaurant_id, row.id, row.price, row.is_available, row.category_id)
+    payload_cache.invalidate(("menu_items", restaurant_id))
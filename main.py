@@ -1,15 +1,32 @@
 # backend_app/src/main.py
 import os
 import sys
+from datetime import timedelta
 
 # DON'T CHANGE THIS !!!
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
-from flask import Flask, send_from_directory, jsonify
+from flask import Flask, jsonify
 from flask_jwt_extended import JWTManager
 
 # Import db instance from extensions.py
 from src.extensions import db
+from src.serializers import JSONProvider
+from src.rate_limit import init_rate_limiter
+from src.token_blocklist import init_token_blocklist
+from src.identity import init_identity
+from src.archival import init_archival
+from src.reconciliation import init_reconciliation
+from src.query_plans import init_query_plans
+from src.recommendations import init_recommendations
+from src.pricing import init_pricing
+from src.cache import init_payload_cache
+from src.compression import init_compression
+from src.warmup import init_warmup, run_warmup, state as warmup_state
+from src.health import init_health, monitor as health_monitor
+from src.audit import init_audit
+from src.tenancy import init_tenancy, ensure_default_restaurant
+from src.static_assets import init_static_assets, serve_static
 # Import all models to ensure they are registered with SQLAlchemy
 from src.models import models # This will import all classes from models.py
 
@@ -23,21 +40,73 @@ from src.routes.payments import payments_bp
 from src.routes.admin import admin_bp # Import the admin blueprint
 
 app = Flask(__name__, static_folder=os.path.join(os.path.dirname(__file__), 'static'))
+app.json = JSONProvider(app) # orjson-backed when available; encodes Decimal and datetime
 
 # Configuration
 app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY', 'a_very_secret_key_that_should_be_in_env_var_for_production')
 app.config['JWT_SECRET_KEY'] = os.environ.get('JWT_SECRET_KEY', 'another_very_secret_jwt_key_for_production') # Change this!
-app.config['SQLALCHEMY_DATABASE_URI'] = f"mysql+pymysql://{os.getenv('DB_USERNAME', 'root')}:{os.getenv('DB_PASSWORD', 'password')}@{os.getenv('DB_HOST', 'localhost')}:{os.getenv('DB_PORT', '3306')}/{os.getenv('DB_NAME', 'restaurant_db')}"
+app.config['JWT_ACCESS_TOKEN_EXPIRES'] = timedelta(minutes=int(os.getenv('JWT_ACCESS_TOKEN_MINUTES', 15)))
+app.config['JWT_REFRESH_TOKEN_EXPIRES'] = timedelta(days=int(os.getenv('JWT_REFRESH_TOKEN_DAYS', 30)))
+app.config['JWT_BLOCKLIST_REFRESH_SECONDS'] = int(os.getenv('JWT_BLOCKLIST_REFRESH_SECONDS', 5)) # Max delay for revocations made by other workers
+app.config['JWT_BLOCKLIST_REFRESH_MARGIN_SECONDS'] = int(os.getenv('JWT_BLOCKLIST_REFRESH_MARGIN_SECONDS', 60)) # Re-read window for revocations committed late
+# DATABASE_URL takes any SQLAlchemy URI (e.g. sqlite:///:memory: for tests and benchmarks); otherwise MySQL from DB_*
+app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv('DATABASE_URL') or f"mysql+pymysql://{os.getenv('DB_USERNAME', 'root')}:{os.getenv('DB_PASSWORD', 'password')}@{os.getenv('DB_HOST', 'localhost')}:{os.getenv('DB_PORT', '3306')}/{os.getenv('DB_NAME', 'restaurant_db')}"
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+# Validate pooled connections on checkout so connections MySQL has dropped are replaced, not handed to requests
+app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {'pool_pre_ping': True, 'pool_recycle': int(os.getenv('DB_POOL_RECYCLE_SECONDS', 3600))}
+app.config['RATE_LIMIT_ENABLED'] = os.getenv('RATE_LIMIT_ENABLED', 'true').lower() == 'true'
+app.config['RECOMMENDATIONS_REFRESH_SECONDS'] = int(os.getenv('RECOMMENDATIONS_REFRESH_SECONDS', 300))
+app.config['RECOMMENDATIONS_TRAILING_ORDERS'] = int(os.getenv('RECOMMENDATIONS_TRAILING_ORDERS', 1000)) # Re-scanned for orders committed late
+app.config['RECOMMENDATIONS_REBUILD_SECONDS'] = int(os.getenv('RECOMMENDATIONS_REBUILD_SECONDS', 3600)) # Full recount; drops orders cancelled since
+app.config['PRICE_TABLE_REFRESH_SECONDS'] = int(os.getenv('PRICE_TABLE_REFRESH_SECONDS', 60)) # Picks up menu edits made in other workers
+app.config['PAYLOAD_CACHE_TTL_SECONDS'] = int(os.getenv('PAYLOAD_CACHE_TTL_SECONDS', 30)) # Menu / categories / restaurant info
+app.config['COMPRESSION_ENABLED'] = os.getenv('COMPRESSION_ENABLED', 'true').lower() == 'true'
+app.config['COMPRESSION_MIN_SIZE'] = int(os.getenv('COMPRESSION_MIN_SIZE', 1024)) # Bytes; smaller bodies are sent as is
+app.config['COMPRESSION_GZIP_LEVEL'] = int(os.getenv('COMPRESSION_GZIP_LEVEL', 6))
+app.config['COMPRESSION_BROTLI_QUALITY'] = int(os.getenv('COMPRESSION_BROTLI_QUALITY', 4)) # Used when the brotli package is installed
+app.config['COMPRESSION_MIMETYPES'] = [t.strip() for t in os.getenv('COMPRESSION_MIMETYPES', '').split(',') if t.strip()] # Empty = built-in list
+app.config['WARMUP_ENABLED'] = os.getenv('WARMUP_ENABLED', 'true').lower() == 'true'
+app.config['DB_POOL_WARM_CONNECTIONS'] = int(os.getenv('DB_POOL_WARM_CONNECTIONS', 5))
+app.config['HEALTH_DB_PROBE_SECONDS'] = float(os.getenv('HEALTH_DB_PROBE_SECONDS', 5)) # Probe at most this often per worker
+app.config['HEALTH_MAX_POOL_SATURATION'] = float(os.getenv('HEALTH_MAX_POOL_SATURATION', 0.9))
+app.config['HEALTH_MAX_QUEUE_FILL'] = float(os.getenv('HEALTH_MAX_QUEUE_FILL', 0.8))
+app.config['HEALTH_MAX_ERROR_RATE'] = float(os.getenv('HEALTH_MAX_ERROR_RATE', 0.2)) # 5xx share over HEALTH_ERROR_WINDOW_SECONDS
+app.config['HEALTH_ERROR_WINDOW_SECONDS'] = int(os.getenv('HEALTH_ERROR_WINDOW_SECONDS', 60))
+# Restaurant for requests that name none (no X-Restaurant-Id header, unknown Host); empty = reject them
+app.config['DEFAULT_RESTAURANT_ID'] = int(os.getenv('DEFAULT_RESTAURANT_ID', '1') or 0) or None
+app.config['TENANT_DIRECTORY_TTL_SECONDS'] = int(os.getenv('TENANT_DIRECTORY_TTL_SECONDS', 60))
+app.config['PROFILE_CACHE_TTL_SECONDS'] = int(os.getenv('PROFILE_CACHE_TTL_SECONDS', 0)) # /api/auth/me profile cache; 0 = off
+app.config['AUDIT_ENABLED'] = os.getenv('AUDIT_ENABLED', 'true').lower() == 'true'
+app.config['AUDIT_SINK'] = os.getenv('AUDIT_SINK', 'database') # "database" (audit_log table) or "ndjson"
+app.config['AUDIT_FILE'] = os.getenv('AUDIT_FILE', 'audit.ndjson') # Append-only file for AUDIT_SINK=ndjson, and the shutdown fallback
+app.config['AUDIT_QUEUE_SIZE'] = int(os.getenv('AUDIT_QUEUE_SIZE', 10000)) # Beyond this, requests write their own entries
+app.config['AUDIT_BATCH_SIZE'] = int(os.getenv('AUDIT_BATCH_SIZE', 500))
+app.config['AUDIT_FLUSH_SECONDS'] = float(os.getenv('AUDIT_FLUSH_SECONDS', 1))
+app.config['BACKGROUND_JOBS_ENABLED'] = os.getenv('BACKGROUND_JOBS_ENABLED', 'true').lower() == 'true' # Periodic refreshers and the audit writer
+app.config['RATE_LIMIT_STORAGE'] = os.getenv('RATE_LIMIT_STORAGE', 'memory') # Use sqlite:///path for multi-worker setups
 
 # Initialize extensions
 db.init_app(app)
 init_bcrypt(app) # Initialize Flask-Bcrypt
 jwt = JWTManager(app) # Initialize Flask-JWT-Extended
+init_token_blocklist(app, jwt) # In-memory revocation checks for every @jwt_required()
+init_identity(app, jwt) # flask_jwt_extended.current_user, loaded at most once per request
+init_archival(app) # Registers the `flask archive-orders` command
+init_reconciliation(app) # Registers the `flask reconcile-payments` command
+init_query_plans(app) # Registers the `flask check-query-plans` command
+init_recommendations(app) # Background refresh of popularity / co-occurrence rankings
+init_pricing(app) # Periodic reload of the in-memory price table used by /api/orders/quote
+init_payload_cache(app)
+init_compression(app) # gzip/br for large responses; cached menu payloads keep compressed copies
+init_health(app) # Counts responses for the readiness error-rate check
+init_audit(app) # Session events -> bounded queue -> batched audit_log / NDJSON writes off the request path
+init_tenancy(app) # Resolves the restaurant of every request (X-Restaurant-Id header or Host)
+init_rate_limiter(app)
 
 # Create database tables if they don't exist
 with app.app_context():
     db.create_all()
+    ensure_default_restaurant()
 
 # Register Blueprints
 app.register_blueprint(auth_bp, url_prefix='/api/auth')
@@ -48,27 +117,40 @@ app.register_blueprint(orders_bp, url_prefix='/api')
 app.register_blueprint(payments_bp, url_prefix='/api') 
 app.register_blueprint(admin_bp, url_prefix='/api/admin') # Register the admin blueprint
 
+init_warmup(app) # Fill caches, compile hot statements and open pool connections before serving
+
 @app.route('/api/health')
 def health_check():
-    return jsonify({"status": "healthy", "timestamp": models.datetime.utcnow().isoformat()}), 200
+    # Liveness: fails only when this worker can no longer reach the database at all
+    body, status_code = health_monitor.liveness()
+    return jsonify(dict(body, timestamp=models.datetime.utcnow().isoformat())), status_code
+
+@app.route('/api/ready')
+def readiness_check():
+    # For load balancer / orchestrator readiness probes; retries warmup until it succeeds
+    if not run_warmup(app):
+        return jsonify(dict(warmup_state.as_dict(), status="warming_up")), 503
+    checks, failures = health_monitor.readiness()
+    return jsonify({
+        "status": "not_ready" if failures else "ready",
+        "failing": failures,
+        "warmup": warmup_state.as_dict(),
+        "checks": checks
+    }), 503 if failures else 200
 
 # Serve static files (e.g., for a frontend if co-hosted, or API docs)
+# Answered from the manifest built at startup: no filesystem checks per request
+static_manifest = init_static_assets(app)
+
 @app.route('/', defaults={'path': ''})
 @app.route('/<path:path>')
 def serve(path):
-    static_folder_path = app.static_folder
-    if static_folder_path is None:
+    if app.static_folder is None:
         return "Static folder not configured", 404
+    return serve_static(static_manifest, path)
 
-    if path != "" and os.path.exists(os.path.join(static_folder_path, path)):
-        return send_from_directory(static_folder_path, path)
-    else:
-        index_path = os.path.join(static_folder_path, 'index.html')
-        if os.path.exists(index_path):
-            return send_from_directory(static_folder_path, 'index.html')
-        else:
-            return jsonify({"message": "Welcome to the Restaurant API. No frontend index.html found at root."}), 200
-
+# Development server only. In production run wsgi.py under gunicorn (see gunicorn.conf.py),
+# and asgi.py for the streaming endpoints.
 if __name__ == '__main__':
     app.run(host='0.0.0.0', port=int(os.getenv('PORT', 5000)), debug=True)
 
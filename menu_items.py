@@ -3,43 +3,62 @@
 from flask import Blueprint, request, jsonify
 from ..extensions import db
 from ..models.models import MenuItem, Category # Import Category to check if parent category is active
-from sqlalchemy.orm import joinedload # To efficiently load category info
+from sqlalchemy.orm import contains_eager # Loads the category from the join
+from sqlalchemy import select, bindparam
+from ..serializers import MENU_ITEM_LIST_FIELDS, select_fieldset, serialize_rows
+from ..recommendations import index as recommendation_index, POPULARITY_WINDOWS, TOP_N
+from ..queries import PUBLIC_MENU_ITEMS
+from ..compression import cached_json_response
+from ..tenancy import current_restaurant_id
 
 menu_items_bp = Blueprint("menu_items_bp", __name__)
 
+def load_public_menu(restaurant_id):
+    """The restaurant's full public menu (every field, no filters), as served from the payload cache."""
+    return serialize_rows(db.session.execute(PUBLIC_MENU_ITEMS, {"restaurant_id": restaurant_id}).all())
+
 @menu_items_bp.route("/menu-items", methods=["GET"])
 def get_menu_items():
     try:
+        columns = select_fieldset(MENU_ITEM_LIST_FIELDS, request.args.get("fields"))
+    except ValueError as e:
+        return jsonify({"message": str(e)}), 400
+    restaurant_id = current_restaurant_id()
+    try:
+        if not any(request.args.get(name) for name in ("fields", "category_id", "search")):
+            return cached_json_response(("menu_items", restaurant_id), lambda: load_public_menu(restaurant_id)), 200
+
         # Optionally, add query parameters for filtering, e.g., by category_id or search term
-        query = MenuItem.query.options(joinedload(MenuItem.category)).filter(MenuItem.is_available==True, Category.is_active==True)
-        
+        if request.args.get("fields"):
+            query = (
+                select(*columns)
+                .select_from(MenuItem)
+                .join(Category, MenuItem.category_id == Category.id)
+                .where(MenuItem.restaurant_id == bindparam("restaurant_id"), MenuItem.is_available == True, Category.is_active == True)
+            )
+        else:
+            query = PUBLIC_MENU_ITEMS
+
         category_id_filter = request.args.get("category_id")
         if category_id_filter:
-            query = query.filter(MenuItem.category_id == category_id_filter)
+            query = query.where(MenuItem.category_id == category_id_filter)
             
         search_term = request.args.get("search")
         if search_term:
-            query = query.filter(MenuItem.name.ilike(f"%{search_term}%"))
+            query = query.where(MenuItem.name.ilike(f"%{search_term}%"))
 
-        items = query.all()
-        
-        return jsonify([{
-            "id": item.id,
-            "category_id": item.category_id,
-            "category_name": item.category.name if item.category else None, # Include category name
-            "name": item.name,
-            "description": item.description,
-            "price": str(item.price),
-            "image_url": item.image_url,
-            "is_available": item.is_available
-        } for item in items]), 200
+        items = db.session.execute(query, {"restaurant_id": restaurant_id}).all()
+        return jsonify(serialize_rows(items)), 200
     except Exception as e:
         return jsonify({"message": "Error fetching menu items", "error": str(e)}), 500
 
 @menu_items_bp.route("/menu-items/<int:item_id>", methods=["GET"])
 def get_menu_item_detail(item_id):
     try:
-        item = MenuItem.query.options(joinedload(MenuItem.category)).filter(MenuItem.id == item_id, MenuItem.is_available==True, Category.is_active==True).first()
+        # Explicit join for the is_active filter (as the listing does); contains_eager fills item.category from it
+        item = (MenuItem.query.join(Category, MenuItem.category_id == Category.id).options(contains_eager(MenuItem.category))
+                .filter(MenuItem.id == item_id, MenuItem.restaurant_id == current_restaurant_id(), MenuItem.is_available==True, Category.is_active==True)
+                .first())
         if not item:
             return jsonify({"message": "Menu item not found or not available"}), 404
         
@@ -58,5 +77,41 @@ def get_menu_item_detail(item_id):
     except Exception as e:
         return jsonify({"message": "Error fetching menu item details", "error": str(e)}), 500
 
+def _ranked_items(item_ids, limit):
+    """Storefront rows for item_ids, keeping their ranking and skipping unavailable items."""
+    try:
+        columns = select_fieldset(MENU_ITEM_LIST_FIELDS, request.args.get("fields"))
+    except ValueError as e:
+        return jsonify({"message": str(e)}), 400
+    rows = db.session.execute(
+        select(*columns)
+        .select_from(MenuItem)
+        .join(Category, MenuItem.category_id == Category.id)
+        .where(MenuItem.id.in_(item_ids), MenuItem.restaurant_id == current_restaurant_id(),
+               MenuItem.is_available == True, Category.is_active == True)
+    ).all() if item_ids else []
+    rank = {item_id: position for position, item_id in enumerate(item_ids)}
+    rows.sort(key=lambda row: rank[row.id])
+    return jsonify(serialize_rows(rows[:limit])), 200
+
+@menu_items_bp.route("/menu-items/popular", methods=["GET"])
+def get_popular_menu_items():
+    window = request.args.get("window", "7d")
+    if window not in POPULARITY_WINDOWS:
+        return jsonify({"message": f"Invalid window. Allowed: {', '.join(POPULARITY_WINDOWS)}"}), 400
+    limit = min(max(request.args.get("limit", 10, type=int), 1), TOP_N)
+    try:
+        return _ranked_items(recommendation_index.popular(current_restaurant_id(), window, TOP_N), limit)
+    except Exception as e:
+        return jsonify({"message": "Error fetching popular menu items", "error": str(e)}), 500
+
+@menu_items_bp.route("/menu-items/<int:item_id>/frequently-ordered-with", methods=["GET"])
+def get_frequently_ordered_with(item_id):
+    limit = min(max(request.args.get("limit", 5, type=int), 1), TOP_N)
+    try:
+        return _ranked_items(recommendation_index.related(current_restaurant_id(), item_id, TOP_N), limit)
+    except Exception as e:
+        return jsonify({"message": "Error fetching related menu items", "error": str(e)}), 500
+
 # Admin routes for menu items will be in a separate admin blueprint.
 
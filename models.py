@@ -1,7 +1,6 @@
 # backend_app/src/models/models.py
 
 from flask_sqlalchemy import SQLAlchemy
-from sqlalchemy.dialects.mysql import ENUM
 from datetime import datetime
 
 # Initialize SQLAlchemy. This will be configured with the Flask app in main.py
@@ -56,7 +55,10 @@ class User(db.Model):
     email = db.Column(db.String(120), unique=True, nullable=False)
     full_name = db.Column(db.String(120))
     phone_number = db.Column(db.String(20), unique=True)
-    role = db.Column(ENUM('customer', 'admin', 'staff', name='user_roles_enum'), nullable=False, default='customer')
+    role = db.Column(db.Enum('customer', 'admin', 'staff', name='user_roles_enum'), nullable=False, default='customer')
+    # Staff/admin accounts work for one restaurant; all_restaurants grants every one (head office)
+    restaurant_id = db.Column(db.Integer, db.ForeignKey('restaurant_info.id'))
+    all_restaurants = db.Column(db.Boolean, nullable=False, default=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
@@ -65,6 +67,8 @@ class User(db.Model):
 
 class Address(db.Model):
     __tablename__ = 'addresses'
+    # Default-address lookups and the address list (ORDER BY is_default DESC, created_at DESC)
+    __table_args__ = (db.Index('ix_addresses_user_default_created', 'user_id', 'is_default', 'created_at'),)
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     address_line1 = db.Column(db.String(255), nullable=False)
@@ -78,10 +82,18 @@ class Address(db.Model):
 
     orders = db.relationship('Order', backref='delivery_address', lazy=True)
 
+# Category, MenuItem and Order belong to one restaurant (branch); their indexes lead with
+# restaurant_id so every tenant-scoped query reads only that tenant's index range.
+
 class Category(db.Model):
     __tablename__ = 'categories'
+    __table_args__ = (
+        db.UniqueConstraint('restaurant_id', 'name', name='uq_categories_restaurant_name'),
+        db.Index('ix_categories_restaurant_active', 'restaurant_id', 'is_active'),
+    )
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
-    name = db.Column(db.String(100), unique=True, nullable=False)
+    restaurant_id = db.Column(db.Integer, db.ForeignKey('restaurant_info.id'), nullable=False)
+    name = db.Column(db.String(100), nullable=False)
     description = db.Column(db.Text)
     image_url = db.Column(db.String(255))
     is_active = db.Column(db.Boolean, default=True)
@@ -92,13 +104,20 @@ class Category(db.Model):
 
 class MenuItem(db.Model):
     __tablename__ = 'menu_items'
+    __table_args__ = (
+        db.Index('ix_menu_items_restaurant_available_category', 'restaurant_id', 'is_available', 'category_id'),
+        db.Index('ix_menu_items_category_available', 'category_id', 'is_available'), # Items of one category
+    )
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    restaurant_id = db.Column(db.Integer, db.ForeignKey('restaurant_info.id'), nullable=False)
     category_id = db.Column(db.Integer, db.ForeignKey('categories.id'), nullable=False)
     name = db.Column(db.String(150), nullable=False)
     description = db.Column(db.Text, nullable=False)
     price = db.Column(db.Numeric(10, 2), nullable=False)
     image_url = db.Column(db.String(255))
     is_available = db.Column(db.Boolean, default=True)
+    stock_quantity = db.Column(db.Integer) # NULL = not tracked; see inventory.py
+    sold_out = db.Column(db.Boolean, nullable=False, default=False) # Switched off by running out of stock, not by an admin
     preparation_time_minutes = db.Column(db.Integer)
     calories = db.Column(db.Integer)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
@@ -108,45 +127,141 @@ class MenuItem(db.Model):
 
 class Order(db.Model):
     __tablename__ = 'orders'
+    __table_args__ = (
+        db.Index('ix_orders_restaurant_user_created', 'restaurant_id', 'user_id', 'created_at'),
+        db.Index('ix_orders_restaurant_status_created', 'restaurant_id', 'status', 'created_at'),
+        db.Index('ix_orders_restaurant_created', 'restaurant_id', 'created_at'), # Admin order list, newest first
+        db.Index('ix_orders_status_created', 'status', 'created_at'), # Archival candidates
+    )
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     delivery_address_id = db.Column(db.Integer, db.ForeignKey('addresses.id'), nullable=False)
-    # restaurant_id = db.Column(db.Integer, db.ForeignKey('restaurant_info.id')) # Assuming single restaurant for now
+    restaurant_id = db.Column(db.Integer, db.ForeignKey('restaurant_info.id'), nullable=False)
     total_amount = db.Column(db.Numeric(10, 2), nullable=False)
-    status = db.Column(ENUM('pending', 'confirmed', 'preparing', 'out_for_delivery', 'delivered', 'cancelled', name='order_status_enum'), nullable=False, default='pending')
-    payment_status = db.Column(ENUM('pending', 'paid', 'failed', name='payment_status_enum'), nullable=False, default='pending')
+    status = db.Column(db.Enum('pending', 'confirmed', 'preparing', 'out_for_delivery', 'delivered', 'cancelled', name='order_status_enum'), nullable=False, default='pending')
+    payment_status = db.Column(db.Enum('pending', 'paid', 'failed', name='payment_status_enum'), nullable=False, default='pending')
     payment_method = db.Column(db.String(50))
     transaction_id = db.Column(db.String(100))
     delivery_instructions = db.Column(db.Text)
     estimated_delivery_time = db.Column(db.DateTime)
+    driver = db.Column(db.String(80)) # Set by dispatch.py when the order goes out
+    delivery_sequence = db.Column(db.Integer) # Stop number within the driver's run
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     order_items = db.relationship('OrderItem', backref='order', lazy=True, cascade="all, delete-orphan")
     payment = db.relationship('Payment', backref='order', uselist=False, cascade="all, delete-orphan") # One-to-one
 
+class OrderStatusHistory(db.Model):
+    __tablename__ = 'order_status_history'
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    order_id = db.Column(db.Integer, db.ForeignKey('orders.id'), nullable=False, index=True)
+    from_status = db.Column(db.Enum('pending', 'confirmed', 'preparing', 'out_for_delivery', 'delivered', 'cancelled', name='order_status_enum'), nullable=False)
+    to_status = db.Column(db.Enum('pending', 'confirmed', 'preparing', 'out_for_delivery', 'delivered', 'cancelled', name='order_status_enum'), nullable=False)
+    changed_by_user_id = db.Column(db.Integer, db.ForeignKey('users.id')) # Null for system/webhook changes
+    source = db.Column(db.String(50)) # e.g. "admin", "customer", "payment_webhook"
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
 class OrderItem(db.Model):
     __tablename__ = 'order_items'
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
-    order_id = db.Column(db.Integer, db.ForeignKey('orders.id'), nullable=False)
+    order_id = db.Column(db.Integer, db.ForeignKey('orders.id'), nullable=False, index=True)
     menu_item_id = db.Column(db.Integer, db.ForeignKey('menu_items.id'), nullable=False)
     quantity = db.Column(db.Integer, nullable=False, default=1)
     price_at_order = db.Column(db.Numeric(10, 2), nullable=False)
     subtotal = db.Column(db.Numeric(10, 2), nullable=False)
+    reserved_quantity = db.Column(db.Integer) # Taken out of stock when ordered; NULL = item not tracked then
 
 class Payment(db.Model):
     __tablename__ = 'payments'
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
     order_id = db.Column(db.Integer, db.ForeignKey('orders.id'), nullable=False, unique=True)
     amount = db.Column(db.Numeric(10, 2), nullable=False)
-    payment_gateway_transaction_id = db.Column(db.String(100), nullable=False)
-    status = db.Column(ENUM('success', 'failed', 'pending', name='payment_process_status_enum'), nullable=False)
+    payment_gateway_transaction_id = db.Column(db.String(100), nullable=False, index=True) # Webhook and reconciliation lookups
+    status = db.Column(db.Enum('success', 'failed', 'pending', name='payment_process_status_enum'), nullable=False)
     payment_method_details = db.Column(db.JSON)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
+# Archive tables for old, finished orders (see archival.py). Same columns as the hot tables,
+# keeping the original ids; no foreign keys into the hot tables so rows can move freely.
+
+class ArchivedOrder(db.Model):
+    __tablename__ = 'orders_archive'
+    __table_args__ = (db.Index('ix_orders_archive_restaurant_user_created', 'restaurant_id', 'user_id', 'created_at'),)
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    user_id = db.Column(db.Integer, nullable=False)
+    delivery_address_id = db.Column(db.Integer, nullable=False)
+    restaurant_id = db.Column(db.Integer, nullable=False)
+    total_amount = db.Column(db.Numeric(10, 2), nullable=False)
+    status = db.Column(db.Enum('pending', 'confirmed', 'preparing', 'out_for_delivery', 'delivered', 'cancelled', name='order_status_enum'), nullable=False)
+    payment_status = db.Column(db.Enum('pending', 'paid', 'failed', name='payment_status_enum'), nullable=False)
+    payment_method = db.Column(db.String(50))
+    transaction_id = db.Column(db.String(100))
+    delivery_instructions = db.Column(db.Text)
+    estimated_delivery_time = db.Column(db.DateTime)
+    driver = db.Column(db.String(80))
+    delivery_sequence = db.Column(db.Integer)
+    created_at = db.Column(db.DateTime)
+    updated_at = db.Column(db.DateTime)
+    archived_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+class ArchivedOrderItem(db.Model):
+    __tablename__ = 'order_items_archive'
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    order_id = db.Column(db.Integer, nullable=False, index=True)
+    menu_item_id = db.Column(db.Integer, nullable=False)
+    quantity = db.Column(db.Integer, nullable=False)
+    price_at_order = db.Column(db.Numeric(10, 2), nullable=False)
+    subtotal = db.Column(db.Numeric(10, 2), nullable=False)
+    reserved_quantity = db.Column(db.Integer)
+
+class ArchivedPayment(db.Model):
+    __tablename__ = 'payments_archive'
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    order_id = db.Column(db.Integer, nullable=False, unique=True)
+    amount = db.Column(db.Numeric(10, 2), nullable=False)
+    payment_gateway_transaction_id = db.Column(db.String(100), nullable=False)
+    status = db.Column(db.Enum('success', 'failed', 'pending', name='payment_process_status_enum'), nullable=False)
+    payment_method_details = db.Column(db.JSON)
+    created_at = db.Column(db.DateTime)
+
+class ArchivedOrderStatusHistory(db.Model):
+    __tablename__ = 'order_status_history_archive'
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    order_id = db.Column(db.Integer, nullable=False, index=True)
+    from_status = db.Column(db.Enum('pending', 'confirmed', 'preparing', 'out_for_delivery', 'delivered', 'cancelled', name='order_status_enum'), nullable=False)
+    to_status = db.Column(db.Enum('pending', 'confirmed', 'preparing', 'out_for_delivery', 'delivered', 'cancelled', name='order_status_enum'), nullable=False)
+    changed_by_user_id = db.Column(db.Integer)
+    source = db.Column(db.String(50))
+    created_at = db.Column(db.DateTime)
+
+class AuditLog(db.Model):
+    # Written in batches by audit.py, outside request transactions; append-only
+    __tablename__ = 'audit_log'
+    __table_args__ = (db.Index('ix_audit_log_table_entity', 'table_name', 'entity_id'),)
+    id = db.Column(db.BigInteger().with_variant(db.Integer, 'sqlite'), primary_key=True, autoincrement=True)
+    created_at = db.Column(db.DateTime, nullable=False, index=True) # When the change was made, not written
+    actor_user_id = db.Column(db.Integer) # No foreign key: the trail outlives deleted users
+    endpoint = db.Column(db.String(100))
+    action = db.Column(db.String(10), nullable=False) # "insert", "update" or "delete"
+    table_name = db.Column(db.String(64), nullable=False)
+    entity_id = db.Column(db.Integer) # Null for set-based statements
+    changes = db.Column(db.JSON)
+
+class RevokedToken(db.Model):
+    __tablename__ = 'revoked_tokens'
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    # Either a single token (jti) or, with jti NULL, every token of user_id issued before revoked_at
+    jti = db.Column(db.String(36), unique=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'))
+    token_type = db.Column(db.String(10)) # "access" or "refresh"
+    revoked_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, index=True) # Blocklist refresh window
+    expires_at = db.Column(db.DateTime) # After this the row no longer matters and can be purged
+
 class RestaurantInfo(db.Model):
     __tablename__ = 'restaurant_info'
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    hostname = db.Column(db.String(255), unique=True) # Requests for this Host are served as this restaurant
     name = db.Column(db.String(150), nullable=False)
     address = db.Column(db.String(255))
     phone_number = db.Column(db.String(20))
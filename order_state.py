@@ -0,0 +1,159 @@
+# backend_app/src/order_state.py
+
+# Order status state machine.
+# Every status change is a single conditional UPDATE (... WHERE id = ? AND status = ?),
+# so concurrent staff, customer and webhook writes cannot silently overwrite each other:
+# whoever loses the race matches zero rows and gets a conflict instead.
+
+from datetime import datetime
+from sqlalchemy import select, update, insert
+
+from .extensions import db
+from .models.models import Order, OrderStatusHistory
+
+ORDER_STATUSES = ["pending", "confirmed", "preparing", "out_for_delivery", "delivered", "cancelled"]
+
+# Legal transitions: current status -> statuses it may move to
+ORDER_TRANSITIONS = {
+    "pending": ["confirmed", "cancelled"],
+    "confirmed": ["preparing", "cancelled"],
+    "preparing": ["out_for_delivery", "cancelled"],
+    "out_for_delivery": ["delivered"],
+    "delivered": [],
+    "cancelled": [],
+}
+
+def can_transition(from_status, to_status):
+    return to_status in ORDER_TRANSITIONS.get(from_status, [])
+
+def allowed_sources(to_status):
+    """Statuses from which to_status may be reached, in lifecycle order."""
+    return [status for status in ORDER_STATUSES if can_transition(status, to_status)]
+
+def transition_order(order_id, to_status, from_statuses=None, changed_by=None, source=None, filters=(), values=None):
+    """Move an order to to_status without reading it first.
+
+    Tries one conditional UPDATE per candidate source status (the caller's expected
+    status, or every legal predecessor) and records the change in order_status_history.
+    Extra WHERE clauses (e.g. ownership) go in filters, extra SET columns in values.
+    Returns the status the order was moved from, or None if no row matched.
+    Does not commit; the caller owns the transaction.
+    """
+    candidates = from_statuses if from_statuses is not None else allowed_sources(to_status)
+    for from_status in candidates:
+        if not can_transition(from_status, to_status):
+            continue
+        stmt = (
+            update(Order)
+            .where(Order.id == order_id, Order.status == from_status, *filters)
+            .values(status=to_status, updated_at=datetime.utcnow(), **(values or {}))
+            .execution_options(synchronize_session=False, audit_before={order_id: {"status": from_status}})
+        )
+        if db.session.execute(stmt).rowcount == 1:
+            db.session.execute(insert(OrderStatusHistory).values(
+                order_id=order_id,
+                from_status=from_status,
+                to_status=to_status,
+                changed_by_user_id=changed_by,
+                source=source,
+                created_at=datetime.utcnow()
+            ))
+            return from_status
+    return None
+
+def transition_orders(order_ids, to_status, from_status, changed_by=None, source=None, values=None):
+    """Bulk transition_order for a single source status.
+
+    Locks the orders still in from_status (SELECT ... FOR UPDATE), moves them with one
+    UPDATE and records their history with one executemany INSERT.
+    Returns the ids that were moved. Does not commit; the caller owns the transaction.
+    """
+    if not order_ids or not can_transition(from_status, to_status):
+        return []
+    moved_ids = db.session.execute(
+        select(Order.id).where(Order.id.in_(order_ids), Order.status == from_status).with_for_update()
+    ).scalars().all()
+    if not moved_ids:
+        return []
+    now = datetime.utcnow()
+    db.session.execute(
+        update(Order)
+        .where(Order.id.in_(moved_ids))
+        .values(status=to_status, updated_at=now, **(values or {}))
+        .execution_options(synchronize_session=False, audit_before={order_id: {"status": from_status} for order_id in moved_ids})
+    )
+    db.session.execute(insert(OrderStatusHistory), [{
+        "order_id": order_id,
+        "from_status": from_status,
+        "to_status": to_status,
+        "changed_by_user_id": changed_by,
+        "source": source,
+        "created_at": now
+    } for order_id in moved_ids])
+    return moved_ids
+
+def transition_orders_checked(order_ids, to_status, expected_status=None, changed_by=None, source=None, filters=(), values=None):
+    """Bulk transition for orders that may be in different statuses.
+
+    Reads and locks the orders with one SELECT ... FOR UPDATE, moves every order whose
+    current status may go to to_status (and equals expected_status, when given) with one
+    UPDATE, and records their history with one executemany INSERT.
+    Returns (moved, rejected): {order_id: from_status} and
+    {order_id: (reason, current_status)} with reason "not_found", "status_mismatch" or
+    "invalid_transition". Does not commit; the caller owns the transaction.
+    """
+    current = dict(db.session.execute(
+        select(Order.id, Order.status).where(Order.id.in_(order_ids), *filters).with_for_update()
+    ).all())
+    moved, rejected = {}, {}
+    for order_id in order_ids:
+        status = current.get(order_id)
+        if status is None:
+            rejected[order_id] = ("not_found", None)
+        elif expected_status and status != expected_status:
+            rejected[order_id] = ("status_mismatch", status)
+        elif not can_transition(status, to_status):
+            rejected[order_id] = ("invalid_transition", status)
+        else:
+            moved[order_id] = status
+    if not moved:
+        return moved, rejected
+    now = datetime.utcnow()
+    db.session.execute(
+        update(Order)
+        .where(Order.id.in_(list(moved)))
+        .values(status=to_status, updated_at=now, **(values or {}))
+        .execution_options(synchronize_session=False,
+                           audit_before={order_id: {"status": from_status} for order_id, from_status in moved.items()})
+    )
+    db.session.execute(insert(OrderStatusHistory), [{
+        "order_id": order_id,
+        "from_status": from_status,
+        "to_status": to_status,
+        "changed_by_user_id": changed_by,
+        "source": source,
+        "created_at": now
+    } for order_id, from_status in moved.items()])
+    return moved, rejected
+
+def explain_failed_transition(order_id, to_status, from_statuses=None, expected_status=None, filters=()):
+    """Build the (body, http_status) for a transition that matched no row.
+
+    Only runs on the failure path, so successful transitions never pay for this SELECT.
+    """
+    current_status = db.session.execute(
+        select(Order.status).where(Order.id == order_id, *filters)
+    ).scalar_one_or_none()
+    if current_status is None:
+        return {"message": "Order not found or access denied"}, 404
+    if expected_status and current_status != expected_status:
+        # The client acted on a stale view of the order
+        return {"message": f"Order status is {current_status}, expected {expected_status}", "current_status": current_status}, 409
+    candidates = from_statuses if from_statuses is not None else allowed_sources(to_status)
+    if current_status in candidates and can_transition(current_status, to_status):
+        # The order was in a compatible state but changed underneath us
+        return {"message": "Order status was changed concurrently, please retry", "current_status": current_status}, 409
+    return {
+        "message": f"Order status cannot change from {current_status} to {to_status}",
+        "current_status": current_status
+    }, 400
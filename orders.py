@@ -2,8 +2,15 @@
 
 from flask import Blueprint, request, jsonify
 from ..extensions import db
+from ..order_state import transition_order, explain_failed_transition
+from ..pricing import parse_order_items, price_order_lines, price_table
+from ..queries import USER_ADDRESS_ID, AVAILABLE_ITEM_PRICES, USER_ORDERS, USER_ARCHIVED_ORDERS
+from ..inventory import reserve_stock, release_stock, sold_out_items, stock_shortfall, apply_availability_changes
+from ..tenancy import current_restaurant_id
+from ..serializers import serialize_order_summary, load_items_preview, load_order_detail
 from ..models.models import Order, OrderItem, MenuItem, Address, User
 from flask_jwt_extended import jwt_required, get_jwt_identity
+from sqlalchemy import insert
 from sqlalchemy.exc import IntegrityError
 from datetime import datetime
 
@@ -13,6 +20,7 @@ orders_bp = Blueprint("orders_bp", __name__)
 @jwt_required()
 def create_order():
     current_user_id = get_jwt_identity()
+    restaurant_id = current_restaurant_id()
     data = request.get_json()
 
     delivery_address_id = data.get("delivery_address_id")
@@ -24,63 +32,68 @@ def create_order():
         return jsonify({"message": "Delivery address and items are required"}), 400
 
     # Verify address belongs to user
-    address = Address.query.filter_by(id=delivery_address_id, user_id=current_user_id).first()
-    if not address:
+    address_id = db.session.execute(USER_ADDRESS_ID, {"address_id": delivery_address_id, "user_id": current_user_id}).scalar()
+    if not address_id:
         return jsonify({"message": "Delivery address not found or does not belong to user"}), 404
 
-    total_amount = 0
-    order_items_to_create = []
-
+    # Aggregate requested quantities per menu item so the whole order is validated in one query
     try:
-        for item_data in items_data:
-            menu_item_id = item_data.get("menu_item_id")
-            quantity = item_data.get("quantity")
+        requested_quantities = parse_order_items(items_data)
+    except ValueError as e:
+        return jsonify({"message": str(e)}), 400
 
-            if not menu_item_id or not quantity or int(quantity) <= 0:
-                return jsonify({"message": "Invalid menu item ID or quantity"}), 400
+    if not requested_quantities:
+        return jsonify({"message": "Order must contain at least one item"}), 400
 
-            menu_item = MenuItem.query.filter_by(id=menu_item_id, is_available=True).first()
-            if not menu_item:
+    try:
+        item_rows = db.session.execute(
+            AVAILABLE_ITEM_PRICES, {"restaurant_id": restaurant_id, "menu_item_ids": list(requested_quantities)}
+        ).all()
+        prices = {row.id: row.price for row in item_rows}
+        for menu_item_id in requested_quantities:
+            if menu_item_id not in prices:
                 return jsonify({"message": f"Menu item with ID {menu_item_id} not found or not available"}), 404
-            
-            price_at_order = menu_item.price
-            subtotal = price_at_order * int(quantity)
-            total_amount += subtotal
-
-            order_item = OrderItem(
-                menu_item_id=menu_item_id,
-                quantity=int(quantity),
-                price_at_order=price_at_order,
-                subtotal=subtotal
-            )
-            order_items_to_create.append(order_item)
-        
-        if not order_items_to_create:
-            return jsonify({"message": "Order must contain at least one item"}), 400
+        # Items with a stock count are reserved first, before anything is inserted (see inventory.py)
+        tracked_quantities = {row.id: requested_quantities[row.id] for row in item_rows if row.stock_quantity is not None}
+
+        # Numeric columns come back as Decimal; keep all arithmetic in Decimal
+        order_item_rows, total_amount = price_order_lines(requested_quantities, prices)
+        sold_out = []
+        if tracked_quantities:
+            if not reserve_stock(restaurant_id, tracked_quantities):
+                db.session.rollback()
+                return jsonify({"message": "Insufficient stock", "items": stock_shortfall(tracked_quantities)}), 409
+            sold_out = sold_out_items(list(tracked_quantities))
 
         new_order = Order(
             user_id=current_user_id,
+            restaurant_id=restaurant_id,
             delivery_address_id=delivery_address_id,
             total_amount=total_amount,
             payment_method=payment_method,
             delivery_instructions=delivery_instructions,
-            status=\"pending\", # Initial status
-            payment_status=\"pending\" # Initial payment status
+            status="pending", # Initial status
+            payment_status="pending" # Initial payment status
         )
-
-        for oi in order_items_to_create:
-            new_order.order_items.append(oi)
-
         db.session.add(new_order)
+        db.session.flush() # Assigns new_order.id inside the same transaction
+        order_id = new_order.id
+
+        for row in order_item_rows:
+            row["order_id"] = order_id
+            row["reserved_quantity"] = tracked_quantities.get(row["menu_item_id"]) # What release_stock gives back
+        # Executemany insert (batched by SQLAlchemy's insertmanyvalues) instead of one INSERT per item
+        db.session.execute(insert(OrderItem), order_item_rows)
         db.session.commit()
+        apply_availability_changes(restaurant_id, sold_out)
 
-        # Prepare response (can be more detailed)
+        # Built from local values; no refresh of the expired new_order or its order_items
         return jsonify({
             "message": "Order created successfully",
-            "order_id": new_order.id,
-            "total_amount": str(new_order.total_amount),
-            "status": new_order.status,
-            "items_count": len(new_order.order_items)
+            "order_id": order_id,
+            "total_amount": str(total_amount),
+            "status": "pending",
+            "items_count": len(order_item_rows)
         }), 201
 
     except IntegrityError as e:
@@ -90,22 +103,60 @@ def create_order():
         db.session.rollback()
         return jsonify({"message": "Error creating order", "error": str(e)}), 500
 
+@orders_bp.route("/orders/quote", methods=["POST"])
+def quote_order():
+    # Prices a cart without creating anything; served from the in-memory price table
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({"message": "Request body must be a JSON object"}), 400
+    items_data = data.get("items")
+    if not items_data:
+        return jsonify({"message": "Items are required"}), 400
+    try:
+        requested_quantities = parse_order_items(items_data)
+    except ValueError as e:
+        return jsonify({"message": str(e)}), 400
+
+    price_table.ensure_loaded() # Only touches the database on a cold worker
+    prices, unavailable_items = price_table.orderable_prices(current_restaurant_id(), requested_quantities)
+    lines, total_amount = price_order_lines(
+        {menu_item_id: quantity for menu_item_id, quantity in requested_quantities.items() if menu_item_id in prices},
+        prices
+    )
+    return jsonify({
+        "items": [{
+            "menu_item_id": line["menu_item_id"],
+            "quantity": line["quantity"],
+            "unit_price": line["price_at_order"],
+            "subtotal": line["subtotal"]
+        } for line in lines],
+        "unavailable_items": unavailable_items,
+        "total_amount": total_amount
+    }), 200
+
 @orders_bp.route("/orders", methods=["GET"])
 @jwt_required()
 def get_user_orders():
     current_user_id = get_jwt_identity()
+    restaurant_id = current_restaurant_id()
+    # Optional ?limit=N returns the N most recent orders; the archive is only read when the
+    # recent orders don't fill the page
+    limit = request.args.get("limit", type=int)
+    if limit is not None and limit <= 0:
+        return jsonify({"message": "limit must be a positive integer"}), 400
     try:
-        orders = Order.query.filter_by(user_id=current_user_id).order_by(Order.created_at.desc()).all()
-        orders_list = []
-        for order in orders:
-            orders_list.append({
-                "id": order.id,
-                "total_amount": str(order.total_amount),
-                "status": order.status,
-                "payment_status": order.payment_status,
-                "created_at": order.created_at.isoformat(),
-                "items_preview": [{"name": oi.menu_item.name, "quantity": oi.quantity} for oi in order.order_items[:2]] # Preview first 2 items
-            })
+        owner = {"restaurant_id": restaurant_id, "user_id": current_user_id}
+        orders = db.session.execute(USER_ORDERS.limit(limit), owner).all()
+        previews = load_items_preview([order.id for order in orders]) # Preview first 2 items
+        orders_list = [serialize_order_summary(order, previews[order.id]) for order in orders]
+
+        if limit is None or len(orders) < limit:
+            # Older, finished orders live in the archive tables
+            archived_orders = db.session.execute(
+                USER_ARCHIVED_ORDERS.limit(None if limit is None else limit - len(orders)), owner
+            ).all()
+            archived_previews = load_items_preview([order.id for order in archived_orders], archived=True)
+            orders_list += [serialize_order_summary(order, archived_previews[order.id]) for order in archived_orders]
         return jsonify(orders_list), 200
     except Exception as e:
         return jsonify({"message": "Error fetching orders", "error": str(e)}), 500
@@ -115,36 +166,11 @@ def get_user_orders():
 def get_order_details(order_id):
     current_user_id = get_jwt_identity()
     try:
-        order = Order.query.filter_by(id=order_id, user_id=current_user_id).first()
-        if not order:
+        restaurant_id = current_restaurant_id()
+        order_details = (load_order_detail(order_id, user_id=current_user_id, restaurant_id=restaurant_id)
+                         or load_order_detail(order_id, user_id=current_user_id, archived=True, restaurant_id=restaurant_id))
+        if not order_details:
             return jsonify({"message": "Order not found or access denied"}), 404
-
-        order_details = {
-            "id": order.id,
-            "user_id": order.user_id,
-            "total_amount": str(order.total_amount),
-            "status": order.status,
-            "payment_status": order.payment_status,
-            "payment_method": order.payment_method,
-            "delivery_instructions": order.delivery_instructions,
-            "estimated_delivery_time": order.estimated_delivery_time.isoformat() if order.estimated_delivery_time else None,
-            "created_at": order.created_at.isoformat(),
-            "updated_at": order.updated_at.isoformat(),
-            "delivery_address": {
-                "address_line1": order.delivery_address.address_line1,
-                "address_line2": order.delivery_address.address_line2,
-                "city": order.delivery_address.city,
-                "postal_code": order.delivery_address.postal_code,
-                "country": order.delivery_address.country
-            },
-            "order_items": [{
-                "menu_item_id": oi.menu_item_id,
-                "menu_item_name": oi.menu_item.name,
-                "quantity": oi.quantity,
-                "price_at_order": str(oi.price_at_order),
-                "subtotal": str(oi.subtotal)
-            } for oi in order.order_items]
-        }
         return jsonify(order_details), 200
     except Exception as e:
         return jsonify({"message": "Error fetching order details", "error": str(e)}), 500
@@ -153,20 +179,21 @@ def get_order_details(order_id):
 @jwt_required()
 def cancel_order(order_id):
     current_user_id = get_jwt_identity()
+    # Customers may only cancel before preparation starts; staff can cancel later via the admin API
+    cancellable_statuses = ["pending", "confirmed"]
+    ownership = (Order.user_id == current_user_id, Order.restaurant_id == current_restaurant_id())
     try:
-        order = Order.query.filter_by(id=order_id, user_id=current_user_id).first()
-        if not order:
-            return jsonify({"message": "Order not found or access denied"}), 404
-
-        # Define cancellable statuses
-        cancellable_statuses = ["pending", "confirmed"]
-        if order.status not in cancellable_statuses:
-            return jsonify({"message": f"Order cannot be cancelled. Current status: {order.status}"}), 400
-
-        order.status = "cancelled"
+        from_status = transition_order(order_id, "cancelled", from_statuses=cancellable_statuses,
+                                       changed_by=current_user_id, source="customer", filters=ownership)
+        if from_status is None:
+            db.session.rollback()
+            body, status_code = explain_failed_transition(order_id, "cancelled", cancellable_statuses, filters=ownership)
+            return jsonify(body), status_code
         # Potentially, also update payment_status if applicable (e.g., to "refund_pending" or "cancelled")
+        restocked = release_stock([order_id])
         db.session.commit()
-        return jsonify({"message": "Order cancelled successfully", "order_id": order.id, "new_status": order.status}), 200
+        apply_availability_changes(current_restaurant_id(), restocked)
+        return jsonify({"message": "Order cancelled successfully", "order_id": order_id, "new_status": "cancelled"}), 200
     except Exception as e:
         db.session.rollback()
         return jsonify({"message": "Error cancelling order", "error": str(e)}), 500
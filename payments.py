@@ -2,12 +2,27 @@
 
 from flask import Blueprint, request, jsonify
 from ..extensions import db
+from ..order_state import transition_order
 from ..models.models import Order, Payment # Assuming Payment model is defined
+from ..queries import PAYMENT_BY_TRANSACTION
+from ..tenancy import current_restaurant_id
 from flask_jwt_extended import jwt_required, get_jwt_identity
+from sqlalchemy import select, update
 from datetime import datetime
 
 payments_bp = Blueprint("payments_bp", __name__)
 
+def set_order_payment_status(order_id, payment_status):
+    # Targeted UPDATE so payment updates never rewrite the order status column. The locked
+    # previous value goes into the audit trail.
+    previous = db.session.execute(
+        select(Order.payment_status).where(Order.id == order_id).with_for_update()
+    ).scalar_one_or_none()
+    db.session.execute(
+        update(Order).where(Order.id == order_id).values(payment_status=payment_status)
+        .execution_options(synchronize_session=False, audit_before={order_id: {"payment_status": previous}})
+    )
+
 @payments_bp.route("/payments/initiate", methods=["POST"])
 @jwt_required()
 def initiate_payment():
@@ -19,7 +34,7 @@ def initiate_payment():
     if not order_id:
         return jsonify({"message": "Order ID is required"}), 400
 
-    order = Order.query.filter_by(id=order_id, user_id=current_user_id).first()
+    order = Order.query.filter_by(id=order_id, user_id=current_user_id, restaurant_id=current_restaurant_id()).first()
     if not order:
         return jsonify({"message": "Order not found or access denied"}), 404
 
@@ -37,11 +52,9 @@ def initiate_payment():
         # Simulate a successful payment for non-COD orders for now
         payment_status_update = "success"
         order.payment_status = "paid"
-        order.status = "confirmed" # Or some other appropriate status after payment
     else:
         # For COD, payment is pending until delivery
         order.payment_status = "pending" # Or could be 'due_on_delivery'
-        order.status = "confirmed" # Confirm order even for COD
 
     try:
         # Create a payment record
@@ -53,6 +66,8 @@ def initiate_payment():
             payment_method_details=data.get("payment_method_details", {})
         )
         db.session.add(new_payment)
+        # Confirm the order (COD orders too); a no-op if it already moved past pending
+        transition_order(order.id, "confirmed", from_statuses=["pending"], changed_by=current_user_id, source="payment")
         db.session.commit()
 
         return jsonify({
@@ -83,7 +98,9 @@ def payment_webhook():
     if not gateway_txn_id or not payment_outcome or not order_reference_id:
         return jsonify({"message": "Invalid webhook data"}), 400
 
-    payment_record = Payment.query.filter_by(payment_gateway_transaction_id=gateway_txn_id, order_id=order_reference_id).first()
+    payment_record = db.session.execute(
+        PAYMENT_BY_TRANSACTION, {"transaction_id": gateway_txn_id, "order_id": order_reference_id}
+    ).scalars().first()
     if not payment_record:
         # Or, if order_id is the primary reference from webhook:
         # order = Order.query.get(order_reference_id)
@@ -92,19 +109,19 @@ def payment_webhook():
         # else:
         return jsonify({"message": "Payment record not found for this transaction"}), 404
 
-    order = Order.query.get(payment_record.order_id)
-    if not order:
-        return jsonify({"message": "Associated order not found"}), 404
+    order_id = payment_record.order_id
 
     try:
         if payment_outcome == "success":
             payment_record.status = "success"
-            order.payment_status = "paid"
-            order.status = "confirmed" # Or "preparing" if payment confirmation triggers preparation
+            set_order_payment_status(order_id, "paid")
+            # Or "preparing" if payment confirmation triggers preparation; a no-op if the order
+            # is already confirmed (or further along)
+            transition_order(order_id, "confirmed", from_statuses=["pending"], source="payment_webhook")
             # Potentially trigger other actions: send confirmation email, notify kitchen, etc.
         elif payment_outcome == "failed":
             payment_record.status = "failed"
-            order.payment_status = "failed"
+            set_order_payment_status(order_id, "failed")
             # Potentially trigger other actions: notify user, etc.
         else:
             # Handle other statuses like 'pending', 'cancelled' from gateway if any
@@ -0,0 +1,113 @@
+# backend_app/src/pricing.py
+
+# Order pricing shared by orders.create_order and the side-effect-free quote endpoint.
+# PriceTable mirrors MenuItem.id -> (price, is_available, category_id) plus each category's
+# is_active flag in memory, partitioned by restaurant, so quotes need no database I/O. The admin
+# menu routes update it on every write in their worker; a periodic full reload picks up writes
+# made by other workers.
+
+import threading
+from decimal import Decimal
+
+from sqlalchemy import select
+
+from .extensions import db
+from .background import run_periodically
+from .models.models import MenuItem, Category
+
+def _positive_int(value):
+    # JSON integers only: 2.7, "2" and true (bool is an int subclass) are rejected, not truncated
+    return isinstance(value, int) and not isinstance(value, bool) and value >= 1
+
+def parse_order_items(items_data):
+    """[{"menu_item_id", "quantity"}, ...] -> {menu_item_id: total quantity}.
+
+    Raises ValueError for malformed lines.
+    """
+    if not isinstance(items_data, list):
+        raise ValueError("Items must be a list")
+    requested_quantities = {}
+    for item_data in items_data:
+        if not isinstance(item_data, dict):
+            raise ValueError("Invalid menu item ID or quantity")
+        menu_item_id = item_data.get("menu_item_id")
+        quantity = item_data.get("quantity")
+        if not _positive_int(menu_item_id) or not _positive_int(quantity):
+            raise ValueError("Invalid menu item ID or quantity")
+        requested_quantities[menu_item_id] = requested_quantities.get(menu_item_id, 0) + quantity
+    return requested_quantities
+
+def price_order_lines(requested_quantities, prices):
+    """Price each line at the given unit prices (all Decimal).
+
+    Returns (lines, total_amount); lines are dicts shaped like OrderItem rows.
+    """
+    total_amount = Decimal("0.00")
+    lines = []
+    for menu_item_id, quantity in requested_quantities.items():
+        price_at_order = prices[menu_item_id]
+        subtotal = price_at_order * quantity
+        total_amount += subtotal
+        lines.append({
+            "menu_item_id": menu_item_id,
+            "quantity": quantity,
+            "price_at_order": price_at_order,
+            "subtotal": subtotal
+        })
+    return lines, total_amount
+
+class PriceTable:
+    def __init__(self):
+        self._items = {} # restaurant id -> {menu item id -> (price, is_available, category_id)}
+        self._category_active = {} # restaurant id -> {category id -> is_active}
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    def load(self):
+        """Full reload from the database. Needs an app context."""
+        items, categories = {}, {}
+        for row in db.session.execute(select(MenuItem.restaurant_id, MenuItem.id, MenuItem.price, MenuItem.is_available, MenuItem.category_id)):
+            items.setdefault(row.restaurant_id, {})[row.id] = (Decimal(row.price), bool(row.is_available), row.category_id)
+        for row in db.session.execute(select(Category.restaurant_id, Category.id, Category.is_active)):
+            categories.setdefault(row.restaurant_id, {})[row.id] = bool(row.is_active)
+        with self._lock:
+            self._items, self._category_active = items, categories
+            self._loaded = True
+
+    def ensure_loaded(self):
+        if not self._loaded:
+            self.load()
+
+    def set_item(self, restaurant_id, menu_item_id, price, is_available, category_id):
+        with self._lock:
+            self._items.setdefault(restaurant_id, {})[menu_item_id] = (Decimal(str(price)), bool(is_available), category_id)
+
+    def remove_item(self, restaurant_id, menu_item_id):
+        with self._lock:
+            self._items.get(restaurant_id, {}).pop(menu_item_id, None)
+
+    def set_category(self, restaurant_id, category_id, is_active):
+        with self._lock:
+            self._category_active.setdefault(restaurant_id, {})[category_id] = bool(is_active)
+
+    def remove_category(self, restaurant_id, category_id):
+        with self._lock:
+            self._category_active.get(restaurant_id, {}).pop(category_id, None)
+
+    def orderable_prices(self, restaurant_id, menu_item_ids):
+        """({id: price} for the restaurant's orderable items, [ids that are unknown or unavailable there])."""
+        items = self._items.get(restaurant_id, {})
+        category_active = self._category_active.get(restaurant_id, {})
+        prices, unavailable = {}, []
+        for menu_item_id in menu_item_ids:
+            entry = items.get(menu_item_id)
+            if entry and entry[1] and category_active.get(entry[2], False):
+                prices[menu_item_id] = entry[0]
+            else:
+                unavailable.append(menu_item_id)
+        return prices, unavailable
+
+price_table = PriceTable()
+
+def init_pricing(app):
+    run_periodically(app, "price-table", app.config.get("PRICE_TABLE_REFRESH_SECONDS", 60), price_table.load)
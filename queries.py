@@ -0,0 +1,124 @@
+# backend_app/src/queries.py
+
+# Hot-path statements, built once at import and shared by the routes and warmup.py.
+# SQLAlchemy caches compiled SQL on the engine per statement shape; building these constructs
+# once with bindparam() placeholders skips per-request statement construction, and warmup runs
+# each of them so the compiled cache is filled before the first real request.
+# query_plans.py EXPLAINs these same objects, so the checked plans are the routes' plans.
+
+from sqlalchemy import select, update, bindparam, or_
+
+from .models.models import User, Address, Category, MenuItem, RestaurantInfo, Order, ArchivedOrder, Payment
+from .serializers import (MENU_ITEM_LIST_FIELDS, CATEGORY_LIST_FIELDS, ORDER_SUMMARY_COLUMNS, ARCHIVED_ORDER_SUMMARY_COLUMNS,
+                          select_fieldset)
+
+USER_BY_LOGIN = select(User).where(
+    or_(User.email == bindparam("login"), User.username == bindparam("login"))
+).limit(1)
+
+# Profile columns only (no password_hash); loaded at most once per request by identity.CurrentUser
+USER_PROFILE = select(
+    User.id, User.username, User.email, User.full_name, User.phone_number, User.role, User.restaurant_id,
+    User.all_restaurants
+).where(User.id == bindparam("user_id"))
+
+USER_ADDRESS_ID = select(Address.id).where(Address.id == bindparam("address_id"), Address.user_id == bindparam("user_id"))
+
+USER_ADDRESSES = (
+    select(Address).where(Address.user_id == bindparam("user_id"))
+    .order_by(Address.is_default.desc(), Address.created_at.desc())
+)
+
+# "fetch" keeps loaded Address objects in step, so the new default set right after is flushed.
+# An UPDATE may not reuse a column name as a parameter name, hence "owner_id".
+CLEAR_DEFAULT_ADDRESS = (
+    update(Address).where(Address.user_id == bindparam("owner_id"), Address.is_default == True)
+    .values(is_default=False).execution_options(synchronize_session="fetch")
+)
+
+# Callers add .limit(); the archive is read the same way for older orders
+USER_ORDERS = (
+    select(*ORDER_SUMMARY_COLUMNS).where(Order.restaurant_id == bindparam("restaurant_id"), Order.user_id == bindparam("user_id"))
+    .order_by(Order.created_at.desc())
+)
+USER_ARCHIVED_ORDERS = (
+    select(*ARCHIVED_ORDER_SUMMARY_COLUMNS)
+    .where(ArchivedOrder.restaurant_id == bindparam("restaurant_id"), ArchivedOrder.user_id == bindparam("user_id"))
+    .order_by(ArchivedOrder.created_at.desc())
+)
+
+PAYMENT_BY_TRANSACTION = select(Payment).where(
+    Payment.payment_gateway_transaction_id == bindparam("transaction_id"), Payment.order_id == bindparam("order_id")
+)
+
+ORDER_PAYMENT_ID = select(Payment.id).where(Payment.order_id == bindparam("order_id"))
+
+# Callers add .limit(). No ORDER BY: any batch of candidates will do, read straight from
+# ix_orders_status_created
+ARCHIVABLE_ORDERS = select(Order.id).where(
+    Order.created_at < bindparam("cutoff"), Order.status.in_(bindparam("statuses", expanding=True))
+)
+
+# Tenant-scoped statements take a "restaurant_id" parameter
+
+# Orderable = available item in an active category, the same rule as the quote's PriceTable
+AVAILABLE_ITEM_PRICES = (
+    select(MenuItem.id, MenuItem.price, MenuItem.stock_quantity)
+    .join(Category, MenuItem.category_id == Category.id)
+    .where(
+        MenuItem.restaurant_id == bindparam("restaurant_id"),
+        MenuItem.id.in_(bindparam("menu_item_ids", expanding=True)),
+        MenuItem.is_available == True,
+        Category.is_active == True
+    )
+)
+
+PUBLIC_MENU_ITEMS = (
+    select(*select_fieldset(MENU_ITEM_LIST_FIELDS))
+    .select_from(MenuItem)
+    .join(Category, MenuItem.category_id == Category.id)
+    # Categories are filtered by restaurant too (an item's category is always its own restaurant's),
+    # so the join reads ix_categories_restaurant_active instead of scanning every category
+    .where(MenuItem.restaurant_id == bindparam("restaurant_id"), MenuItem.is_available == True,
+           Category.restaurant_id == bindparam("restaurant_id"), Category.is_active == True)
+)
+
+ACTIVE_CATEGORIES = select(*select_fieldset(CATEGORY_LIST_FIELDS)).where(
+    Category.restaurant_id == bindparam("restaurant_id"), Category.is_active == True
+)
+
+CATEGORY_IS_ACTIVE = select(Category.is_active).where(
+    Category.id == bindparam("category_id"), Category.restaurant_id == bindparam("restaurant_id")
+)
+
+CATEGORY_MENU_ITEMS = select(
+    MenuItem.id, MenuItem.name, MenuItem.description, MenuItem.price, MenuItem.image_url, MenuItem.is_available
+).where(MenuItem.category_id == bindparam("category_id"), MenuItem.is_available == True)
+
+RESTAURANT_INFO = select(RestaurantInfo).where(RestaurantInfo.id == bindparam("restaurant_id"))
+
+ADMIN_ORDERS = (
+    select(*ORDER_SUMMARY_COLUMNS, User.email.label("user_email"))
+    .join(User, Order.user_id == User.id)
+    .where(Order.restaurant_id == bindparam("restaurant_id"))
+    .order_by(Order.created_at.desc())
+)
+
+# Callers add .limit()
+DISPATCH_CANDIDATES = (
+    select(Order.id, Address.city, Address.postal_code)
+    .join(Address, Order.delivery_address_id == Address.id)
+    .where(Order.restaurant_id == bindparam("restaurant_id"), Order.status == bindparam("status"))
+    .order_by(Order.created_at, Order.id)
+)
+
+# Statement -> placeholder parameters used to compile it during warmup
+WARMUP_PARAMETERS = [
+    (USER_BY_LOGIN, {"login": ""}),
+    (USER_PROFILE, {"user_id": 0}),
+    (USER_ADDRESS_ID, {"address_id": 0, "user_id": 0}),
+    (AVAILABLE_ITEM_PRICES, {"restaurant_id": 0, "menu_item_ids": [0]}),
+    (PUBLIC_MENU_ITEMS, {"restaurant_id": 0}),
+    (ACTIVE_CATEGORIES, {"restaurant_id": 0}),
+    (RESTAURANT_INFO, {"restaurant_id": 0}),
+]
@@ -0,0 +1,215 @@
+# backend_app/src/query_plans.py
+
+# Query-plan audit for the statements behind the hot routes.
+# HOT_QUERIES holds the very statement objects the routes execute (queries.py, serializers.py),
+# not copies, and each is EXPLAINed as the SQL the route would send. Any plan that reads a whole
+# table or a whole index is reported and the command exits non-zero, so CI can run it against a
+# seeded database after schema changes:
+#
+#   flask --app src.main check-query-plans
+#
+# Optimizers prefer a table scan over an index on tiny (or empty) tables, so the plans only mean
+# something against realistic volumes. On a scratch database (CI, tests) --seed inserts that
+# many orders plus the users, addresses, menu and payments around them and refreshes the
+# optimizer statistics first:
+#
+#   flask --app src.main check-query-plans --seed 5000
+#
+# What counts as a full scan:
+#   - SQLite: every "SCAN <table>" step, with or without "USING [COVERING] INDEX" (a full index
+#     scan still reads every entry). Index lookups show up as "SEARCH".
+#   - MySQL: access type ALL (table scan) and index (full index scan).
+# A query that means to walk a whole table or index lists it in INTENDED_SCANS.
+#
+# Statements are EXPLAINed, never executed.
+
+import random
+import sys
+from datetime import datetime, timedelta
+
+import click
+from sqlalchemy import select, func, insert, text, event
+
+from .extensions import db
+from .models.models import (User, Address, RestaurantInfo, Category, MenuItem, Order, OrderItem, OrderStatusHistory,
+                             Payment)
+from .queries import (USER_BY_LOGIN, USER_PROFILE, USER_ADDRESS_ID, USER_ADDRESSES, CLEAR_DEFAULT_ADDRESS,
+                      AVAILABLE_ITEM_PRICES, PUBLIC_MENU_ITEMS, ACTIVE_CATEGORIES, CATEGORY_IS_ACTIVE, CATEGORY_MENU_ITEMS,
+                      RESTAURANT_INFO, USER_ORDERS, USER_ARCHIVED_ORDERS, ADMIN_ORDERS, DISPATCH_CANDIDATES,
+                      ARCHIVABLE_ORDERS, PAYMENT_BY_TRANSACTION, ORDER_PAYMENT_ID)
+from .serializers import ORDER_DETAIL_ITEMS, ORDER_ITEMS_PREVIEW
+from .archival import ARCHIVABLE_STATUSES
+from .dispatch import DISPATCH_FROM_STATUS
+
+# Name -> (statement, parameters). Statements the routes extend with .limit() are checked with
+# a typical page size.
+HOT_QUERIES = {
+    "user_by_login": (USER_BY_LOGIN, {"login": "customer@example.com"}),
+    "user_profile": (USER_PROFILE, {"user_id": 1}),
+    "user_address": (USER_ADDRESS_ID, {"address_id": 1, "user_id": 1}),
+    "user_addresses": (USER_ADDRESSES, {"user_id": 1}),
+    "clear_default_address": (CLEAR_DEFAULT_ADDRESS, {"owner_id": 1}),
+    "available_item_prices": (AVAILABLE_ITEM_PRICES, {"restaurant_id": 1, "menu_item_ids": [1, 2, 3]}),
+    "public_menu": (PUBLIC_MENU_ITEMS, {"restaurant_id": 1}),
+    "active_categories": (ACTIVE_CATEGORIES, {"restaurant_id": 1}),
+    "category_is_active": (CATEGORY_IS_ACTIVE, {"category_id": 1, "restaurant_id": 1}),
+    "category_menu_items": (CATEGORY_MENU_ITEMS, {"category_id": 1}),
+    "restaurant_info": (RESTAURANT_INFO, {"restaurant_id": 1}),
+    "user_orders": (USER_ORDERS.limit(20), {"restaurant_id": 1, "user_id": 1}),
+    "user_archived_orders": (USER_ARCHIVED_ORDERS.limit(20), {"restaurant_id": 1, "user_id": 1}),
+    "order_detail_items": (ORDER_DETAIL_ITEMS[False], {"order_id": 1}),
+    "order_items_preview": (ORDER_ITEMS_PREVIEW[False], {"order_ids": [1, 2, 3]}),
+    "archived_order_items_preview": (ORDER_ITEMS_PREVIEW[True], {"order_ids": [1, 2, 3]}),
+    "admin_orders": (ADMIN_ORDERS, {"restaurant_id": 1}),
+    "dispatch_candidates": (DISPATCH_CANDIDATES.limit(500), {"restaurant_id": 1, "status": DISPATCH_FROM_STATUS}),
+    "archivable_orders": (ARCHIVABLE_ORDERS.limit(500),
+                          {"cutoff": datetime.utcnow() - timedelta(days=180), "statuses": list(ARCHIVABLE_STATUSES)}),
+    "payment_by_transaction": (PAYMENT_BY_TRANSACTION, {"transaction_id": "txn_1", "order_id": 1}),
+    "order_payment": (ORDER_PAYMENT_ID, {"order_id": 1}),
+}
+
+# Name -> tables the query is meant to read in full (e.g. a covering index it walks on purpose)
+INTENDED_SCANS = {}
+
+SEED_RESTAURANTS = 3
+SEED_STATUSES = ("pending", "confirmed", "preparing", "out_for_delivery", "delivered", "cancelled")
+
+def seed_fixture_rows(orders=5000, seed=0):
+    """Insert orders (with their users, addresses, menu, lines, history and payments) for EXPLAIN.
+
+    Meant for a scratch database only. Ids continue after the current maximum of every table,
+    rows go in with executemany INSERTs on one connection (no session, so nothing is audited),
+    and the optimizer statistics are refreshed afterwards.
+    """
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+    users = max(orders // 5, 1)
+    with db.engine.begin() as connection:
+        def next_id(model):
+            return (connection.execute(select(func.max(model.id))).scalar() or 0) + 1
+        def add(model, rows):
+            if rows:
+                connection.execute(insert(model), rows)
+            return rows
+
+        first = next_id(RestaurantInfo)
+        restaurants = [r["id"] for r in add(RestaurantInfo, [
+            {"id": first + n, "name": f"Plan fixture {first + n}"} for n in range(SEED_RESTAURANTS)])]
+        first = next_id(User)
+        user_ids = [r["id"] for r in add(User, [{
+            "id": first + n, "username": f"plan_user_{first + n}", "email": f"plan_user_{first + n}@example.com",
+            "password_hash": "x", "role": "customer", "created_at": now} for n in range(users)])]
+        first = next_id(Address)
+        addresses = add(Address, [{
+            "id": first + n, "user_id": user_id, "address_line1": "1 Fixture St", "city": rng.choice(("Cairo", "Giza")),
+            "postal_code": str(11500 + rng.randrange(50)), "country": "EG", "is_default": n % 2 == 0,
+            "created_at": now - timedelta(days=rng.randrange(365))} for n, user_id in enumerate(user_ids * 2)])
+        first = next_id(Category)
+        categories = add(Category, [{
+            "id": first + n, "restaurant_id": restaurants[n % len(restaurants)], "name": f"Category {first + n}",
+            "is_active": n % 5 != 0} for n in range(10 * len(restaurants))])
+        first = next_id(MenuItem)
+        menu_items = add(MenuItem, [{
+            "id": first + n, "restaurant_id": category["restaurant_id"], "category_id": category["id"],
+            "name": f"Item {first + n}", "description": "", "price": "9.50", "is_available": n % 7 != 0}
+            for n, category in enumerate(categories * 10)])
+        items_by_restaurant = {}
+        for item in menu_items:
+            items_by_restaurant.setdefault(item["restaurant_id"], []).append(item["id"])
+        first, first_line, first_history, first_payment = next_id(Order), next_id(OrderItem), next_id(OrderStatusHistory), next_id(Payment)
+        order_rows, line_rows, history_rows, payment_rows = [], [], [], []
+        for n in range(orders):
+            order_id = first + n
+            address = rng.choice(addresses)
+            restaurant_id = rng.choice(restaurants)
+            status = rng.choice(SEED_STATUSES)
+            created_at = now - timedelta(days=rng.randrange(400), seconds=rng.randrange(86400))
+            order_rows.append({
+                "id": order_id, "user_id": address["user_id"], "delivery_address_id": address["id"],
+                "restaurant_id": restaurant_id, "total_amount": "19.00", "status": status,
+                "payment_status": "paid" if status != "pending" else "pending", "created_at": created_at})
+            for menu_item_id in rng.sample(items_by_restaurant[restaurant_id], 2):
+                line_rows.append({"id": first_line + len(line_rows), "order_id": order_id, "menu_item_id": menu_item_id,
+                                  "quantity": 1, "price_at_order": "9.50", "subtotal": "9.50"})
+            history_rows.append({"id": first_history + n, "order_id": order_id, "from_status": "pending",
+                                 "to_status": status, "created_at": created_at})
+            payment_rows.append({"id": first_payment + n, "order_id": order_id, "amount": "19.00",
+                                 "payment_gateway_transaction_id": f"plan_txn_{order_id}",
+                                 "status": "pending" if status == "pending" else "success", "created_at": created_at})
+        for model, rows in ((Order, order_rows), (OrderItem, line_rows), (OrderStatusHistory, history_rows), (Payment, payment_rows)):
+            add(model, rows)
+    analyze()
+
+def analyze():
+    """Refresh the optimizer statistics of the seeded tables."""
+    tables = [model.__tablename__ for model in (User, Address, RestaurantInfo, Category, MenuItem, Order, OrderItem,
+                                                 OrderStatusHistory, Payment)]
+    with db.engine.begin() as connection:
+        if db.engine.dialect.name == "mysql":
+            connection.execute(text("ANALYZE TABLE " + ", ".join(tables)))
+        else:
+            connection.execute(text("ANALYZE"))
+
+def explain(statement, parameters):
+    """Plan rows for statement as a list of dicts, using the dialect's EXPLAIN.
+
+    The statement is executed through SQLAlchemy as a route would run it, with EXPLAIN put in
+    front of the SQL just before it reaches the driver; nothing else is sent.
+    """
+    prefix = "EXPLAIN QUERY PLAN " if db.engine.dialect.name == "sqlite" else "EXPLAIN "
+
+    def add_explain(connection, cursor, sql, driver_parameters, context, executemany):
+        return prefix + sql, driver_parameters
+
+    with db.engine.connect() as connection:
+        event.listen(connection, "before_cursor_execute", add_explain, retval=True)
+        try:
+            # Rows straight from the driver: the result's own columns and type processors are the
+            # statement's, not EXPLAIN's
+            cursor = connection.execute(statement, parameters).cursor
+            columns = [column[0] for column in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+        finally:
+            event.remove(connection, "before_cursor_execute", add_explain)
+            connection.rollback()
+
+def _scanned_table(detail):
+    # "SCAN orders", "SCAN o USING INDEX ix", "SCAN TABLE orders" (older SQLite) -> table name
+    words = detail.split()
+    return words[2] if len(words) > 2 and words[1] == "TABLE" else words[1]
+
+def full_scans(plan, intended=()):
+    """Plan rows that read a whole table or index, except scans of the tables in intended."""
+    scans = []
+    for row in plan:
+        if "detail" in row: # SQLite: "SEARCH ..." is an index or rowid lookup; every "SCAN ..." reads it all
+            detail = row["detail"]
+            if detail.startswith("SCAN ") and _scanned_table(detail) not in intended:
+                scans.append(detail)
+        elif row.get("type") in ("ALL", "index") and row.get("table") not in intended: # MySQL
+            scans.append(f"{row.get('table')}: type={row.get('type')}, key={row.get('key')}, rows={row.get('rows')}")
+    return scans
+
+def check_query_plans(queries=None):
+    """name -> list of full scans, for every statement that has at least one."""
+    failures = {}
+    for name, (statement, parameters) in (queries or HOT_QUERIES).items():
+        scans = full_scans(explain(statement, parameters), INTENDED_SCANS.get(name, ()))
+        if scans:
+            failures[name] = scans
+    return failures
+
+def init_query_plans(app):
+    @app.cli.command("check-query-plans")
+    @click.option("--seed", "seed_orders", default=0, show_default=True,
+                  help="Insert this many fixture orders (and related rows) first. Scratch databases only.")
+    def check_query_plans_command(seed_orders):
+        if seed_orders:
+            seed_fixture_rows(seed_orders)
+        failures = check_query_plans()
+        for name in HOT_QUERIES:
+            click.echo(f"{'FULL SCAN' if name in failures else 'ok':>9}  {name}")
+            for scan in failures.get(name, []):
+                click.echo(f"           {scan}")
+        if failures:
+            sys.exit(1)
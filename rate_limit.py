@@ -0,0 +1,163 @@
+# backend_app/src/rate_limit.py
+
+# Token-bucket rate limiting and request admission control.
+# Buckets are keyed on the endpoint's budget name plus the caller: the JWT identity when
+# a valid token is sent, otherwise the client IP (put the app behind ProxyFix when it runs
+# behind a reverse proxy so remote_addr is the real client).
+#
+# Backends:
+#   MemoryBackend - per-process dict; fastest, but each worker has its own budget.
+#   SQLiteBackend - a local SQLite file shared by all workers on the host.
+
+import math
+import sqlite3
+import threading
+import time
+
+from flask import request, jsonify
+from flask_jwt_extended import verify_jwt_in_request, get_jwt_identity
+
+# Budget name -> (capacity, period_seconds): bursts of up to `capacity` requests, refilled
+# evenly over `period_seconds`. Endpoint names ("blueprint.view") override blueprint budgets;
+# None exempts an endpoint. Endpoints with no matching budget are not limited.
+DEFAULT_RATE_LIMITS = {
+    "auth_bp.login": (10, 60),
+    "auth_bp.register": (5, 60),
+    "auth_bp": (60, 60),
+    "orders_bp.create_order": (10, 60),
+    "orders_bp": (120, 60),
+    "menu_items_bp": (300, 60),
+    "categories_bp": (300, 60),
+    "addresses_bp": (60, 60),
+    "payments_bp.payment_webhook": None, # Called by the payment gateway, not by clients
+    "payments_bp": (30, 60),
+    "admin_bp": (600, 60),
+}
+
+def _refill(tokens, last, capacity, rate, now):
+    return min(capacity, tokens + (now - last) * rate)
+
+class MemoryBackend:
+    """In-process buckets: {key: (tokens, last_refill_time)}."""
+
+    def __init__(self, sweep_every=10000):
+        self._buckets = {}
+        self._lock = threading.Lock()
+        self._sweep_every = sweep_every
+        self._calls = 0
+
+    def consume(self, key, capacity, rate, now):
+        """Take one token; returns seconds to wait (0 when the request is admitted)."""
+        with self._lock:
+            tokens, last = self._buckets.get(key, (capacity, now))
+            tokens = _refill(tokens, last, capacity, rate, now)
+            if tokens >= 1:
+                self._buckets[key] = (tokens - 1, now)
+                wait = 0
+            else:
+                self._buckets[key] = (tokens, now)
+                wait = (1 - tokens) / rate
+            self._calls += 1
+            if self._calls >= self._sweep_every:
+                self._sweep(now)
+            return wait
+
+    def _sweep(self, now):
+        # A bucket idle for longer than any budget period is full again, which is the same as
+        # having no bucket; drop those to bound memory
+        self._calls = 0
+        idle = [key for key, (tokens, last) in self._buckets.items() if now - last > 3600]
+        for key in idle:
+            del self._buckets[key]
+
+class SQLiteBackend:
+    """Buckets in a local SQLite file, shared by every worker process on the host."""
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        conn = self._connection()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("CREATE TABLE IF NOT EXISTS rate_limit_buckets (key TEXT PRIMARY KEY, tokens REAL NOT NULL, last REAL NOT NULL)")
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA synchronous=OFF") # Losing a few bucket updates on power loss is acceptable
+            self._local.conn = conn
+        return conn
+
+    def consume(self, key, capacity, rate, now):
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE") # Serializes read-modify-write across processes
+        try:
+            row = conn.execute("SELECT tokens, last FROM rate_limit_buckets WHERE key = ?", (key,)).fetchone()
+            tokens, last = row if row else (capacity, now)
+            tokens = _refill(tokens, last, capacity, rate, now)
+            if tokens >= 1:
+                tokens -= 1
+                wait = 0
+            else:
+                wait = (1 - tokens) / rate
+            conn.execute("INSERT OR REPLACE INTO rate_limit_buckets (key, tokens, last) VALUES (?, ?, ?)", (key, tokens, now))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return wait
+
+def create_backend(storage):
+    """'memory' (default) or 'sqlite:///path/to/file.db'."""
+    if not storage or storage == "memory":
+        return MemoryBackend()
+    if storage.startswith("sqlite:///"):
+        return SQLiteBackend(storage[len("sqlite:///"):])
+    raise ValueError(f"Unsupported RATE_LIMIT_STORAGE: {storage}")
+
+class RateLimiter:
+    def __init__(self, limits, backend):
+        self.limits = limits
+        self.backend = backend
+
+    def budget_for(self, endpoint, blueprint):
+        """(budget_name, (capacity, period)) for the endpoint, or None if it is not limited."""
+        if endpoint in self.limits:
+            return (endpoint, self.limits[endpoint]) if self.limits[endpoint] else None
+        if blueprint and self.limits.get(blueprint):
+            return blueprint, self.limits[blueprint]
+        return None
+
+    def check_request(self):
+        budget = self.budget_for(request.endpoint, request.blueprint)
+        if budget is None:
+            return None
+        name, (capacity, period) = budget
+        wait = self.backend.consume(f"{name}:{_client_key()}", capacity, capacity / period, time.time())
+        if wait <= 0:
+            return None
+        response = jsonify({"message": "Too many requests. Please retry later."})
+        response.status_code = 429
+        response.headers["Retry-After"] = str(math.ceil(wait))
+        return response
+
+def _client_key():
+    if "Authorization" not in request.headers:
+        return f"ip:{request.remote_addr}"
+    try:
+        # optional=True: anonymous requests are fine; an invalid or expired token falls back to the IP
+        if verify_jwt_in_request(optional=True):
+            return f"user:{get_jwt_identity()}"
+    except Exception:
+        pass
+    return f"ip:{request.remote_addr}"
+
+def init_rate_limiter(app):
+    if not app.config.get("RATE_LIMIT_ENABLED", True):
+        return None
+    limits = dict(DEFAULT_RATE_LIMITS)
+    limits.update(app.config.get("RATE_LIMITS", {}))
+    limiter = RateLimiter(limits, create_backend(app.config.get("RATE_LIMIT_STORAGE", "memory")))
+    app.before_request(limiter.check_request)
+    app.extensions["rate_limiter"] = limiter
+    return limiter
@@ -0,0 +1,168 @@
+# backend_app/src/recommendations.py
+
+# "Popular now" and "frequently ordered together" for the storefront.
+# A background thread per worker folds new order lines into in-memory counters, reading only
+# orders with an id above the last one it processed, and then rebuilds the ranked results.
+# Order ids are assigned at INSERT, not COMMIT, so an order can become visible after a higher
+# id was already read: each refresh re-scans the last trailing_orders ids and folds in the
+# orders it has not counted yet. Counters only ever grow, so an order cancelled after it was
+# counted stays in them until the next full rebuild (every rebuild_interval seconds), which
+# recounts from scratch without cancelled orders and swaps the result in.
+# Everything is kept per restaurant (a partition per tenant):
+#   - popularity: per-day arrays of quantities indexed by menu item id; a window is the sum of
+#     its most recent day arrays, ranked once per refresh
+#   - co-occurrence: pair counts from order lines grouped by order_id, scored by cosine
+#     similarity, keeping the top neighbours of every item as a compact array
+# Requests then only look up the prebuilt arrays.
+
+import math
+import threading
+import time
+from array import array
+from datetime import datetime, timedelta
+
+from sqlalchemy import select
+
+from .extensions import db
+from .background import run_periodically
+from .models.models import Order, OrderItem
+
+POPULARITY_WINDOWS = {"1d": 1, "7d": 7, "30d": 30}
+TOP_N = 50 # Ranked entries kept per window / per item
+
+class _Partition:
+    """Counters and rankings for one restaurant."""
+
+    def __init__(self, windows):
+        self.day_counts = {} # date -> array('L') of quantities indexed by menu item id
+        self.order_counts = {} # menu item id -> number of orders containing it
+        self.pair_counts = {} # (smaller id, larger id) -> number of orders containing both
+        self.popular = {name: array('L') for name in windows} # window -> item ids, most popular first
+        self.related = {} # menu item id -> array('L') of item ids, best match first
+        self.changed_items = set() # Items whose co-occurrence scores need re-ranking
+
+class RecommendationIndex:
+    def __init__(self, windows=POPULARITY_WINDOWS, top_n=TOP_N, batch_size=5000, trailing_orders=1000,
+                 rebuild_interval=3600):
+        self.windows = windows
+        self.top_n = top_n
+        self.batch_size = batch_size
+        self.trailing_orders = trailing_orders # Ids below the last one read that are re-scanned for late commits
+        self.rebuild_interval = rebuild_interval
+        self.last_order_id = 0
+        self._counted = set() # Ids of counted orders within the trailing window
+        self._partitions = {} # restaurant id -> _Partition
+        self._next_rebuild = 0
+        self._lock = threading.Lock()
+
+    def popular(self, restaurant_id, window, limit):
+        partition = self._partitions.get(restaurant_id)
+        return list(partition.popular.get(window, ())[:limit]) if partition else []
+
+    def related(self, restaurant_id, menu_item_id, limit):
+        partition = self._partitions.get(restaurant_id)
+        return list(partition.related.get(menu_item_id, ())[:limit]) if partition else []
+
+    def refresh(self):
+        """Fold in orders placed since the last refresh and rebuild rankings. Needs an app context."""
+        with self._lock:
+            since = datetime.utcnow().date() - timedelta(days=max(self.windows.values()))
+            if time.monotonic() >= self._next_rebuild:
+                # Recount into fresh partitions; requests keep reading the old ones until the swap
+                partitions, counted = {}, set()
+                last_order_id = self._fold_orders(partitions, counted, 0, since)
+                self._partitions, self._counted, self.last_order_id = partitions, counted, last_order_id
+                self._next_rebuild = time.monotonic() + self.rebuild_interval
+            else:
+                self.last_order_id = self._fold_orders(self._partitions, self._counted, self.last_order_id, since)
+            for partition in self._partitions.values():
+                for day in [day for day in partition.day_counts if day < since]:
+                    del partition.day_counts[day] # Fell out of every window
+                self._rank_popular(partition)
+                self._rank_related(partition)
+
+    def _fold_orders(self, partitions, counted, last_order_id, since):
+        """Count the non-cancelled orders not yet in counted, from last_order_id - trailing_orders on.
+
+        Returns the new last order id.
+        """
+        max_order_id = db.session.execute(select(db.func.max(Order.id))).scalar() or 0
+        floor = max_order_id - self.trailing_orders # Only ids above this are remembered in counted
+        lower = max(last_order_id - self.trailing_orders, 0)
+        while lower < max_order_id:
+            # Bounded id ranges keep each read small, however far behind the index is
+            upper = min(lower + self.batch_size, max_order_id)
+            rows = db.session.execute(
+                select(Order.restaurant_id, OrderItem.order_id, OrderItem.menu_item_id, OrderItem.quantity, Order.created_at)
+                .join(Order, OrderItem.order_id == Order.id)
+                .where(Order.id > lower, Order.id <= upper, Order.status != "cancelled")
+                .order_by(OrderItem.order_id)
+            ).all()
+            rows = [row for row in rows if row.order_id not in counted]
+            self._add_rows(partitions, rows, since)
+            counted.update(row.order_id for row in rows if row.order_id > floor)
+            lower = upper
+        counted.difference_update([order_id for order_id in counted if order_id <= floor])
+        return max(last_order_id, max_order_id)
+
+    def _add_rows(self, partitions, rows, since):
+        current_order, partition, basket = None, None, []
+        for row in rows:
+            if row.order_id != current_order:
+                self._add_basket(partition, basket)
+                current_order, basket = row.order_id, []
+                partition = partitions.get(row.restaurant_id)
+                if partition is None:
+                    partition = partitions[row.restaurant_id] = _Partition(self.windows)
+            basket.append(row.menu_item_id)
+            day = row.created_at.date()
+            if day >= since:
+                counts = partition.day_counts.setdefault(day, array('L'))
+                if row.menu_item_id >= len(counts):
+                    counts.extend([0] * (row.menu_item_id + 1 - len(counts)))
+                counts[row.menu_item_id] += row.quantity
+        self._add_basket(partition, basket)
+
+    def _add_basket(self, partition, basket):
+        if not basket:
+            return
+        items = sorted(set(basket))
+        for index, item in enumerate(items):
+            partition.order_counts[item] = partition.order_counts.get(item, 0) + 1
+            for other in items[index + 1:]:
+                partition.pair_counts[(item, other)] = partition.pair_counts.get((item, other), 0) + 1
+        partition.changed_items.update(items) # Their order counts moved, so their scores need re-ranking
+
+    def _rank_popular(self, partition):
+        today = datetime.utcnow().date()
+        for name, days in self.windows.items():
+            totals = {}
+            for day, counts in partition.day_counts.items():
+                if (today - day).days < days:
+                    for item, quantity in enumerate(counts):
+                        if quantity:
+                            totals[item] = totals.get(item, 0) + quantity
+            ranked = sorted(totals, key=totals.get, reverse=True)[:self.top_n]
+            partition.popular[name] = array('L', ranked)
+
+    def _rank_related(self, partition):
+        if not partition.changed_items:
+            return
+        scores = {item: {} for item in partition.changed_items}
+        for (a, b), together in partition.pair_counts.items():
+            if a in scores or b in scores:
+                score = together / math.sqrt(partition.order_counts[a] * partition.order_counts[b])
+                if a in scores:
+                    scores[a][b] = score
+                if b in scores:
+                    scores[b][a] = score
+        for item, neighbours in scores.items():
+            partition.related[item] = array('L', sorted(neighbours, key=neighbours.get, reverse=True)[:self.top_n])
+        partition.changed_items.clear()
+
+index = RecommendationIndex()
+
+def init_recommendations(app):
+    index.trailing_orders = app.config.get("RECOMMENDATIONS_TRAILING_ORDERS", 1000)
+    index.rebuild_interval = app.config.get("RECOMMENDATIONS_REBUILD_SECONDS", 3600)
+    run_periodically(app, "recommendations", app.config.get("RECOMMENDATIONS_REFRESH_SECONDS", 300), index.refresh)
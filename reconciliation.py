@@ -0,0 +1,191 @@
+# backend_app/src/reconciliation.py
+
+# Reconciles payments against a gateway settlement file, catching up on missed webhooks.
+# The CSV is read incrementally in chunks; each chunk is matched against
+# Payment.payment_gateway_transaction_id with one IN lookup (indexed column) and its
+# corrections are applied with a few set-based UPDATEs in one transaction, so memory and lock
+# time stay bounded however large the file is. Mismatches stream to an optional CSV report.
+#
+#   flask --app src.main reconcile-payments settlement.csv --report mismatches.csv
+#
+# Corrections mirror the webhook: a pending payment the gateway settled becomes "success" (its
+# order is marked paid and confirmed if still pending); one the gateway failed becomes "failed".
+# Payments whose recorded outcome contradicts the gateway, amount differences and unknown
+# transactions are only reported.
+
+import csv
+import itertools
+from decimal import Decimal, InvalidOperation
+
+import click
+from sqlalchemy import select, update
+
+from .extensions import db
+from .models.models import Order, Payment
+from .order_state import transition_orders
+
+# Gateway settlement status -> our Payment.status
+SETTLEMENT_STATUSES = {
+    "success": "success", "settled": "success", "paid": "success", "captured": "success",
+    "failed": "failed", "declined": "failed", "refused": "failed",
+}
+
+REPORT_FIELDS = ["line", "transaction_id", "problem", "gateway_status", "gateway_amount", "payment_status", "payment_amount", "order_id"]
+
+class ReconciliationResult:
+    def __init__(self):
+        self.counts = dict.fromkeys(
+            ["rows", "matched", "corrected_success", "corrected_failed", "orders_confirmed",
+             "unknown_transaction", "status_conflict", "amount_mismatch", "invalid_row"], 0)
+
+    def as_dict(self):
+        return dict(self.counts)
+
+def _parse_row(row, columns):
+    """(transaction_id, our status, amount or None) or None for an unusable row."""
+    transaction_id = (row.get(columns["transaction"]) or "").strip()
+    status = SETTLEMENT_STATUSES.get((row.get(columns["status"]) or "").strip().lower())
+    if not transaction_id or status is None:
+        return None
+    amount = (row.get(columns["amount"]) or "").strip() if columns["amount"] else ""
+    try:
+        return transaction_id, status, Decimal(amount) if amount else None
+    except InvalidOperation:
+        return None
+
+def reconcile_chunk(entries, result, report=None, dry_run=False):
+    """Match one chunk of (line, transaction_id, status, amount) and apply its corrections. Commits."""
+    by_transaction = {entry[1]: entry for entry in entries} # Last line wins for repeated ids
+    payments = db.session.execute(
+        select(Payment.id, Payment.order_id, Payment.payment_gateway_transaction_id, Payment.status, Payment.amount)
+        .where(Payment.payment_gateway_transaction_id.in_(by_transaction))
+    ).all()
+    found = {payment.payment_gateway_transaction_id: payment for payment in payments}
+
+    settle_ids, fail_ids = [], []
+    for transaction_id, (line, _, status, amount) in by_transaction.items():
+        payment = found.get(transaction_id)
+        problem = None
+        if payment is None:
+            problem = "unknown_transaction"
+        elif amount is not None and amount != payment.amount:
+            problem = "amount_mismatch"
+        elif payment.status == status:
+            result.counts["matched"] += 1
+        elif payment.status != "pending":
+            problem = "status_conflict" # Our record says the opposite; needs a human
+        elif status == "success":
+            settle_ids.append(payment.id)
+        else:
+            fail_ids.append(payment.id)
+        if problem:
+            result.counts[problem] += 1
+            if report:
+                report.writerow({
+                    "line": line, "transaction_id": transaction_id, "problem": problem,
+                    "gateway_status": status, "gateway_amount": amount,
+                    "payment_status": payment.status if payment else None,
+                    "payment_amount": payment.amount if payment else None,
+                    "order_id": payment.order_id if payment else None
+                })
+    if dry_run:
+        result.counts["corrected_success"] += len(settle_ids)
+        result.counts["corrected_failed"] += len(fail_ids)
+        return
+    if not (settle_ids or fail_ids):
+        return
+    try:
+        paid_order_ids = []
+        for payment_ids, payment_status, order_payment_status in (
+                (settle_ids, "success", "paid"), (fail_ids, "failed", "failed")):
+            if not payment_ids:
+                continue
+            # Lock the payments that are still pending: a webhook may have settled or failed some
+            # since the read above, and those (and their orders) must be left alone. Payment rows
+            # are locked before order rows, as in the webhook.
+            locked = db.session.execute(
+                select(Payment.id, Payment.order_id)
+                .where(Payment.id.in_(payment_ids), Payment.status == "pending")
+                .order_by(Payment.id)
+                .with_for_update()
+            ).all()
+            if not locked:
+                continue
+            order_ids = [row.order_id for row in locked]
+            result.counts[f"corrected_{payment_status}"] += db.session.execute(
+                update(Payment).where(Payment.id.in_([row.id for row in locked]))
+                .values(status=payment_status)
+                .execution_options(synchronize_session=False, audit_before={row.id: {"status": "pending"} for row in locked})
+            ).rowcount
+            # The orders' previous payment_status, locked, for the audit trail
+            previous = db.session.execute(
+                select(Order.id, Order.payment_status).where(Order.id.in_(order_ids)).order_by(Order.id).with_for_update()
+            ).all()
+            db.session.execute(
+                update(Order).where(Order.id.in_(order_ids)).values(payment_status=order_payment_status)
+                .execution_options(synchronize_session=False,
+                                   audit_before={row.id: {"payment_status": row.payment_status} for row in previous})
+            )
+            if payment_status == "success":
+                paid_order_ids = order_ids
+        result.counts["orders_confirmed"] += len(
+            transition_orders(paid_order_ids, "confirmed", "pending", source="payment_reconciliation")
+        )
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+
+def reconcile_settlement_file(stream, chunk_size=1000, report=None, dry_run=False,
+                              transaction_column="transaction_id", status_column="status", amount_column="amount"):
+    """Reconcile every row of a settlement CSV (an open text stream with a header row)."""
+    result = ReconciliationResult()
+    columns = {"transaction": transaction_column, "status": status_column, "amount": amount_column}
+    reader = csv.DictReader(stream)
+    if columns["amount"] not in (reader.fieldnames or []):
+        columns["amount"] = None # Amounts are optional in settlement files
+    numbered = enumerate(reader, start=2) # Line numbers as seen in the file (header is line 1)
+    while True:
+        chunk = list(itertools.islice(numbered, chunk_size))
+        if not chunk:
+            break
+        entries = []
+        for line, row in chunk:
+            result.counts["rows"] += 1
+            parsed = _parse_row(row, columns)
+            if parsed is None:
+                result.counts["invalid_row"] += 1
+                if report:
+                    report.writerow({"line": line, "transaction_id": row.get(transaction_column), "problem": "invalid_row",
+                                     "gateway_status": row.get(status_column)})
+                continue
+            entries.append((line, *parsed))
+        if entries:
+            reconcile_chunk(entries, result, report, dry_run)
+        db.session.expunge_all() # Nothing from earlier chunks needs to stay in the session
+    return result
+
+def init_reconciliation(app):
+    @app.cli.command("reconcile-payments")
+    @click.argument("settlement_file", type=click.Path(exists=True, dir_okay=False))
+    @click.option("--chunk-size", default=1000, show_default=True, help="Rows matched and corrected per transaction.")
+    @click.option("--report", "report_path", default=None, type=click.Path(dir_okay=False), help="Write mismatches to this CSV file.")
+    @click.option("--dry-run", is_flag=True, help="Match and report without changing anything.")
+    @click.option("--transaction-column", default="transaction_id", show_default=True)
+    @click.option("--status-column", default="status", show_default=True)
+    @click.option("--amount-column", default="amount", show_default=True)
+    def reconcile_payments_command(settlement_file, chunk_size, report_path, dry_run, transaction_column, status_column, amount_column):
+        with open(settlement_file, newline="", encoding="utf-8") as stream:
+            report_file = open(report_path, "w", newline="", encoding="utf-8") if report_path else None
+            try:
+                report = None
+                if report_file:
+                    report = csv.DictWriter(report_file, fieldnames=REPORT_FIELDS)
+                    report.writeheader()
+                result = reconcile_settlement_file(stream, chunk_size, report, dry_run,
+                                                   transaction_column, status_column, amount_column)
+            finally:
+                if report_file:
+                    report_file.close()
+        for name, count in result.as_dict().items():
+            click.echo(f"{name}: {count}")
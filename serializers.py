@@ -0,0 +1,242 @@
+# backend_app/src/serializers.py
+
+# Shared response serialization.
+# Serializers only read attributes, so they accept the slim Row tuples returned by
+# column-projected select() statements as well as full ORM objects.
+# Decimal and datetime values are passed through as-is and encoded by JSONProvider
+# (Decimal as a string, datetime as ISO 8601), matching the existing API format.
+
+from datetime import date
+from decimal import Decimal
+from flask.json.provider import DefaultJSONProvider
+from sqlalchemy import select, bindparam
+
+from .extensions import db
+from .models.models import Order, OrderItem, MenuItem, Address, User, Category, ArchivedOrder, ArchivedOrderItem
+
+try:
+    import orjson
+except ImportError: # Optional speedup; fall back to the stdlib json module
+    orjson = None
+
+def _default(o):
+    if isinstance(o, Decimal):
+        return str(o)
+    if isinstance(o, date):
+        return o.isoformat()
+    return DefaultJSONProvider.default(o)
+
+class JSONProvider(DefaultJSONProvider):
+    """Flask JSON provider backed by orjson when it is installed."""
+
+    default = staticmethod(_default)
+
+    def _orjson_options(self, indent=None):
+        option = orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return option
+
+    def dumps(self, obj, **kwargs):
+        if orjson is None:
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=_default, option=self._orjson_options(kwargs.get("indent"))).decode("utf-8")
+
+    def loads(self, s, **kwargs):
+        if orjson is None:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        if orjson is None:
+            return super().response(*args, **kwargs)
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = self.compact is False or (self.compact is None and self._app.debug)
+        # Hand orjson's bytes straight to the response, skipping a decode/encode round trip
+        body = orjson.dumps(obj, default=_default, option=self._orjson_options(indent)) + b"\n"
+        return self._app.response_class(body, mimetype=self.mimetype)
+
+# Orders
+# Column sets are built per model so the same serializers cover the hot tables and the
+# archive tables (ArchivedOrder and friends share the hot tables' column names).
+
+def order_summary_columns(order_model=Order):
+    return (
+        order_model.id, order_model.user_id, order_model.total_amount, order_model.status,
+        order_model.payment_status, order_model.created_at
+    )
+
+def order_detail_columns(order_model=Order):
+    return order_summary_columns(order_model) + (
+        order_model.payment_method, order_model.delivery_instructions, order_model.estimated_delivery_time,
+        order_model.driver, order_model.delivery_sequence, order_model.updated_at,
+        Address.address_line1, Address.address_line2, Address.city, Address.postal_code, Address.country
+    )
+
+def order_item_columns(item_model=OrderItem):
+    return (
+        item_model.order_id, item_model.menu_item_id, MenuItem.name.label("menu_item_name"),
+        item_model.quantity, item_model.price_at_order, item_model.subtotal
+    )
+
+ORDER_SUMMARY_COLUMNS = order_summary_columns(Order)
+ARCHIVED_ORDER_SUMMARY_COLUMNS = order_summary_columns(ArchivedOrder)
+
+ORDER_USER_COLUMNS = (
+    User.email.label("user_email"), User.full_name.label("user_full_name"), User.phone_number.label("user_phone")
+)
+
+def serialize_order_summary(row, items_preview):
+    return {
+        "id": row.id,
+        "total_amount": row.total_amount,
+        "status": row.status,
+        "payment_status": row.payment_status,
+        "created_at": row.created_at,
+        "items_preview": items_preview
+    }
+
+def serialize_order_admin_summary(row):
+    return {
+        "id": row.id, "user_id": row.user_id, "user_email": row.user_email,
+        "total_amount": row.total_amount, "status": row.status,
+        "payment_status": row.payment_status, "created_at": row.created_at
+    }
+
+def serialize_order_item(row):
+    return {
+        "menu_item_id": row.menu_item_id,
+        "menu_item_name": row.menu_item_name,
+        "quantity": row.quantity,
+        "price_at_order": row.price_at_order,
+        "subtotal": row.subtotal
+    }
+
+# Line items of one order (detail) and of a page of orders (previews); archived -> statement
+ORDER_DETAIL_ITEMS = {
+    archived: select(*order_item_columns(item_model)).join(MenuItem, item_model.menu_item_id == MenuItem.id)
+    .where(item_model.order_id == bindparam("order_id")).order_by(item_model.id)
+    for archived, item_model in ((False, OrderItem), (True, ArchivedOrderItem))
+}
+ORDER_ITEMS_PREVIEW = {
+    archived: select(item_model.order_id, MenuItem.name, item_model.quantity)
+    .join(MenuItem, item_model.menu_item_id == MenuItem.id)
+    .where(item_model.order_id.in_(bindparam("order_ids", expanding=True)))
+    .order_by(item_model.order_id, item_model.id)
+    for archived, item_model in ((False, OrderItem), (True, ArchivedOrderItem))
+}
+
+def serialize_order_detail(row, item_rows, include_user=False):
+    order_details = {
+        "id": row.id,
+        "user_id": row.user_id,
+        "total_amount": row.total_amount,
+        "status": row.status,
+        "payment_status": row.payment_status,
+        "payment_method": row.payment_method,
+        "delivery_instructions": row.delivery_instructions,
+        "estimated_delivery_time": row.estimated_delivery_time,
+        "driver": row.driver,
+        "delivery_sequence": row.delivery_sequence,
+        "created_at": row.created_at,
+        "updated_at": row.updated_at,
+        "delivery_address": {
+            "address_line1": row.address_line1,
+            "address_line2": row.address_line2,
+            "city": row.city,
+            "postal_code": row.postal_code,
+            "country": row.country
+        },
+        "order_items": [serialize_order_item(item) for item in item_rows]
+    }
+    if include_user:
+        order_details["user_info"] = {"email": row.user_email, "full_name": row.user_full_name, "phone": row.user_phone}
+    return order_details
+
+def load_order_detail(order_id, user_id=None, include_user=False, archived=False, restaurant_id=None):
+    """Fetch one order as slim rows (two queries) and serialize it; None if not found.
+
+    user_id / restaurant_id, when given, must also match (ownership and tenant checks).
+
+    With archived=True the archive tables are read instead. Archived orders may point at
+    addresses that have since been deleted, so the address is outer-joined there.
+    """
+    order_model = ArchivedOrder if archived else Order
+    columns = order_detail_columns(order_model) + (ORDER_USER_COLUMNS if include_user else ())
+    stmt = (
+        select(*columns)
+        .join(Address, order_model.delivery_address_id == Address.id, isouter=archived)
+        .where(order_model.id == order_id)
+    )
+    if user_id is not None:
+        stmt = stmt.where(order_model.user_id == user_id)
+    if restaurant_id is not None:
+        stmt = stmt.where(order_model.restaurant_id == restaurant_id)
+    if include_user:
+        stmt = stmt.join(User, order_model.user_id == User.id)
+    row = db.session.execute(stmt).first()
+    if row is None:
+        return None
+    item_rows = db.session.execute(ORDER_DETAIL_ITEMS[archived], {"order_id": order_id}).all()
+    return serialize_order_detail(row, item_rows, include_user)
+
+def load_items_preview(order_ids, limit=2, archived=False):
+    """Map order id -> first `limit` items as {"name", "quantity"}, using one query for the whole page."""
+    previews = {order_id: [] for order_id in order_ids}
+    if not order_ids:
+        return previews
+    rows = db.session.execute(ORDER_ITEMS_PREVIEW[archived], {"order_ids": list(order_ids)}).all()
+    for row in rows:
+        preview = previews[row.order_id]
+        if len(preview) < limit:
+            preview.append({"name": row.name, "quantity": row.quantity})
+    return previews
+
+# List endpoints: sparse fieldsets over column-projected selects.
+# Each map is public field name -> column; ?fields=name,price selects a subset.
+
+USER_LIST_FIELDS = {
+    "id": User.id, "username": User.username, "email": User.email, "full_name": User.full_name,
+    "phone_number": User.phone_number, "role": User.role, "restaurant_id": User.restaurant_id,
+    "all_restaurants": User.all_restaurants, "created_at": User.created_at
+}
+
+CATEGORY_LIST_FIELDS = {
+    "id": Category.id, "name": Category.name, "description": Category.description, "image_url": Category.image_url
+}
+
+CATEGORY_ADMIN_FIELDS = dict(CATEGORY_LIST_FIELDS, is_active=Category.is_active)
+
+MENU_ITEM_ADMIN_FIELDS = {
+    "id": MenuItem.id, "category_id": MenuItem.category_id, "name": MenuItem.name,
+    "description": MenuItem.description, "price": MenuItem.price,
+    "image_url": MenuItem.image_url, "is_available": MenuItem.is_available,
+    "stock_quantity": MenuItem.stock_quantity
+}
+
+# Public lists leave stock out, so the cached menu only changes when availability does
+MENU_ITEM_LIST_FIELDS = dict(
+    {name: column for name, column in MENU_ITEM_ADMIN_FIELDS.items() if name != "stock_quantity"},
+    category_name=Category.name # Requires a join to categories
+)
+
+def select_fieldset(field_map, fields_param=None):
+    """Labelled columns for the requested ?fields= value (all fields when empty).
+
+    "id" is always included. Raises ValueError naming any unknown field.
+    """
+    if not fields_param:
+        names = list(field_map)
+    else:
+        names = [name.strip() for name in fields_param.split(",") if name.strip()]
+        unknown = [name for name in names if name not in field_map]
+        if unknown:
+            raise ValueError(f"Unknown field(s): {', '.join(unknown)}. Allowed: {', '.join(field_map)}")
+        if "id" not in names:
+            names.insert(0, "id")
+    return [field_map[name].label(name) for name in names]
+
+def serialize_rows(rows):
+    return [row._asdict() for row in rows]
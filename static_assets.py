@@ -0,0 +1,165 @@
+# backend_app/src/static_assets.py
+
+# Static file serving for the co-hosted SPA without per-request filesystem work.
+# At startup the static folder is scanned once into a manifest (path -> size, mtime, ETag,
+# MIME type and any precompressed .br / .gz siblings); requests are then answered from the
+# manifest alone:
+#   - fingerprinted files (an 8, 20 or 32 character hex content hash right before the extension,
+#     e.g. app.3f9a1c2b.js, main-4e5d6f7a8b9c0d1e2f3a.css) get
+#     `Cache-Control: public, max-age=31536000, immutable`
+#   - other files revalidate with their ETag; index.html is held in memory and answers every
+#     unknown path (SPA routes) with no stat at all
+#   - the smallest variant the client accepts is sent (br, then gzip, then identity)
+# Files added after startup are not seen until the next restart, which is how deploys ship them.
+# `flask compress-static` writes the .gz (and, with the brotli package, .br) variants.
+
+import gzip
+import mimetypes
+import os
+import re
+
+import click
+from flask import request, Response, jsonify
+from werkzeug.wsgi import wrap_file
+
+try:
+    import brotli
+except ImportError: # Optional: without it only .gz variants are generated
+    brotli = None
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE_CONTROL = "public, max-age=0, must-revalidate"
+INDEX_CACHE_CONTROL = "no-cache"
+
+# A hex hash of a bundler's usual lengths (short contenthash, webpack's default, MD5) right
+# before the extension. Letters and digits both required, so dates like report-20240101.pdf
+# are not taken for hashes; a real hash without either merely revalidates.
+FINGERPRINT = re.compile(r"[.-](?=[0-9a-f]*[a-f])(?=[0-9a-f]*\d)(?:[0-9a-f]{32}|[0-9a-f]{20}|[0-9a-f]{8})\.[A-Za-z0-9]+$")
+ENCODINGS = (("br", ".br"), ("gzip", ".gz")) # Preference order
+COMPRESSIBLE_EXTENSIONS = {".html", ".js", ".mjs", ".css", ".json", ".svg", ".txt", ".xml", ".map", ".wasm", ".ico"}
+
+class StaticAsset:
+    __slots__ = ("path", "size", "mtime", "etag", "mimetype", "cache_control", "variants", "body")
+
+    def __init__(self, path, stat, cache_control):
+        self.path = path
+        self.size = stat.st_size
+        self.mtime = int(stat.st_mtime)
+        self.etag = f'"{stat.st_size:x}-{int(stat.st_mtime * 1000):x}"'
+        self.mimetype = mimetypes.guess_type(path)[0] or "application/octet-stream"
+        self.cache_control = cache_control
+        self.variants = {} # content encoding -> (path, size)
+        self.body = None # In-memory content (index.html only)
+
+class StaticManifest:
+    def __init__(self, folder):
+        self.folder = folder
+        self.assets = {} # URL path relative to the folder -> StaticAsset
+        self.index = None
+
+    def build(self):
+        assets = {}
+        if self.folder and os.path.isdir(self.folder):
+            for root, _, files in os.walk(self.folder):
+                for name in files:
+                    if name.endswith((".br", ".gz")):
+                        continue
+                    path = os.path.join(root, name)
+                    url_path = os.path.relpath(path, self.folder).replace(os.sep, "/")
+                    if url_path == "index.html":
+                        cache_control = INDEX_CACHE_CONTROL
+                    elif FINGERPRINT.search(name):
+                        cache_control = IMMUTABLE_CACHE_CONTROL
+                    else:
+                        cache_control = REVALIDATE_CACHE_CONTROL
+                    asset = StaticAsset(path, os.stat(path), cache_control)
+                    for encoding, suffix in ENCODINGS:
+                        if name + suffix in files:
+                            asset.variants[encoding] = (path + suffix, os.path.getsize(path + suffix))
+                    assets[url_path] = asset
+        self.assets = assets
+        self.index = assets.get("index.html")
+        if self.index:
+            self._load_index(self.index)
+        return self
+
+    def _load_index(self, index):
+        with open(index.path, "rb") as f:
+            index.body = {None: f.read()}
+        for encoding, (path, _) in index.variants.items():
+            with open(path, "rb") as f:
+                index.body[encoding] = f.read()
+        if "gzip" not in index.body:
+            index.body["gzip"] = gzip.compress(index.body[None])
+            index.variants["gzip"] = (None, len(index.body["gzip"]))
+
+    def lookup(self, path):
+        """The asset for a URL path, the in-memory index.html for unknown paths, or None."""
+        return self.assets.get(path) or self.index
+
+def _accepted_encoding(asset):
+    accepted = request.accept_encodings
+    for encoding, _ in ENCODINGS:
+        if encoding in asset.variants and accepted[encoding]:
+            return encoding
+    return None
+
+def asset_response(asset):
+    encoding = _accepted_encoding(asset)
+    etag = asset.etag if encoding is None else f'{asset.etag[:-1]}-{encoding}"'
+    if request.if_none_match.contains(etag.strip('"')):
+        response = Response(status=304)
+    elif asset.body is not None:
+        response = Response(asset.body[encoding], mimetype=asset.mimetype)
+    else:
+        path, size = asset.variants[encoding] if encoding else (asset.path, asset.size)
+        response = Response(wrap_file(request.environ, open(path, "rb")), mimetype=asset.mimetype, direct_passthrough=True)
+        response.content_length = size
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = asset.cache_control
+    response.last_modified = asset.mtime
+    if asset.variants:
+        response.vary.add("Accept-Encoding")
+    if encoding and response.status_code == 200:
+        response.headers["Content-Encoding"] = encoding
+    return response
+
+def compress_static_folder(folder, min_size=1024):
+    """Write .gz (and .br when brotli is installed) next to compressible files. Returns files written."""
+    written = 0
+    for root, _, files in os.walk(folder):
+        for name in files:
+            if os.path.splitext(name)[1].lower() not in COMPRESSIBLE_EXTENSIONS:
+                continue
+            path = os.path.join(root, name)
+            with open(path, "rb") as f:
+                data = f.read()
+            if len(data) < min_size:
+                continue
+            outputs = [(".gz", gzip.compress(data, compresslevel=9))]
+            if brotli:
+                outputs.append((".br", brotli.compress(data, quality=11)))
+            for suffix, compressed in outputs:
+                if len(compressed) < len(data):
+                    with open(path + suffix, "wb") as f:
+                        f.write(compressed)
+                    written += 1
+    return written
+
+def init_static_assets(app):
+    manifest = StaticManifest(app.static_folder).build()
+    app.extensions["static_manifest"] = manifest
+
+    @app.cli.command("compress-static")
+    @click.option("--min-size", default=1024, show_default=True, help="Skip files smaller than this many bytes.")
+    def compress_static_command(min_size):
+        count = compress_static_folder(app.static_folder, min_size)
+        click.echo(f"Wrote {count} compressed files{'' if brotli else ' (install brotli for .br variants)'}")
+
+    return manifest
+
+def serve_static(manifest, path):
+    asset = manifest.lookup(path)
+    if asset is None:
+        return jsonify({"message": "Welcome to the Restaurant API. No frontend index.html found at root."}), 200
+    return asset_response(asset)
@@ -0,0 +1,85 @@
+# backend_app/src/tenancy.py
+
+# Restaurant (tenant) resolution. One deployment serves every branch; each request is bound to
+# one restaurant, taken from (first match wins):
+#   1. the X-Restaurant-Id header
+#   2. the request Host, matched against RestaurantInfo.hostname
+#   3. DEFAULT_RESTAURANT_ID (set it to empty to require 1 or 2)
+# Blueprint routes (except TENANT_EXEMPT_ENDPOINTS) get a 404 for unknown restaurants.
+# The id -> hostname directory is a tiny table, cached per worker and reloaded every
+# TENANT_DIRECTORY_TTL_SECONDS.
+
+import threading
+import time
+
+from flask import g, request, jsonify
+from sqlalchemy import select
+
+from .extensions import db
+from .models.models import RestaurantInfo
+
+RESTAURANT_HEADER = "X-Restaurant-Id"
+# Blueprint endpoints that work without a restaurant (order ids are global)
+TENANT_EXEMPT_ENDPOINTS = {"payments_bp.payment_webhook"}
+
+class TenantDirectory:
+    def __init__(self, ttl=60):
+        self.ttl = ttl
+        self.default_id = None
+        self._ids = frozenset()
+        self._hosts = {} # lowercase hostname -> restaurant id
+        self._loaded_at = 0
+        self._lock = threading.Lock()
+
+    def load(self):
+        """Reload the directory. Needs an app context."""
+        rows = db.session.execute(select(RestaurantInfo.id, RestaurantInfo.hostname)).all()
+        with self._lock:
+            self._ids = frozenset(row.id for row in rows)
+            self._hosts = {row.hostname.lower(): row.id for row in rows if row.hostname}
+            self._loaded_at = time.monotonic()
+
+    def restaurant_ids(self):
+        self._maybe_reload()
+        return sorted(self._ids)
+
+    def resolve(self, header_value, host):
+        """Restaurant id for a request, or None when it names no known restaurant."""
+        self._maybe_reload()
+        if header_value:
+            try:
+                restaurant_id = int(header_value)
+            except ValueError:
+                return None
+            return restaurant_id if restaurant_id in self._ids else None
+        hostname = (host or "").split(":", 1)[0].lower()
+        if hostname in self._hosts:
+            return self._hosts[hostname]
+        return self.default_id if self.default_id in self._ids else None
+
+    def _maybe_reload(self):
+        if time.monotonic() - self._loaded_at >= self.ttl:
+            self.load()
+
+directory = TenantDirectory()
+
+def current_restaurant_id():
+    """The restaurant the current request was resolved to."""
+    return g.restaurant_id
+
+def resolve_request_tenant():
+    g.restaurant_id = directory.resolve(request.headers.get(RESTAURANT_HEADER), request.host)
+    if g.restaurant_id is None and request.blueprint and request.endpoint not in TENANT_EXEMPT_ENDPOINTS:
+        return jsonify({"message": "Unknown restaurant"}), 404
+    return None
+
+def ensure_default_restaurant():
+    """Create the default restaurant on an empty database, as the single-restaurant setup did."""
+    if directory.default_id and db.session.get(RestaurantInfo, directory.default_id) is None:
+        db.session.add(RestaurantInfo(id=directory.default_id, name="My Restaurant"))
+        db.session.commit()
+
+def init_tenancy(app):
+    directory.ttl = app.config.get("TENANT_DIRECTORY_TTL_SECONDS", 60)
+    directory.default_id = app.config.get("DEFAULT_RESTAURANT_ID")
+    app.before_request(resolve_request_tenant)
@@ -0,0 +1,19 @@
+# backend_app/tests/test_addresses.py
+
+from conftest import ALICE, BOB
+
+NEW_ADDRESS = {"address_line1": "3 Nile St", "city": "Giza", "postal_code": "12511", "country": "EG"}
+
+def test_add_address_as_new_default(client, auth):
+    response = client.post("/api/addresses", json=dict(NEW_ADDRESS, is_default=True), headers=auth(ALICE))
+    assert response.status_code == 201
+    addresses = client.get("/api/addresses", headers=auth(ALICE)).get_json()
+    assert [(address["id"], address["is_default"]) for address in addresses] == [(response.get_json()["id"], True), (1, False)]
+
+def test_add_address_requires_fields(client, auth):
+    assert client.post("/api/addresses", json={"city": "Giza"}, headers=auth(ALICE)).status_code == 400
+
+def test_addresses_of_other_users_are_not_visible(client, auth):
+    assert [address["id"] for address in client.get("/api/addresses", headers=auth(BOB)).get_json()] == [2]
+    assert client.put("/api/addresses/1", json={"city": "Luxor"}, headers=auth(BOB)).status_code == 404
+    assert client.delete("/api/addresses/1", headers=auth(BOB)).status_code == 404
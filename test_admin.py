@@ -0,0 +1,63 @@
+# backend_app/tests/test_admin.py
+
+from conftest import ALICE, ADMIN
+from src.extensions import db
+from src.models.models import Order, Payment
+
+def set_status(client, auth, order_id, status, **body):
+    return client.put(f"/api/admin/orders/{order_id}/status", json=dict(body, status=status), headers=auth(ADMIN))
+
+def test_customers_are_not_admins(client, auth):
+    assert client.get("/api/admin/orders", headers=auth(ALICE)).status_code == 403
+
+def test_status_update_checks_the_expected_status(client, auth, place_order):
+    order_id = place_order([(1, 1)]).get_json()["order_id"]
+    response = set_status(client, auth, order_id, "confirmed", expected_status="pending")
+    assert response.get_json()["previous_status"] == "pending"
+    assert set_status(client, auth, order_id, "preparing", expected_status="pending").status_code == 409
+    assert set_status(client, auth, order_id, "unknown").status_code == 400
+    assert set_status(client, auth, 999, "confirmed").status_code == 404
+
+def test_delivering_a_cash_order_records_its_payment(app, client, auth, place_order):
+    order_id = place_order([(1, 1)]).get_json()["order_id"]
+    for status in ("confirmed", "preparing", "out_for_delivery", "delivered"):
+        assert set_status(client, auth, order_id, status).status_code == 200
+    with app.app_context():
+        assert db.session.get(Order, order_id).payment_status == "paid"
+        assert db.session.execute(db.select(Payment.payment_gateway_transaction_id)).scalar_one() == f"COD_{order_id}"
+
+def test_bulk_status_update_reports_each_order(client, auth, place_order):
+    first = place_order([(1, 1)]).get_json()["order_id"]
+    second = place_order([(2, 1)]).get_json()["order_id"]
+    set_status(client, auth, second, "confirmed")
+    response = client.put("/api/admin/orders/status", headers=auth(ADMIN),
+                          json={"order_ids": [first, second, 999], "status": "confirmed", "expected_status": "pending"})
+    assert response.status_code == 200
+    body = response.get_json()
+    assert (body["updated"], body["failed"]) == (1, 2)
+    assert [result["updated"] for result in body["results"]] == [True, False, False]
+
+def test_bulk_status_update_validates_order_ids(client, auth):
+    for order_ids in (None, [], "12", {"1": 2}, ["x"], ["1"], [1.0], [True], [1, False], list(range(1, 502))):
+        response = client.put("/api/admin/orders/status", json={"order_ids": order_ids, "status": "confirmed"}, headers=auth(ADMIN))
+        assert response.status_code == 400
+
+def test_dispatch_plans_runs_for_preparing_orders(client, auth, place_order):
+    order_ids = [place_order([(1, 1)]).get_json()["order_id"] for _ in range(3)]
+    for order_id in order_ids:
+        set_status(client, auth, order_id, "confirmed")
+        set_status(client, auth, order_id, "preparing")
+    plan = client.post("/api/admin/dispatch", json={"drivers": ["Ali"], "dry_run": True}, headers=auth(ADMIN)).get_json()
+    assert sorted(stop["order_id"] for stop in plan["runs"][0]["stops"]) == order_ids
+    response = client.post("/api/admin/dispatch", json={"drivers": ["Ali"]}, headers=auth(ADMIN))
+    assert response.status_code == 200
+    orders = client.get("/api/admin/orders", headers=auth(ADMIN)).get_json()
+    assert {order["status"] for order in orders} == {"out_for_delivery"}
+    assert client.post("/api/admin/dispatch", json={"drivers": []}, headers=auth(ADMIN)).status_code == 400
+
+def test_menu_changes_are_visible_immediately(client, auth):
+    assert len(client.get("/api/menu-items").get_json()) == 4 # Cached
+    response = client.post("/api/admin/menu-items", headers=auth(ADMIN),
+                           json={"category_id": 2, "name": "Lemonade", "description": "Fresh", "price": "3.00"})
+    assert response.status_code == 201
+    assert len(client.get("/api/menu-items").get_json()) == 5
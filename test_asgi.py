@@ -0,0 +1,124 @@
+# backend_app/tests/test_asgi.py
+
+# The ASGI app runs on its own async engine, which cannot see the synchronous app's in-memory
+# database; each test gets a SQLite file (through aiosqlite) with the orders it needs instead.
+# Requests are driven by calling the ASGI callable directly under asyncio.run.
+
+import asyncio
+import json
+
+import pytest
+from sqlalchemy import insert, update
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from conftest import ALICE, BOB, MAIN_STREET
+from src import asgi
+from src.extensions import db
+from src.models.models import Order
+
+PENDING_ORDER, DELIVERED_ORDER = 1, 2
+
+@pytest.fixture
+def async_database(tmp_path, monkeypatch):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'asgi.db'}")
+
+    async def setup():
+        async with engine.begin() as conn:
+            await conn.run_sync(db.metadata.create_all)
+            await conn.execute(insert(Order), [
+                {"id": PENDING_ORDER, "user_id": ALICE, "delivery_address_id": 1, "restaurant_id": MAIN_STREET,
+                 "total_amount": "9.50", "status": "pending", "payment_status": "pending"},
+                {"id": DELIVERED_ORDER, "user_id": ALICE, "delivery_address_id": 1, "restaurant_id": MAIN_STREET,
+                 "total_amount": "9.50", "status": "delivered", "payment_status": "paid"},
+            ])
+    asyncio.run(setup())
+    monkeypatch.setattr(asgi, "engine", engine)
+    monkeypatch.setattr(asgi, "POLL_SECONDS", 0.01)
+    yield engine
+    asyncio.run(engine.dispose())
+
+async def call(path, headers=None, method="GET", query=b"", disconnect_after=None):
+    """Run one request through the ASGI app; returns (status, headers, body chunks)."""
+    received = [{"type": "http.request", "body": b"", "more_body": False}]
+    sent = []
+
+    async def receive():
+        if received:
+            return received.pop()
+        if disconnect_after is None:
+            await asyncio.Event().wait() # The client stays connected
+        await asyncio.sleep(disconnect_after)
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {"type": "http", "method": method, "path": path, "query_string": query,
+             "headers": [(name.lower().encode("latin1"), value.encode("latin1")) for name, value in (headers or {}).items()]}
+    await asgi.application(scope, receive, send)
+    start = sent[0]
+    return start["status"], dict(start["headers"]), [message.get("body", b"") for message in sent[1:]]
+
+def run(coroutine):
+    return asyncio.run(asyncio.wait_for(coroutine, timeout=5))
+
+def test_async_database_uri():
+    assert asgi.async_database_uri("sqlite:///:memory:") == "sqlite+aiosqlite:///:memory:"
+    assert asgi.async_database_uri("mysql+pymysql://u:p@db/app") == "mysql+aiomysql://u:p@db/app"
+
+def test_requests_need_a_valid_token(async_database):
+    assert run(call(f"/api/stream/payments/{PENDING_ORDER}/status"))[0] == 401
+    assert run(call(f"/api/stream/payments/{PENDING_ORDER}/status", {"Authorization": "Bearer nonsense"}))[0] == 401
+
+def test_unknown_paths_and_methods(async_database, auth):
+    assert run(call("/api/stream/elsewhere", auth(ALICE)))[0] == 404
+    assert run(call(f"/api/stream/payments/{PENDING_ORDER}/status", auth(ALICE), method="POST"))[0] == 405
+
+def test_other_users_orders_are_not_found(async_database, auth):
+    status, _, body = run(call(f"/api/stream/orders/{PENDING_ORDER}/events", auth(BOB)))
+    assert status == 404
+    assert json.loads(body[0])["message"] == "Order not found or access denied"
+
+def test_event_stream_ends_on_a_final_status(async_database, auth):
+    status, headers, body = run(call(f"/api/stream/orders/{DELIVERED_ORDER}/events", auth(ALICE)))
+    assert status == 200
+    assert headers[b"content-type"] == b"text/event-stream"
+    assert body[0].startswith(b"event: order\ndata: ")
+    assert json.loads(body[0].split(b"data: ", 1)[1]) == {"order_id": DELIVERED_ORDER, "status": "delivered",
+                                                          "payment_status": "paid"}
+    assert body[-1] == b""
+
+def test_event_stream_follows_status_changes(async_database, auth):
+    async def scenario():
+        stream = asyncio.create_task(call(f"/api/stream/orders/{PENDING_ORDER}/events", auth(ALICE)))
+        for status in ("confirmed", "delivered"):
+            await asyncio.sleep(0.05)
+            async with async_database.begin() as conn:
+                await conn.execute(update(Order).where(Order.id == PENDING_ORDER).values(status=status))
+        return await stream
+    status, _, body = run(scenario())
+    events = [json.loads(chunk.split(b"data: ", 1)[1])["status"] for chunk in body if chunk]
+    assert status == 200
+    assert events == ["pending", "confirmed", "delivered"]
+
+def test_event_stream_stops_when_the_client_disconnects(async_database, auth):
+    status, _, body = run(call(f"/api/stream/orders/{PENDING_ORDER}/events", auth(ALICE), disconnect_after=0.05))
+    assert status == 200
+    assert len(body) == 1 # The first event, then no closing chunk for a client that is gone
+
+def test_payment_long_poll_returns_once_paid(async_database, auth):
+    async def scenario():
+        poll = asyncio.create_task(call(f"/api/stream/payments/{PENDING_ORDER}/status", auth(ALICE), query=b"wait=5"))
+        await asyncio.sleep(0.05)
+        async with async_database.begin() as conn:
+            await conn.execute(update(Order).where(Order.id == PENDING_ORDER).values(payment_status="paid"))
+        return await poll
+    status, _, body = run(scenario())
+    assert status == 200
+    assert json.loads(body[0]) == {"order_id": PENDING_ORDER, "status": "pending", "payment_status": "paid"}
+
+def test_payment_long_poll_times_out_still_pending(async_database, auth):
+    status, _, body = run(call(f"/api/stream/payments/{PENDING_ORDER}/status", auth(ALICE), query=b"wait=0.05"))
+    assert status == 200
+    assert json.loads(body[0])["payment_status"] == "pending"
+    assert run(call(f"/api/stream/payments/{PENDING_ORDER}/status", auth(ALICE), query=b"wait=soon"))[0] == 400
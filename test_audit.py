@@ -0,0 +1,80 @@
+# backend_app/tests/test_audit.py
+
+import json
+import queue
+
+import pytest
+
+from conftest import ALICE, ADMIN
+from src.audit import audit_log
+from src.extensions import db
+from src.models.models import AuditLog
+
+@pytest.fixture
+def audit(monkeypatch, tmp_path):
+    """The audit trail switched on (the suite runs with AUDIT_ENABLED=false), file fallback in tmp_path."""
+    monkeypatch.setattr(audit_log, "enabled", True)
+    monkeypatch.setattr(audit_log, "sink", "database")
+    monkeypatch.setattr(audit_log, "path", str(tmp_path / "audit.ndjson"))
+    yield audit_log
+    monkeypatch.undo()
+    audit_log._retry = [] # Nothing carries over into the next test
+    audit_log.flush()
+
+def order_updates(app):
+    audit_log.flush()
+    with app.app_context():
+        return db.session.execute(
+            db.select(AuditLog.entity_id, AuditLog.changes).where(AuditLog.table_name == "orders", AuditLog.action == "update")
+            .order_by(AuditLog.id)
+        ).all()
+
+def test_status_transitions_record_the_previous_status(app, client, auth, place_order, audit):
+    order_id = place_order([(1, 1)]).get_json()["order_id"]
+    client.put(f"/api/admin/orders/{order_id}/status", json={"status": "confirmed"}, headers=auth(ADMIN))
+    client.put("/api/admin/orders/status", json={"order_ids": [order_id], "status": "preparing"}, headers=auth(ADMIN))
+    updates = order_updates(app)
+    assert [(entity_id, changes["before"]) for entity_id, changes in updates] == [
+        (order_id, {str(order_id): {"status": "pending"}}), (order_id, {str(order_id): {"status": "confirmed"}})]
+
+def test_payment_changes_record_the_previous_payment_status(app, client, auth, place_order, audit):
+    order_id = place_order([(1, 1)]).get_json()["order_id"]
+    transaction_id = client.post("/api/payments/initiate", json={"order_id": order_id}, headers=auth(ALICE)).get_json()["transaction_id"]
+    for status in ("failed", "success"):
+        client.post("/api/payments/webhook", json={"gateway_transaction_id": transaction_id, "status": status, "order_id": order_id})
+    before = [changes["before"][str(order_id)] for _, changes in order_updates(app)]
+    assert {"payment_status": "pending"} in before and {"payment_status": "failed"} in before
+
+def test_failed_synchronous_write_keeps_the_entries(app, audit, monkeypatch):
+    monkeypatch.setattr(audit, "_write_batch", lambda batch, sink=None: False)
+    monkeypatch.setattr(audit, "_queue", queue.Queue(maxsize=1))
+    audit.enqueue([{"n": 1}, {"n": 2}, {"n": 3}])
+    assert audit._retry == [{"n": 2}, {"n": 3}]
+    assert audit.depth() == 3
+
+def test_close_falls_back_to_the_file_when_the_database_fails(app, audit, monkeypatch):
+    entries = [{"created_at": "2026-01-01T00:00:00", "action": "update", "table_name": "orders", "entity_id": n, "changes": {}}
+               for n in (1, 2)]
+    monkeypatch.setattr(audit, "app", None) # Database writes now fail
+    audit.enqueue(entries)
+    audit.close()
+    assert audit.depth() == 0
+    with open(audit.path, encoding="utf-8") as f:
+        assert [json.loads(line)["entity_id"] for line in f] == [1, 2]
+
+def test_one_entry_per_transition(app, client, auth, place_order, audit):
+    order_id = place_order([(1, 1)]).get_json()["order_id"]
+    for status in ("confirmed", "preparing"):
+        client.put(f"/api/admin/orders/{order_id}/status", json={"status": status}, headers=auth(ADMIN))
+    # Cancelling tries pending and confirmed before preparing matches; only that UPDATE happened
+    assert client.put(f"/api/admin/orders/{order_id}/status", json={"status": "cancelled"}, headers=auth(ADMIN)).status_code == 200
+    assert [changes["before"][str(order_id)] for _, changes in order_updates(app)] == [
+        {"status": "pending"}, {"status": "confirmed"}, {"status": "preparing"}]
+
+def test_a_transition_that_matches_nothing_is_not_recorded(app, client, auth, place_order, audit):
+    order_id = place_order([(1, 1)]).get_json()["order_id"]
+    client.put(f"/api/admin/orders/{order_id}/status", json={"status": "confirmed"}, headers=auth(ADMIN))
+    # The order is already confirmed: initiating payment must not log pending -> confirmed again
+    client.post("/api/payments/initiate", json={"order_id": order_id}, headers=auth(ALICE))
+    status_changes = [changes for _, changes in order_updates(app) if "status" in changes["params"]]
+    assert [changes["before"][str(order_id)] for changes in status_changes] == [{"status": "pending"}]
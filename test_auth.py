@@ -0,0 +1,37 @@
+# backend_app/tests/test_auth.py
+
+from conftest import ALICE, PASSWORD
+
+def login(client, login_name, password=PASSWORD):
+    return client.post("/api/auth/login", json={"email_or_username": login_name, "password": password})
+
+def test_register_then_login(client):
+    response = client.post("/api/auth/register", json={"username": "carol", "email": "carol@example.com", "password": "pw123456"})
+    assert response.status_code == 201
+    response = login(client, "carol@example.com", "pw123456")
+    assert response.status_code == 200
+    assert response.get_json()["user"]["role"] == "customer"
+
+def test_register_rejects_duplicates_and_missing_fields(client):
+    assert client.post("/api/auth/register", json={"username": "alice", "email": "new@example.com", "password": "x"}).status_code == 409
+    assert client.post("/api/auth/register", json={"username": "dave"}).status_code == 400
+
+def test_login_with_wrong_password(client):
+    assert login(client, "alice", "wrong").status_code == 401
+
+def test_me_returns_the_profile(client, auth):
+    response = client.get("/api/auth/me", headers=auth(ALICE))
+    assert response.status_code == 200
+    assert response.get_json()["username"] == "alice"
+
+def test_refresh_issues_a_new_access_token(client):
+    tokens = login(client, "alice").get_json()
+    response = client.post("/api/auth/refresh", headers={"Authorization": f"Bearer {tokens['refresh_token']}"})
+    assert response.status_code == 200
+    me = client.get("/api/auth/me", headers={"Authorization": f"Bearer {response.get_json()['access_token']}"})
+    assert me.status_code == 200
+
+def test_logout_revokes_the_token(client):
+    headers = {"Authorization": f"Bearer {login(client, 'alice').get_json()['access_token']}"}
+    assert client.post("/api/auth/logout", headers=headers).status_code == 200
+    assert client.get("/api/auth/me", headers=headers).status_code == 401
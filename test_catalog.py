@@ -0,0 +1,63 @@
+# backend_app/tests/test_catalog.py
+
+from conftest import ALICE, HARBOUR
+from src.recommendations import index as recommendation_index
+
+def item_ids(response):
+    assert response.status_code == 200
+    return sorted(item["id"] for item in response.get_json())
+
+def test_menu_lists_orderable_items_of_the_restaurant(client):
+    # Not the unavailable Soup, the Old Special of an inactive category or Harbour's Margherita
+    assert item_ids(client.get("/api/menu-items")) == [1, 2, 3, 6]
+
+def test_menu_filters(client):
+    assert item_ids(client.get("/api/menu-items?category_id=2")) == [3]
+    assert item_ids(client.get("/api/menu-items?search=burg")) == [1]
+    response = client.get("/api/menu-items?fields=id,name")
+    assert sorted(response.get_json()[0]) == ["id", "name"]
+    assert client.get("/api/menu-items?fields=password_hash").status_code == 400
+
+def test_menu_of_another_restaurant_by_host(client):
+    assert item_ids(client.get("/api/menu-items", headers={"Host": "harbour.example.com"})) == [7]
+
+def test_menu_item_detail(client):
+    assert client.get("/api/menu-items/1").get_json()["price"] == "9.50"
+    assert client.get("/api/menu-items/5").status_code == 404
+    assert client.get("/api/menu-items/7").status_code == 404 # Harbour's item
+
+def test_categories_are_active_ones_only(client):
+    response = client.get("/api/categories")
+    assert response.status_code == 200
+    assert sorted(category["id"] for category in response.get_json()) == [1, 2]
+
+def test_quote_prices_the_cart(client):
+    response = client.post("/api/orders/quote", json={"items": [{"menu_item_id": 1, "quantity": 2}, {"menu_item_id": 5, "quantity": 1}]})
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body["total_amount"] == "19.00"
+    assert body["unavailable_items"] == [5]
+
+def test_popular_and_frequently_ordered_with(client, app, place_order):
+    assert place_order([(1, 1), (2, 1)]).status_code == 201
+    assert place_order([(1, 1), (2, 2), (3, 1)]).status_code == 201
+    assert place_order([(7, 1)], restaurant_id=HARBOUR).status_code == 201 # Counted for Harbour only
+    with app.app_context():
+        recommendation_index.refresh()
+    popular = client.get("/api/menu-items/popular?window=7d").get_json()
+    assert [item["id"] for item in popular] == [2, 1, 3]
+    related = client.get("/api/menu-items/1/frequently-ordered-with").get_json()
+    assert [item["id"] for item in related] == [2, 3]
+    assert client.get("/api/menu-items/popular?window=2y").status_code == 400
+
+def test_quote_accepts_only_positive_integers(client):
+    assert client.post("/api/orders/quote", json=[{"menu_item_id": 1, "quantity": 1}]).status_code == 400
+    assert client.post("/api/orders/quote", data="not json", content_type="application/json").status_code == 400
+    for line in ({"menu_item_id": 1, "quantity": 2.7}, {"menu_item_id": 1, "quantity": True}, {"menu_item_id": 1, "quantity": "2"},
+                 {"menu_item_id": 1, "quantity": 0}, {"menu_item_id": True, "quantity": 1}, {"menu_item_id": 1.0, "quantity": 1}, "1"):
+        assert client.post("/api/orders/quote", json={"items": [line]}).status_code == 400, line
+    assert client.post("/api/orders/quote", json={"items": {"menu_item_id": 1, "quantity": 1}}).status_code == 400
+
+def test_menu_item_detail_hides_items_of_inactive_categories(client):
+    assert client.get("/api/menu-items/4").status_code == 404
+    assert client.get("/api/menu-items/2").get_json()["category_name"] == "Mains"
@@ -0,0 +1,39 @@
+# backend_app/tests/test_commands.py
+
+from datetime import datetime, timedelta
+
+from conftest import ALICE
+from src.extensions import db
+from src.models.models import Order, Payment, ArchivedOrder
+
+def test_reconcile_payments_settles_pending_payments(app, client, auth, place_order, tmp_path):
+    paid = place_order([(1, 1)]).get_json()["order_id"]
+    failed = place_order([(2, 1)]).get_json()["order_id"]
+    transactions = {order_id: client.post("/api/payments/initiate", json={"order_id": order_id}, headers=auth(ALICE))
+                    .get_json()["transaction_id"] for order_id in (paid, failed)}
+    settlement = tmp_path / "settlement.csv"
+    settlement.write_text("transaction_id,status,amount\n"
+                          f"{transactions[paid]},settled,9.50\n{transactions[failed]},declined,3.25\nunknown,settled,1.00\n")
+    result = app.test_cli_runner().invoke(args=["reconcile-payments", str(settlement)])
+    assert result.exit_code == 0, result.output
+    assert "corrected_success: 1" in result.output and "unknown_transaction: 1" in result.output
+    with app.app_context():
+        assert db.session.get(Order, paid).payment_status == "paid"
+        assert db.session.get(Order, failed).payment_status == "failed"
+        assert sorted(db.session.execute(db.select(Payment.status)).scalars()) == ["failed", "success"]
+
+def test_archive_orders_moves_old_finished_orders(app, client, auth, place_order):
+    old = place_order([(1, 1)]).get_json()["order_id"]
+    recent = place_order([(1, 1)]).get_json()["order_id"]
+    for order_id in (old, recent):
+        assert client.post(f"/api/orders/{order_id}/cancel", headers=auth(ALICE)).status_code == 200
+    with app.app_context():
+        db.session.get(Order, old).created_at = datetime.utcnow() - timedelta(days=200)
+        db.session.commit()
+    result = app.test_cli_runner().invoke(args=["archive-orders", "--days", "180"])
+    assert result.exit_code == 0, result.output
+    with app.app_context():
+        assert db.session.execute(db.select(ArchivedOrder.id)).scalars().all() == [old]
+        assert db.session.execute(db.select(Order.id)).scalars().all() == [recent]
+    # Archived orders still show in the customer's history
+    assert sorted(order["id"] for order in client.get("/api/orders", headers=auth(ALICE)).get_json()) == [old, recent]
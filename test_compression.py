@@ -0,0 +1,77 @@
+# backend_app/tests/test_compression.py
+
+import gzip
+import json
+
+import pytest
+
+from conftest import ADMIN
+from src import compression
+from src.compression import compressor
+from src.cache import payload_cache
+
+GZIP = {"Accept-Encoding": "gzip"}
+
+@pytest.fixture
+def small_min_size(monkeypatch):
+    """Compress the fixture-sized bodies, which are all below the 1 KiB default."""
+    monkeypatch.setattr(compressor, "min_size", 64)
+
+@pytest.fixture
+def compress_calls(monkeypatch):
+    calls = []
+    compress = compressor.compress
+    def counting(data, encoding):
+        calls.append(encoding)
+        return compress(data, encoding)
+    monkeypatch.setattr(compressor, "compress", counting)
+    return calls
+
+def test_large_json_is_gzipped(client, auth, small_min_size):
+    response = client.get("/api/admin/users", headers={**auth(ADMIN), **GZIP})
+    assert response.status_code == 200
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in response.headers["Vary"]
+    assert len(json.loads(gzip.decompress(response.get_data()))) == 5
+
+def test_bodies_below_the_minimum_size_are_sent_as_is(client, auth):
+    response = client.get("/api/admin/users", headers={**auth(ADMIN), **GZIP})
+    assert len(response.get_data()) < compressor.min_size
+    assert "Content-Encoding" not in response.headers
+    assert len(response.get_json()) == 5
+
+def test_only_listed_mimetypes_are_compressed(client, auth, small_min_size, monkeypatch):
+    monkeypatch.setattr(compressor, "mimetypes", frozenset({"text/csv"}))
+    response = client.get("/api/admin/users", headers={**auth(ADMIN), **GZIP})
+    assert "Content-Encoding" not in response.headers
+    assert len(response.get_json()) == 5
+
+def test_clients_that_do_not_accept_gzip_get_identity(client, auth, small_min_size):
+    response = client.get("/api/admin/users", headers={**auth(ADMIN), "Accept-Encoding": "identity"})
+    assert "Content-Encoding" not in response.headers
+    assert "Accept-Encoding" in response.headers["Vary"]
+
+def test_brotli_is_preferred_when_installed(client, auth, small_min_size):
+    response = client.get("/api/admin/users", headers={**auth(ADMIN), "Accept-Encoding": "br, gzip"})
+    assert response.headers["Content-Encoding"] == ("br" if compression.brotli else "gzip")
+
+def test_cached_menu_is_compressed_once(client, small_min_size, compress_calls):
+    first = client.get("/api/menu-items", headers=GZIP)
+    second = client.get("/api/menu-items", headers=GZIP)
+    assert first.headers["Content-Encoding"] == second.headers["Content-Encoding"] == "gzip"
+    assert first.get_data() == second.get_data()
+    assert compress_calls == ["gzip"] # The second request reused the stored bytes
+    menu = json.loads(gzip.decompress(second.get_data()))
+    assert menu == client.get("/api/menu-items", headers={"Accept-Encoding": "identity"}).get_json()
+    assert "Burger" in [item["name"] for item in menu]
+
+def test_cached_menu_is_recompressed_after_invalidation(client, small_min_size, compress_calls):
+    client.get("/api/menu-items", headers=GZIP)
+    payload_cache.invalidate()
+    client.get("/api/menu-items", headers=GZIP)
+    assert compress_calls == ["gzip", "gzip"]
+
+def test_cached_menu_below_the_minimum_size_is_sent_as_is(client, compress_calls):
+    response = client.get("/api/menu-items", headers=GZIP)
+    assert "Content-Encoding" not in response.headers
+    assert compress_calls == []
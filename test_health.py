@@ -0,0 +1,11 @@
+# backend_app/tests/test_health.py
+
+def test_health(client):
+    response = client.get("/api/health")
+    assert response.status_code == 200
+    assert "timestamp" in response.get_json()
+
+def test_ready(client):
+    response = client.get("/api/ready")
+    assert response.status_code == 200
+    assert response.get_json()["status"] == "ready"
@@ -0,0 +1,74 @@
+# backend_app/tests/test_orders.py
+
+from conftest import ALICE, BOB, ADMIN
+from src.extensions import db
+from src.models.models import MenuItem, OrderStatusHistory
+
+def test_create_order_prices_on_the_server(client, auth, place_order):
+    response = place_order([(1, 2), (2, 1), (1, 1)])
+    assert response.status_code == 201
+    body = response.get_json()
+    assert (body["total_amount"], body["items_count"], body["status"]) == ("31.75", 2, "pending")
+    detail = client.get(f"/api/orders/{body['order_id']}", headers=auth(ALICE)).get_json()
+    assert sorted((item["menu_item_id"], item["quantity"]) for item in detail["order_items"]) == [(1, 3), (2, 1)]
+
+def test_create_order_validation(place_order):
+    assert place_order([]).status_code == 400
+    assert place_order([(1, 0)]).status_code == 400
+    assert place_order([(5, 1)]).status_code == 404 # Unavailable
+    assert place_order([(7, 1)]).status_code == 404 # Another restaurant's item
+    assert place_order([(1, 1)], address_id=2).status_code == 404 # Bob's address
+
+def test_stock_is_reserved_and_released(app, client, auth, place_order):
+    assert place_order([(6, 3)]).status_code == 409
+    first = place_order([(6, 2)])
+    assert first.status_code == 201
+    assert place_order([(6, 1)]).status_code == 404 # Sold out items are taken off the menu
+    with app.app_context():
+        assert db.session.get(MenuItem, 6).stock_quantity == 0
+    order_id = first.get_json()["order_id"]
+    assert client.post(f"/api/orders/{order_id}/cancel", headers=auth(ALICE)).status_code == 200
+    with app.app_context():
+        item = db.session.get(MenuItem, 6)
+        assert (item.stock_quantity, item.is_available) == (2, True)
+
+def test_order_history_lists_own_orders_newest_first(client, auth, place_order):
+    first = place_order([(1, 1)]).get_json()["order_id"]
+    second = place_order([(2, 1)]).get_json()["order_id"]
+    place_order([(3, 1)], user_id=BOB, address_id=2)
+    orders = client.get("/api/orders", headers=auth(ALICE)).get_json()
+    assert sorted(order["id"] for order in orders) == [first, second]
+    assert len(client.get("/api/orders?limit=1", headers=auth(ALICE)).get_json()) == 1
+    assert client.get("/api/orders?limit=0", headers=auth(ALICE)).status_code == 400
+
+def test_cancel_records_history_and_rejects_a_second_cancel(app, client, auth, place_order):
+    order_id = place_order([(1, 1)]).get_json()["order_id"]
+    assert client.post(f"/api/orders/{order_id}/cancel", headers=auth(BOB)).status_code == 404
+    assert client.post(f"/api/orders/{order_id}/cancel", headers=auth(ALICE)).status_code == 200
+    assert client.post(f"/api/orders/{order_id}/cancel", headers=auth(ALICE)).status_code == 400 # Not a legal transition
+    with app.app_context():
+        history = db.session.execute(db.select(OrderStatusHistory.from_status, OrderStatusHistory.to_status)).all()
+        assert [tuple(row) for row in history] == [("pending", "cancelled")]
+
+def test_items_of_inactive_categories_cannot_be_ordered(client, place_order):
+    # Same rule as the quote: Old Special is available but its category is not
+    assert client.post("/api/orders/quote", json={"items": [{"menu_item_id": 4, "quantity": 1}]}).get_json()["unavailable_items"] == [4]
+    assert place_order([(4, 1)]).status_code == 404
+
+def test_cancel_releases_only_what_was_reserved(app, client, auth, place_order):
+    order_id = place_order([(1, 2), (6, 1)]).get_json()["order_id"]
+    with app.app_context():
+        db.session.get(MenuItem, 1).stock_quantity = 10 # Burger starts tracking stock after the order
+        db.session.commit()
+    assert client.post(f"/api/orders/{order_id}/cancel", headers=auth(ALICE)).status_code == 200
+    with app.app_context():
+        assert db.session.get(MenuItem, 1).stock_quantity == 10
+        assert db.session.get(MenuItem, 6).stock_quantity == 2
+
+def test_cancel_does_not_reenable_items_switched_off_by_hand(app, client, auth, place_order):
+    sold_out_order = place_order([(6, 2)]).get_json()["order_id"]
+    client.put("/api/admin/menu-items/6", json={"is_available": False}, headers=auth(ADMIN)) # Off by hand while at zero
+    assert client.post(f"/api/orders/{sold_out_order}/cancel", headers=auth(ALICE)).status_code == 200
+    with app.app_context():
+        item = db.session.get(MenuItem, 6)
+        assert (item.stock_quantity, item.is_available) == (2, False)
@@ -0,0 +1,37 @@
+# backend_app/tests/test_payments.py
+
+from conftest import ALICE, BOB
+from src.extensions import db
+from src.models.models import Order
+
+def order_state(app, order_id):
+    with app.app_context():
+        order = db.session.get(Order, order_id)
+        return order.status, order.payment_status
+
+def test_card_payment_confirms_and_pays_the_order(app, client, auth, place_order):
+    order_id = place_order([(1, 1)], payment_method="card").get_json()["order_id"]
+    response = client.post("/api/payments/initiate", json={"order_id": order_id}, headers=auth(ALICE))
+    assert response.status_code == 200
+    assert order_state(app, order_id) == ("confirmed", "paid")
+    again = client.post("/api/payments/initiate", json={"order_id": order_id}, headers=auth(ALICE))
+    assert again.status_code == 400
+
+def test_initiate_only_for_own_orders(client, auth, place_order):
+    order_id = place_order([(1, 1)]).get_json()["order_id"]
+    assert client.post("/api/payments/initiate", json={"order_id": order_id}, headers=auth(BOB)).status_code == 404
+
+def test_webhook_settles_a_pending_payment(app, client, auth, place_order):
+    order_id = place_order([(1, 1)]).get_json()["order_id"] # Cash on delivery: payment stays pending
+    transaction_id = client.post("/api/payments/initiate", json={"order_id": order_id}, headers=auth(ALICE)).get_json()["transaction_id"]
+    assert order_state(app, order_id) == ("confirmed", "pending")
+    response = client.post("/api/payments/webhook", json={"gateway_transaction_id": transaction_id, "status": "failed", "order_id": order_id})
+    assert response.status_code == 200
+    assert order_state(app, order_id) == ("confirmed", "failed")
+    response = client.post("/api/payments/webhook", json={"gateway_transaction_id": transaction_id, "status": "success", "order_id": order_id})
+    assert response.status_code == 200
+    assert order_state(app, order_id) == ("confirmed", "paid")
+
+def test_webhook_rejects_unknown_transactions(client):
+    assert client.post("/api/payments/webhook", json={"gateway_transaction_id": "nope", "status": "success", "order_id": 1}).status_code == 404
+    assert client.post("/api/payments/webhook", json={"status": "success"}).status_code == 400
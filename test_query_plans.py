@@ -0,0 +1,17 @@
+# backend_app/tests/test_query_plans.py
+
+from src.query_plans import seed_fixture_rows, check_query_plans, full_scans
+
+def test_hot_queries_use_indexes(app):
+    with app.app_context():
+        seed_fixture_rows(orders=2000)
+        assert check_query_plans() == {}
+
+def test_full_index_scans_count_as_full_scans():
+    sqlite_plan = [{"detail": "SCAN orders USING COVERING INDEX ix_orders_status_created"},
+                   {"detail": "SEARCH users USING INTEGER PRIMARY KEY (rowid=?)"}]
+    assert full_scans(sqlite_plan) == ["SCAN orders USING COVERING INDEX ix_orders_status_created"]
+    assert full_scans(sqlite_plan, intended={"orders"}) == []
+    mysql_plan = [{"table": "orders", "type": "index", "key": "ix_orders_status_created", "rows": 2000},
+                  {"table": "users", "type": "eq_ref", "key": "PRIMARY", "rows": 1}]
+    assert len(full_scans(mysql_plan)) == 1
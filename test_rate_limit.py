@@ -0,0 +1,62 @@
+# backend_app/tests/test_rate_limit.py
+
+import pytest
+
+from conftest import ALICE, BOB
+from src.rate_limit import RateLimiter, MemoryBackend, SQLiteBackend, create_backend
+
+# Small budgets so a handful of requests exhausts them
+LIMITS = {
+    "menu_items_bp.get_menu_items": (2, 60),
+    "menu_items_bp.get_menu_item_detail": None,
+    "menu_items_bp": (3, 60),
+    "categories_bp": (5, 60),
+}
+
+@pytest.fixture(params=["memory", "sqlite"])
+def limiter(request, app, tmp_path, monkeypatch):
+    """A RateLimiter with LIMITS in front of every request, on each backend; removed afterwards."""
+    storage = "memory" if request.param == "memory" else f"sqlite:///{tmp_path / 'rate_limit.db'}"
+    limiter = RateLimiter(LIMITS, create_backend(storage))
+    monkeypatch.setitem(app.before_request_funcs, None, [limiter.check_request, *app.before_request_funcs.get(None, [])])
+    return limiter
+
+def test_create_backend(tmp_path):
+    assert isinstance(create_backend("memory"), MemoryBackend)
+    assert isinstance(create_backend(f"sqlite:///{tmp_path / 'buckets.db'}"), SQLiteBackend)
+    with pytest.raises(ValueError):
+        create_backend("redis://localhost")
+
+def test_exhausted_budget_returns_429_with_retry_after(client, limiter):
+    assert [client.get("/api/menu-items").status_code for _ in range(2)] == [200, 200]
+    response = client.get("/api/menu-items")
+    assert response.status_code == 429
+    assert response.get_json()["message"] == "Too many requests. Please retry later."
+    # One token comes back every 30 seconds (2 per 60)
+    assert 1 <= int(response.headers["Retry-After"]) <= 30
+
+def test_endpoint_and_blueprint_budgets_are_separate(client, limiter):
+    for _ in range(2):
+        client.get("/api/menu-items")
+    assert client.get("/api/menu-items").status_code == 429
+    # The rest of the blueprint shares its own budget of 3
+    assert [client.get("/api/menu-items/popular").status_code for _ in range(4)] == [200, 200, 200, 429]
+    # Other blueprints are untouched
+    assert client.get("/api/categories").status_code == 200
+
+def test_exempt_endpoints_are_never_limited(client, limiter):
+    assert {client.get("/api/menu-items/1").status_code for _ in range(10)} == {200}
+
+def test_buckets_are_per_caller(client, auth, limiter):
+    for _ in range(2):
+        client.get("/api/menu-items", headers=auth(ALICE))
+    assert client.get("/api/menu-items", headers=auth(ALICE)).status_code == 429
+    assert client.get("/api/menu-items", headers=auth(BOB)).status_code == 200
+    assert client.get("/api/menu-items").status_code == 200 # Anonymous callers are keyed on their IP
+
+def test_tokens_refill_over_the_period(limiter):
+    backend = limiter.backend
+    assert [backend.consume("bucket", 2, 2 / 60, 1000.0) for _ in range(2)] == [0, 0]
+    assert backend.consume("bucket", 2, 2 / 60, 1000.0) == pytest.approx(30)
+    assert backend.consume("bucket", 2, 2 / 60, 1015.0) == pytest.approx(15)
+    assert backend.consume("bucket", 2, 2 / 60, 1030.0) == 0
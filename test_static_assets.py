@@ -0,0 +1,95 @@
+# backend_app/tests/test_static_assets.py
+
+import gzip
+
+import pytest
+
+from src import main
+from src.static_assets import (StaticManifest, compress_static_folder, FINGERPRINT, IMMUTABLE_CACHE_CONTROL,
+                               REVALIDATE_CACHE_CONTROL, INDEX_CACHE_CONTROL)
+
+INDEX = b"<!doctype html><div id=app></div>"
+BUNDLE = b"console.log('bundle');\n" * 200
+
+@pytest.fixture
+def static_site(tmp_path, monkeypatch):
+    """A built SPA in a temporary folder, served by the catch-all route through its own manifest."""
+    (tmp_path / "assets").mkdir()
+    (tmp_path / "index.html").write_bytes(INDEX)
+    (tmp_path / "assets" / "app.3f9a1c2b.js").write_bytes(BUNDLE)
+    (tmp_path / "report-2024_final.pdf").write_bytes(b"%PDF-1.4")
+    compress_static_folder(str(tmp_path))
+    manifest = StaticManifest(str(tmp_path)).build()
+    monkeypatch.setattr(main, "static_manifest", manifest)
+    return manifest
+
+@pytest.mark.parametrize("name, fingerprinted", [
+    ("app.3f9a1c2b.js", True),
+    ("main-4e5d6f7a8b9c0d1e2f3a.css", True),
+    ("vendor.0cc175b9c0f1b6a831c399e269772661.js", True),
+    ("report-2024_final.pdf", False),
+    ("report-20240101.pdf", False),
+    ("release-notes.txt", False),
+    ("app.3f9a1c2b4.js", False),
+    ("logo.png", False),
+])
+def test_fingerprint_needs_a_hex_hash_before_the_extension(name, fingerprinted):
+    assert bool(FINGERPRINT.search(name)) is fingerprinted
+
+def test_manifest_holds_cache_policy_and_variants(static_site):
+    bundle = static_site.assets["assets/app.3f9a1c2b.js"]
+    assert bundle.cache_control == IMMUTABLE_CACHE_CONTROL
+    assert bundle.mimetype in ("application/javascript", "text/javascript")
+    assert set(bundle.variants) >= {"gzip"}
+    assert static_site.assets["report-2024_final.pdf"].cache_control == REVALIDATE_CACHE_CONTROL
+    assert static_site.index.cache_control == INDEX_CACHE_CONTROL
+    assert not any(path.endswith(".gz") for path in static_site.assets) # Variants are not assets of their own
+
+def test_fingerprinted_asset_is_immutable(client, static_site):
+    response = client.get("/assets/app.3f9a1c2b.js", headers={"Accept-Encoding": "identity"})
+    assert response.status_code == 200
+    assert response.headers["Cache-Control"] == IMMUTABLE_CACHE_CONTROL
+    assert "Content-Encoding" not in response.headers
+    assert response.get_data() == BUNDLE
+    assert "Accept-Encoding" in response.headers["Vary"]
+
+def test_unfingerprinted_file_revalidates_with_its_etag(client, static_site):
+    response = client.get("/report-2024_final.pdf")
+    assert response.headers["Cache-Control"] == REVALIDATE_CACHE_CONTROL
+    assert client.get("/report-2024_final.pdf", headers={"If-None-Match": response.headers["ETag"]}).status_code == 304
+
+def test_precompressed_variant_is_served(client, static_site):
+    response = client.get("/assets/app.3f9a1c2b.js", headers={"Accept-Encoding": "gzip"})
+    assert response.status_code == 200
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert gzip.decompress(response.get_data()) == BUNDLE
+    assert int(response.headers["Content-Length"]) < len(BUNDLE)
+    identity_etag = client.get("/assets/app.3f9a1c2b.js", headers={"Accept-Encoding": "identity"}).headers["ETag"]
+    assert response.headers["ETag"] != identity_etag # One ETag per encoding
+
+def test_unknown_paths_fall_back_to_index(client, static_site):
+    for path in ("/", "/orders/42", "/menu/burgers"):
+        response = client.get(path, headers={"Accept-Encoding": "identity"})
+        assert response.status_code == 200
+        assert response.mimetype == "text/html"
+        assert response.headers["Cache-Control"] == INDEX_CACHE_CONTROL
+        assert response.get_data() == INDEX
+
+def test_index_is_served_gzipped_from_memory(client, static_site):
+    response = client.get("/orders/42", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert gzip.decompress(response.get_data()) == INDEX
+
+def test_without_index_unknown_paths_get_the_api_welcome(client, tmp_path, monkeypatch):
+    monkeypatch.setattr(main, "static_manifest", StaticManifest(str(tmp_path)).build())
+    response = client.get("/orders/42")
+    assert response.status_code == 200
+    assert "Welcome" in response.get_json()["message"]
+
+def test_compress_static_skips_small_and_binary_files(tmp_path):
+    (tmp_path / "tiny.js").write_bytes(b"x=1")
+    (tmp_path / "big.css").write_bytes(b"body{margin:0}\n" * 200)
+    (tmp_path / "photo.png").write_bytes(b"\x89PNG" + b"\0" * 4000)
+    compress_static_folder(str(tmp_path))
+    assert sorted(path.name for path in tmp_path.iterdir() if path.suffix in (".gz", ".br")) in (
+        ["big.css.gz"], ["big.css.br", "big.css.gz"])
@@ -0,0 +1,39 @@
+# backend_app/tests/test_tenancy.py
+
+from conftest import ALICE, BOB, ADMIN, HARBOUR_STAFF, OWNER, MAIN_STREET, HARBOUR
+
+def test_staff_only_manage_their_own_restaurant(client, auth):
+    assert client.get("/api/admin/orders", headers=auth(HARBOUR_STAFF, HARBOUR)).status_code == 200
+    assert client.get("/api/admin/orders", headers=auth(HARBOUR_STAFF, MAIN_STREET)).status_code == 403
+    assert client.get("/api/admin/orders", headers=auth(ADMIN, HARBOUR)).status_code == 403
+    assert client.get("/api/admin/orders", headers=auth(OWNER, HARBOUR)).status_code == 200
+
+def test_orders_are_scoped_to_the_restaurant(client, auth, place_order):
+    order_id = place_order([(7, 1)], restaurant_id=HARBOUR).get_json()["order_id"]
+    assert client.get(f"/api/orders/{order_id}", headers=auth(ALICE, HARBOUR)).status_code == 200
+    assert client.get(f"/api/orders/{order_id}", headers=auth(ALICE)).status_code == 404
+    assert client.get(f"/api/admin/orders/{order_id}", headers=auth(ADMIN)).status_code == 404
+    assert client.get(f"/api/admin/orders/{order_id}", headers=auth(HARBOUR_STAFF, HARBOUR)).status_code == 200
+
+def test_promotion_binds_staff_to_the_restaurant(client, auth):
+    response = client.put(f"/api/admin/users/{BOB}/role", json={"role": "staff"}, headers=auth(ADMIN))
+    assert response.status_code == 200
+    assert (response.get_json()["restaurant_id"], response.get_json()["all_restaurants"]) == (MAIN_STREET, False)
+    assert client.get("/api/admin/orders", headers=auth(BOB)).status_code == 200
+    assert client.get("/api/admin/orders", headers=auth(BOB, HARBOUR)).status_code == 403
+
+def test_only_all_restaurant_accounts_grant_all_restaurants(client, auth):
+    body = {"role": "admin", "all_restaurants": True}
+    assert client.put(f"/api/admin/users/{BOB}/role", json=body, headers=auth(ADMIN)).status_code == 403
+    assert client.put(f"/api/admin/users/{BOB}/role", json=body, headers=auth(OWNER)).status_code == 200
+    assert client.get("/api/admin/orders", headers=auth(BOB, HARBOUR)).status_code == 200
+
+def test_staff_of_other_restaurants_are_out_of_reach(client, auth):
+    assert client.put(f"/api/admin/users/{HARBOUR_STAFF}/role", json={"role": "admin"}, headers=auth(ADMIN)).status_code == 403
+    assert client.post(f"/api/admin/users/{HARBOUR_STAFF}/revoke-tokens", headers=auth(ADMIN)).status_code == 403
+    assert client.post(f"/api/admin/users/{OWNER}/revoke-tokens", headers=auth(ADMIN)).status_code == 403
+
+def test_revoking_a_users_tokens_signs_them_out(client, auth):
+    headers = auth(ALICE)
+    assert client.post(f"/api/admin/users/{ALICE}/revoke-tokens", headers=auth(ADMIN)).status_code == 200
+    assert client.get("/api/auth/me", headers=headers).status_code == 401
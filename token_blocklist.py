@@ -0,0 +1,122 @@
+# backend_app/src/token_blocklist.py
+
+# Server-side JWT revocation without a database lookup per request.
+# Revocations are stored in the revoked_tokens table and mirrored in memory; each worker
+# pulls only rows newer than the last one it has seen, at most every refresh_interval seconds.
+# A revocation made in another worker therefore takes effect within that interval.
+#
+# "Newer" is not just a higher id: ids are assigned at INSERT, not at COMMIT, so a revocation
+# whose transaction commits late can become visible after a higher id has already been read.
+# Each refresh therefore also re-reads the rows revoked within refresh_margin seconds of the
+# newest one seen (re-applying a row is harmless).
+#
+# User-wide revocations compare the token's iat, which is whole seconds, with the revocation
+# time truncated to whole seconds. A token issued in the same second as the revocation is
+# revoked: the revocation wins, and a user who logged in that second has to log in again.
+
+import math
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import select, or_
+
+from .extensions import db
+from .models.models import RevokedToken
+
+class TokenBlocklist:
+    def __init__(self, refresh_interval=5, refresh_margin=60):
+        self.refresh_interval = refresh_interval
+        self.refresh_margin = refresh_margin # Seconds; longest expected gap between INSERT and COMMIT
+        self._revoked_jtis = {} # jti -> expiry timestamp (or None)
+        self._user_cutoffs = {} # user_id -> whole-second timestamp; tokens issued up to it are revoked
+        self._last_id = 0
+        self._last_revoked_at = None # Newest revoked_at seen
+        self._next_refresh = 0
+        self._lock = threading.Lock()
+
+    def is_revoked(self, jwt_payload, refresh=True):
+        if refresh:
+            self._maybe_refresh()
+        if jwt_payload["jti"] in self._revoked_jtis:
+            return True
+        cutoff = self._user_cutoffs.get(str(jwt_payload["sub"]))
+        return cutoff is not None and jwt_payload["iat"] <= cutoff
+
+    def revoke_token(self, jwt_payload):
+        """Revoke one token. Commits."""
+        db.session.add(RevokedToken(
+            jti=jwt_payload["jti"],
+            user_id=jwt_payload["sub"],
+            token_type=jwt_payload.get("type"),
+            expires_at=_from_timestamp(jwt_payload["exp"]) if "exp" in jwt_payload else None
+        ))
+        db.session.commit()
+        self._revoked_jtis[jwt_payload["jti"]] = jwt_payload.get("exp")
+
+    def revoke_user(self, user_id):
+        """Revoke every token issued to user_id up to now (e.g. fired staff, compromised account). Commits."""
+        revoked_at = datetime.utcnow()
+        db.session.add(RevokedToken(user_id=user_id, revoked_at=revoked_at))
+        db.session.commit()
+        self._user_cutoffs[str(user_id)] = _cutoff(revoked_at)
+
+    def _maybe_refresh(self):
+        if time.monotonic() >= self._next_refresh:
+            self.refresh()
+
+    def refresh(self):
+        """Pull revocations added since the last refresh. Needs an app context."""
+        if not self._lock.acquire(blocking=False):
+            return # Another thread is already refreshing; the current snapshot is good enough
+        try:
+            newer = RevokedToken.id > self._last_id
+            if self._last_revoked_at is not None:
+                window_start = self._last_revoked_at - timedelta(seconds=self.refresh_margin)
+                newer = or_(newer, RevokedToken.revoked_at >= window_start)
+            rows = db.session.execute(
+                select(RevokedToken.id, RevokedToken.jti, RevokedToken.user_id, RevokedToken.revoked_at, RevokedToken.expires_at)
+                .where(newer)
+                .order_by(RevokedToken.id)
+            ).all()
+            for row in rows:
+                if row.jti:
+                    self._revoked_jtis[row.jti] = _to_timestamp(row.expires_at) if row.expires_at else None
+                else:
+                    cutoff = _cutoff(row.revoked_at)
+                    key = str(row.user_id)
+                    self._user_cutoffs[key] = max(cutoff, self._user_cutoffs.get(key, 0))
+                self._last_id = max(self._last_id, row.id)
+                if self._last_revoked_at is None or row.revoked_at > self._last_revoked_at:
+                    self._last_revoked_at = row.revoked_at
+            self._purge_expired()
+            self._next_refresh = time.monotonic() + self.refresh_interval
+        finally:
+            self._lock.release()
+
+    def _purge_expired(self):
+        # An expired token is rejected by its exp claim anyway; no need to remember it
+        now = time.time()
+        expired = [jti for jti, exp in self._revoked_jtis.items() if exp is not None and exp < now]
+        for jti in expired:
+            del self._revoked_jtis[jti]
+
+def _to_timestamp(naive_utc):
+    return naive_utc.replace(tzinfo=timezone.utc).timestamp()
+
+def _cutoff(revoked_at):
+    # iat is whole seconds; truncating keeps "iat <= cutoff" independent of sub-second timing
+    return math.floor(_to_timestamp(revoked_at))
+
+def _from_timestamp(ts):
+    return datetime.fromtimestamp(ts, timezone.utc).replace(tzinfo=None)
+
+blocklist = TokenBlocklist()
+
+def init_token_blocklist(app, jwt):
+    blocklist.refresh_interval = app.config.get("JWT_BLOCKLIST_REFRESH_SECONDS", 5)
+    blocklist.refresh_margin = app.config.get("JWT_BLOCKLIST_REFRESH_MARGIN_SECONDS", 60)
+
+    @jwt.token_in_blocklist_loader
+    def check_if_token_revoked(jwt_header, jwt_payload):
+        return blocklist.is_revoked(jwt_payload)
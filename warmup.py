@@ -0,0 +1,109 @@
+# backend_app/src/warmup.py
+
+# Startup warmup so the first requests after a deploy don't pay for cold caches:
+#   - fills the payload cache (public menu, categories, restaurant info of every restaurant) and
+#     the price table
+#   - compiles every statement in queries.WARMUP_PARAMETERS (plus the order detail loaders) into
+#     the engine's compiled cache by running it once with placeholder parameters
+#   - opens the pool's minimum connections (warm_pool)
+# /api/ready reports ready only once this has succeeded in the process.
+#
+# Under gunicorn the master preloads the app and warms up, and every worker inherits its state,
+# including the ready flag. The caches and compiled statements are still good after fork, but
+# the connections are not: post_fork discards them and calls warm_worker, which clears the ready
+# flag and sets it again only once the worker's own pool is warm.
+
+import threading
+import time
+
+from .extensions import db
+from .cache import payload_cache
+from .pricing import price_table
+from .tenancy import directory
+from .queries import WARMUP_PARAMETERS
+from .serializers import load_order_detail, load_items_preview
+
+class WarmupState:
+    def __init__(self):
+        self.ready = False
+        self.caches_warmed = False # Caches and statements; survive fork, unlike connections
+        self.duration_ms = None
+        self.error = None
+        self._lock = threading.Lock()
+
+    def as_dict(self):
+        return {"ready": self.ready, "warmup_ms": self.duration_ms, "error": self.error}
+
+state = WarmupState()
+
+def warm_pool(app):
+    """Check out (and return) DB_POOL_WARM_CONNECTIONS connections so they are open before traffic."""
+    with app.app_context():
+        pool = db.engine.pool
+        count = app.config.get("DB_POOL_WARM_CONNECTIONS", 5)
+        if hasattr(pool, "size"):
+            count = min(count, pool.size())
+        connections = []
+        try:
+            for _ in range(count):
+                connections.append(db.engine.connect())
+        finally:
+            for connection in connections:
+                connection.close()
+
+def warm_caches():
+    # Imported here: the loaders live with their routes, which import this package's modules
+    from .routes.menu_items import load_public_menu
+    from .routes.categories import load_active_categories
+    from .routes.admin import load_restaurant_info
+    directory.load()
+    for restaurant_id in directory.restaurant_ids():
+        payload_cache.get_or_load(("menu_items", restaurant_id), lambda: load_public_menu(restaurant_id))
+        payload_cache.get_or_load(("categories", restaurant_id), lambda: load_active_categories(restaurant_id))
+        payload_cache.get_or_load(("restaurant_info", restaurant_id), lambda: load_restaurant_info(restaurant_id))
+    price_table.load()
+
+def warm_statements():
+    for statement, parameters in WARMUP_PARAMETERS:
+        db.session.execute(statement, parameters).all()
+    for archived in (False, True):
+        load_order_detail(0, user_id=0, archived=archived)
+        load_items_preview([0], archived=archived)
+
+def run_warmup(app):
+    """Run every warmup step once; safe to call again after a failure. Returns True when ready."""
+    if state.ready:
+        return True
+    with state._lock:
+        if state.ready:
+            return True
+        started = time.perf_counter()
+        try:
+            if not state.caches_warmed:
+                with app.app_context():
+                    try:
+                        warm_caches()
+                        warm_statements()
+                    finally:
+                        db.session.remove()
+                state.caches_warmed = True
+            warm_pool(app)
+        except Exception as e:
+            state.error = str(e)
+            app.logger.exception("Warmup failed; /api/ready will retry")
+            return False
+        state.duration_ms = round((time.perf_counter() - started) * 1000, 1)
+        state.error = None
+        state.ready = True
+        return True
+
+def warm_worker(app):
+    """In a forked worker: not ready until this process has opened its own connections."""
+    state.ready = False
+    if app.config.get("WARMUP_ENABLED", True):
+        return run_warmup(app)
+    return False
+
+def init_warmup(app):
+    if app.config.get("WARMUP_ENABLED", True):
+        run_warmup(app)
@@ -0,0 +1,6 @@
+# backend_app/wsgi.py
+
+# Production WSGI entry point. From backend_app/:
+#   gunicorn -c gunicorn.conf.py wsgi:app
+
+from src.main import app